@@ -0,0 +1,69 @@
+import os
+import pygame
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+class AssetManager:
+    """
+    Loads each asset file once and hands out shared surfaces.
+    Once a display exists, images are converted to its pixel format so blits don't convert every frame.
+    Scaled variants (e.g. one per cell size) are cached alongside the originals.
+    In headless mode, or before a window is opened, surfaces are loaded but never converted.
+    """
+    def __init__(self, asset_dir=ASSET_DIR, headless=False):
+        """
+        Initializes the cache.
+        :param asset_dir: Folder the asset file names are relative to.
+        :param headless: Never convert surfaces, for runs without a window.
+        """
+        self.asset_dir = asset_dir
+        self.headless = headless
+        self._images = {}  # (name, size) -> surface
+        self._converted = set()  # Keys of surfaces already in the display format
+
+    def path(self, name):
+        """Return the full path of an asset file."""
+        return os.path.join(self.asset_dir, name)
+
+    def _display_ready(self):
+        """Return whether surfaces can be converted to a display format yet."""
+        return not self.headless and pygame.display.get_init() and pygame.display.get_surface() is not None
+
+    def _convert(self, surface):
+        """Convert a surface to the display format, keeping per-pixel alpha if it has any."""
+        if surface.get_flags() & pygame.SRCALPHA or surface.get_alpha() is not None:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def image(self, name, size=None):
+        """
+        Return the shared surface for an image file.
+        :param name: File name inside the asset folder, e.g. 'wall.png'.
+        :param size: Optional (width, height) to get a scaled variant.
+        """
+        key = (name, size)
+        surface = self._images.get(key)
+        if surface is None:
+            if size is None:
+                surface = pygame.image.load(self.path(name))
+            else:
+                original = self.image(name)
+                if original.get_size() == tuple(size):
+                    surface = original
+                else:
+                    surface = pygame.transform.scale(original, size)
+            self._images[key] = surface
+
+        # Surfaces loaded before the window opened get converted the first time they're asked for after
+        if key not in self._converted and self._display_ready():
+            surface = self._images[key] = self._convert(surface)
+            self._converted.add(key)
+        return surface
+
+    def clear(self):
+        """Drop every cached surface (e.g. after the display mode changes)."""
+        self._images.clear()
+        self._converted.clear()
+
+# Shared cache used by the game
+assets = AssetManager()
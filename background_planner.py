@@ -0,0 +1,109 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+class PlanCancelled(Exception):
+    """Raised inside a background search to abandon it."""
+
+class PlanRequest:
+    """A search handed to the worker, with the snapshot of the game it plans against."""
+    def __init__(self, start, targets, ghosts):
+        self.start = start
+        self.targets = list(targets)
+        self.ghosts = ghosts  # frozenset of the cells the ghosts stood on when the plan was requested
+        self.cancelled = threading.Event()
+        self.future = None
+
+class BackgroundPlanner:
+    """
+    Runs a PacmanAI's path searches on a worker thread, so the game loop never waits for one.
+    A request snapshots what the search depends on that changes (where the ghosts stand); the walls
+    and the distance table never change, so the worker reads them in place. Finished searches are
+    picked up with take(). A pending search whose snapshot went stale can be cancelled: its next
+    passability test raises PlanCancelled and the result is never published.
+    The worker searches with its own instance of the agent's search backend, so the agent can still
+    search on the main thread while a (cancelled) search finishes.
+    A thread rather than a process, since the maze and distance tables would otherwise be copied for
+    every search; the searches hold the interpreter lock while they run, but it switches threads every
+    few milliseconds, so a long search slows frames down rather than freezing them.
+    """
+    def __init__(self, agent):
+        """
+        Attaches a planner to an agent.
+        :param agent: The PacmanAI to search for.
+        """
+        self.agent = agent
+        self.pathfinder = agent.make_pathfinder()  # Used only by the worker
+        self.pending = None  # The PlanRequest being searched, if any
+        self.searches = 0  # Searches finished
+        self.cancelled = 0  # Searches cancelled before they were picked up
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pacman-planner")
+        self._ghosts = frozenset()  # Ghost cells of the last search, so incremental backends can repair (worker only)
+
+    def request(self, start, targets, ghosts):
+        """
+        Start a search unless one is already pending.
+        :param start: Cell to plan from.
+        :param targets: Pellets to find paths to.
+        :param ghosts: Cells the ghosts stand on.
+        Returns whether a search was started.
+        """
+        if self.pending is not None:
+            return False
+        request = PlanRequest(start, targets, frozenset(ghosts))
+        request.future = self._executor.submit(self._search, request)
+        self.pending = request
+        return True
+
+    def take(self):
+        """
+        Collect the pending search if it has finished.
+        Returns the paths it found (each from the request's start cell to a target), or None if it
+        hasn't finished. Errors raised by the search are raised here.
+        """
+        request = self.pending
+        if request is None or not request.future.done():
+            return None
+        self.pending = None
+        return request.future.result()
+
+    def wait(self, timeout=None):
+        """Block until the pending search (if any) finishes or timeout seconds pass."""
+        if self.pending is not None:
+            wait([self.pending.future], timeout)
+
+    def cancel(self):
+        """Abandon the pending search, e.g. after Pac-Man was caught or its targets were eaten."""
+        if self.pending is not None:
+            self.pending.cancelled.set()
+            self.pending = None
+            self.cancelled += 1
+
+    def close(self):
+        """Cancel any pending search and stop the worker thread."""
+        self.cancel()
+        self._executor.shutdown(wait=True)
+
+    def _search(self, request):
+        """Worker side: search the request's targets against its snapshot."""
+        agent = self.agent
+        ghosts, cancelled = request.ghosts, request.cancelled
+        is_open, stride = agent.grid.is_open, agent.grid.stride
+
+        def passable(cell):
+            if cancelled.is_set():
+                raise PlanCancelled
+            return (is_open(cell) and cell not in ghosts and cell - stride not in ghosts and cell + stride not in ghosts
+                    and cell - 1 not in ghosts and cell + 1 not in ghosts)
+
+        pathfinder = self.pathfinder
+        if pathfinder.incremental:
+            agent.repair(ghosts ^ self._ghosts, pathfinder)
+            self._ghosts = ghosts
+        try:
+            found = agent.set_targets(request.targets, request.start, passable, pathfinder)
+        except PlanCancelled:
+            # An incremental search stopped midway can leave its state half updated
+            pathfinder.reset()
+            return None
+        self.searches += 1
+        return found
@@ -0,0 +1,206 @@
+import numpy as np
+from distance_table import DistanceTable
+from game_agent import GameAgent
+from game_engine import GameEngine
+from level import Level
+
+class BatchSimulator:
+    """
+    Runs N independent games in lockstep with every game's state held in NumPy arrays.
+    Ghosts follow the same rules as Ghost.move (keep going straight, turn to a random open
+    neighbour when blocked), are written into each game's maze the way Level.update does it, and a
+    capture respawns Pac-Man and every ghost exactly like GameEngine.step.
+
+    Pac-Man follows PacmanAI's rule table (move, avoid nearby ghosts, stop when blocked), but when
+    moving it takes the next hop towards the closest pellet from the level's DistanceTable instead
+    of scoring BFS paths, so that every game's move is one table lookup.
+    """
+    PAD = 2  # Wall border around each maze so perception windows never leave the array
+    DX = np.array([dx for dx, dy in GameAgent.DIRECTIONS])
+    DY = np.array([dy for dx, dy in GameAgent.DIRECTIONS])
+    RIGHT = 3  # Index of the direction ghosts start (and respawn) facing
+
+    def __init__(self, num_games, maze=None, seed=None, pacman_start=GameEngine.PACMAN_START,
+                 ghost_spawns=None, pellet_value=10):
+        """
+        Initializes N copies of the same level.
+        :param num_games: Number of games to run side by side.
+        :param maze: the 2D maze (0=open, 1=wall, 2=ghost), defaults to the standard level.
+        :param seed: Seed for the ghosts' and Pac-Man's random choices.
+        :param pacman_start: Pac-Man's start cell.
+        :param ghost_spawns: Ghost start cells, defaults to the cells marked 2 in the maze (like GameEngine),
+                             or GameEngine.GHOST_SPAWNS for the standard level.
+        :param pellet_value: Points awarded per pellet.
+        """
+        if maze is None:
+            maze = Level().maze
+            if ghost_spawns is None:
+                ghost_spawns = list(GameEngine.GHOST_SPAWNS.values())
+        elif ghost_spawns is None:
+            ghost_spawns = Level(maze).spawn_points()
+        for sx, sy in ghost_spawns:
+            if not (0 <= sx < len(maze[0]) and 0 <= sy < len(maze)) or maze[sy][sx] == 1:
+                raise ValueError(f"Ghost spawn {(sx, sy)} is a wall in this maze")
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.pellet_value = pellet_value
+        self.height, self.width = len(maze), len(maze[0])
+
+        # Pac-Man's moves come from the all-pairs tables, so they must fit in memory
+        self.table = DistanceTable(maze)
+        if not self.table.full:
+            raise ValueError("BatchSimulator needs a level small enough for full distance tables")
+        n = len(self.table)
+        self.dist = np.frombuffer(self.table._dist, dtype=np.uint16).reshape(n, n)
+        self.next_dir = np.frombuffer(self.table._next, dtype=np.uint8).reshape(n, n)
+        self.cell_index = np.frombuffer(self.table._index, dtype=np.int32).reshape(self.height, self.width)
+
+        # Each game gets its own copy of the maze, padded with walls, with ghosts marked as 2
+        p = self.PAD
+        base = np.ones((self.height + 2 * p, self.width + 2 * p), dtype=np.uint8)
+        base[p:-p, p:-p] = np.asarray([list(row) for row in maze], dtype=np.uint8)
+        base[base == 2] = 0  # Spawn markers are floor until a ghost stands there
+        for sx, sy in ghost_spawns:
+            base[sy + p, sx + p] = 2
+        self.grid = np.repeat(base[None], num_games, axis=0)
+
+        # Pellets on every open cell, indexed by DistanceTable open-cell index
+        pellets = np.zeros(n, dtype=bool)
+        for y in range(self.height):
+            for x in range(self.width):
+                if maze[y][x] == 0 or maze[y][x] == 2 and (x, y) != pacman_start:
+                    pellets[self.cell_index[y, x]] = True
+        self.pellets = np.repeat(pellets[None], num_games, axis=0)
+        self.total_pellets = int(pellets.sum())
+
+        self.pacman_start = np.array(pacman_start)
+        self.pacman = np.repeat(self.pacman_start[None], num_games, axis=0)
+        self.ghost_start = np.array(ghost_spawns).reshape(-1, 2)
+        self.ghosts = np.repeat(self.ghost_start[None], num_games, axis=0)
+        self.ghost_dir = np.full((num_games, len(self.ghost_start)), self.RIGHT)
+
+        self.scores = np.zeros(num_games, dtype=np.int64)
+        self.steps = np.zeros(num_games, dtype=np.int64)
+        self.deaths = np.zeros(num_games, dtype=np.int64)
+        self.done = ~self.pellets.any(axis=1)  # GameState.GOAL
+        self._games = np.arange(num_games)
+
+    # ---------- Grid helpers ----------
+    def _cell(self, games, x, y):
+        """Maze values at (x, y) for each game."""
+        return self.grid[games, y + self.PAD, x + self.PAD]
+
+    def _neighbors_open(self, games, x, y):
+        """(len(games), 4) mask of open neighbours in DIRECTIONS order."""
+        return self._cell(games[:, None], x[:, None] + self.DX, y[:, None] + self.DY) == 0
+
+    def _perceive(self, games, x, y):
+        """Number of ghosts within 2 cells of (x, y) in each game, not counting (x, y) itself."""
+        count = np.zeros(len(games), dtype=np.int64)
+        for dy in range(-2, 3):
+            for dx in range(-2, 3):
+                if dx or dy:
+                    count += self._cell(games, x + dx, y + dy) == 2
+        return count
+
+    def _random_choice(self, mask):
+        """Pick a uniformly random True column of each row of mask (rows without one pick column 0)."""
+        scores = self.rng.random(mask.shape)
+        scores[~mask] = -1
+        return scores.argmax(axis=1)
+
+    # ---------- Tick ----------
+    def _move_pacman(self, games):
+        """Pac-Man's rule-table step for the games still hunting pellets."""
+        x, y = self.pacman[games, 0], self.pacman[games, 1]
+        neighbors = self._neighbors_open(games, x, y)
+        blocked = ~neighbors.any(axis=1)
+        near = self._perceive(games, x, y) > 0
+
+        # AVOID: step to a random neighbour that isn't next to a ghost
+        avoid = near & ~blocked
+        nx, ny = x[:, None] + self.DX, y[:, None] + self.DY
+        adjacent = np.zeros(neighbors.shape, dtype=bool)
+        for dx, dy in GameAgent.DIRECTIONS:
+            adjacent |= self._cell(games[:, None], nx + dx, ny + dy) == 2
+        safe = neighbors & ~adjacent
+        avoid_dir = self._random_choice(safe)
+        avoid &= safe.any(axis=1)
+
+        # MOVE: next hop towards the closest pellet
+        here = self.cell_index[y, x]
+        dist = np.where(self.pellets[games], self.dist[here], np.iinfo(np.uint16).max)
+        target = dist.argmin(axis=1)
+        reachable = dist[np.arange(len(games)), target] < np.iinfo(np.uint16).max
+        move = ~near & ~blocked & reachable & (target != here)
+        move_dir = self.next_dir[here, target]
+
+        direction = np.where(avoid, avoid_dir, move_dir)
+        moving = avoid | move
+        self.pacman[games, 0] = np.where(moving, x + self.DX[direction], x)
+        self.pacman[games, 1] = np.where(moving, y + self.DY[direction], y)
+
+    def _respawn(self, games):
+        """Return Pac-Man and every ghost to their start cells in the given games."""
+        self.pacman[games] = self.pacman_start
+        for g, (sx, sy) in enumerate(self.ghost_start):
+            gx, gy = self.ghosts[games, g, 0], self.ghosts[games, g, 1]
+            self.grid[games, gy + self.PAD, gx + self.PAD] = 0
+            self.grid[games, sy + self.PAD, sx + self.PAD] = 2
+            self.ghosts[games, g] = (sx, sy)
+            self.ghost_dir[games, g] = self.RIGHT
+        self.deaths[games] += 1
+
+    def step(self):
+        """Advance every unfinished game by one tick. Returns the number of games still running."""
+        games = self._games[~self.done]
+        if len(games) == 0:
+            return 0
+        self.steps[games] += 1
+
+        self._move_pacman(games)
+
+        # Eat pellets
+        here = self.cell_index[self.pacman[games, 1], self.pacman[games, 0]]
+        eaten = self.pellets[games, here]
+        self.pellets[games[eaten], here[eaten]] = False
+        self.scores[games[eaten]] += self.pellet_value
+        acting = self.pellets[games].any(axis=1)
+        self.done[games] = ~acting
+
+        # Ghosts move one after another, each seeing the ones before it
+        caught = np.zeros(len(games), dtype=bool)
+        for g in range(len(self.ghost_start)):
+            live = games[acting & ~caught]
+            x, y = self.ghosts[live, g, 0], self.ghosts[live, g, 1]
+            direction = self.ghost_dir[live, g]
+            neighbors = self._neighbors_open(live, x, y)
+            ahead = neighbors[np.arange(len(live)), direction]
+            moving = neighbors.any(axis=1)  # BLOCKED ghosts STOP
+            turn = moving & ~ahead
+            direction = np.where(turn, self._random_choice(neighbors), direction)
+            nx = np.where(moving, x + self.DX[direction], x)
+            ny = np.where(moving, y + self.DY[direction], y)
+
+            # Level.update: clear the old cell, mark the new one
+            movers = live[moving]
+            self.grid[movers, y[moving] + self.PAD, x[moving] + self.PAD] = 0
+            self.grid[movers, ny[moving] + self.PAD, nx[moving] + self.PAD] = 2
+            self.ghosts[live, g, 0], self.ghosts[live, g, 1] = nx, ny
+            self.ghost_dir[live, g] = direction
+
+            # Respawn pac-man at start if caught; later ghosts in that game don't move this tick
+            hit = ~caught & (self.ghosts[games, g, 0] == self.pacman[games, 0]) \
+                & (self.ghosts[games, g, 1] == self.pacman[games, 1])
+            if hit.any():
+                self._respawn(games[hit])
+                caught |= hit
+
+        return int((~self.done).sum())
+
+    def run(self, max_ticks):
+        """Step until every game has eaten all its pellets or max_ticks ticks have passed."""
+        for _ in range(max_ticks):
+            if self.step() == 0:
+                break
+        return self.done
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the game's hot paths, with a regression gate.
+Every benchmark runs on the standard level (or a generated one, --size) with fixed seeds, so runs on
+one machine are comparable.
+Save a baseline once, then later runs fail (exit code 1) if any hot path got slower than the
+baseline by more than the threshold. Runs offline and without a screen (pygame's dummy video driver).
+
+Usage: python3 benchmark.py --save          # record the baseline
+       python3 benchmark.py                 # compare against it
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+from game_engine import GameEngine, nearest_pellets
+from pellet_store import PelletStore
+from renderer import Renderer
+from asset_manager import assets
+from maze_generator import generate_maze
+
+BASELINE_FILE = 'benchmark_baseline.json'
+THRESHOLD = 0.25  # Fail when a benchmark is this much slower than its baseline
+
+MAZE = None  # Level the benchmarks run on, None for the standard level
+
+def _engine(seed=1, ticks=0):
+    """A seeded game on the benchmark level, played for a number of ticks."""
+    engine = GameEngine(seed=seed, maze=MAZE)
+    for _ in range(ticks):
+        engine.step()
+    engine.perception.refresh()
+    return engine
+
+def _open_cell(engine, fx, fy):
+    """The open cell nearest to the point at fractions (fx, fy) of the level's width and height."""
+    level = engine.level
+    x, y = int(level.width * fx), int(level.height * fy)
+    for radius in range(max(level.width, level.height)):
+        for cy in range(max(0, y - radius), min(level.height, y + radius + 1)):
+            for cx in range(max(0, x - radius), min(level.width, x + radius + 1)):
+                if max(abs(cx - x), abs(cy - y)) == radius and engine.maze[cy][cx] == 0:
+                    return cx, cy
+
+def _targets(engine):
+    """Three far apart open cells (numbered by the engine's grid): the far corner, bottom middle and top right."""
+    points = [_open_cell(engine, 0.92, 0.92), _open_cell(engine, 0.5, 0.8), _open_cell(engine, 0.8, 1 / 6)]
+    return [engine.grid.cell(*point) for point in points]
+
+# Each benchmark's setup returns the function to time; a fresh setup runs before every repeat
+
+def bench_bfs():
+    engine = _engine()
+    pacman = engine.pacman
+    goal = _targets(engine)[0]
+    return lambda: pacman.bfs(pacman.start_cell, goal)
+
+def bench_set_targets():
+    engine = _engine()
+    pacman = engine.pacman
+    targets = _targets(engine)
+    return lambda: pacman.set_targets(targets)
+
+def bench_performance_measure():
+    engine = _engine(ticks=100)
+    pacman = engine.pacman
+    paths = pacman.set_targets(_targets(engine))
+    return lambda: pacman._performance_measure(paths)
+
+def bench_nearest_pellets():
+    engine = _engine()
+    rng = random.Random(2)
+    pellets = PelletStore(engine.grid.stride, (cell for cell in engine.pellets if rng.random() < 0.3))
+    level = engine.level
+    queries = [engine.grid.cell(rng.randrange(1, level.width - 1), rng.randrange(1, level.height - 1))
+               for _ in range(64)]
+    index = [0]
+    def run():
+        index[0] = (index[0] + 1) % len(queries)
+        return nearest_pellets(queries[index[0]], pellets)
+    return run
+
+def bench_perceive():
+    engine = _engine(ticks=50)
+    return engine.pacman._perceive
+
+def bench_ghost_move():
+    engine = _engine()
+    return engine.ghosts[0].move
+
+def bench_engine_tick():
+    engine = _engine(seed=3)
+    return engine.step
+
+def _renderer():
+    engine = _engine(ticks=20)
+    cell, size = Renderer.fit(engine.level)  # Same sizing as pacman.py
+    window = pygame.display.set_mode(size)
+    renderer = Renderer(window, engine, cell)
+    pacimage = assets.image('pac1.png', (cell, cell))
+    renderer.draw(pacimage)  # Build the cached layers
+    return renderer, pacimage
+
+def bench_draw():
+    renderer, pacimage = _renderer()
+    def run():
+        renderer._drawn_tick = None  # Redraw as if the game had ticked
+        renderer.draw(pacimage)
+    return run
+
+def bench_scroll():
+    renderer, pacimage = _renderer()
+    def run():
+        renderer._drawn_tick = None
+        renderer.camera = (-1, -1)  # The camera snaps back, so the frame recomposes the view from cached chunks
+        renderer.draw(pacimage)
+    return run
+
+# Name -> (setup, calls timed per repeat)
+BENCHMARKS = {
+    "bfs": (bench_bfs, 50),
+    "set_targets": (bench_set_targets, 50),
+    "performance_measure": (bench_performance_measure, 10000),
+    "nearest_pellets": (bench_nearest_pellets, 5000),
+    "perceive": (bench_perceive, 30000),
+    "ghost_move": (bench_ghost_move, 50000),
+    "engine_tick": (bench_engine_tick, 300),
+    "draw": (bench_draw, 1000),
+    "scroll": (bench_scroll, 200),
+}
+
+def run_benchmarks(names=None, repeat=7):
+    """
+    Time each benchmark.
+    :param names: Benchmarks to run (default: all).
+    :param repeat: Fresh setups timed per benchmark; the fastest one counts.
+    Returns a dict of benchmark name -> seconds per call.
+    """
+    pygame.init()
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, number = BENCHMARKS[name]
+        best = float('inf')
+        for _ in range(repeat):
+            function = setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            best = min(best, (time.perf_counter() - start) / number)
+        results[name] = best
+    return results
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Compare results with a baseline.
+    Returns the names of the benchmarks that are slower than their baseline by more than threshold.
+    """
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + threshold)]
+
+def print_results(results, baseline, threshold=THRESHOLD):
+    """Print a table of timings and their change from the baseline."""
+    print(f"{'benchmark':<20} {'time':>12} {'baseline':>12} {'change':>8}")
+    for name, seconds in results.items():
+        line = f"{name:<20} {seconds * 1e6:>10.2f}us"
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            flag = "  REGRESSED" if change > threshold else ""
+            line += f" {baseline[name] * 1e6:>10.2f}us {change:>+7.1%}{flag}"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the game's hot paths and gate on regressions.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline results file")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--repeat", type=int, default=7, help="timed repeats per benchmark")
+    parser.add_argument("--size", type=int, default=None, help="run on a generated SIZE x SIZE maze (seed 0)")
+    parser.add_argument("--loops", type=float, default=0.1, help="loop density of a generated maze (0 to 1)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    global MAZE
+    if args.size is not None:
+        try:
+            MAZE = generate_maze(args.size, loop_density=args.loops)
+        except ValueError as error:
+            parser.error(str(error))
+        if args.baseline == BASELINE_FILE:
+            # Timings on another level aren't comparable with the standard level's
+            args.baseline = f"benchmark_baseline_{args.size}.json"
+
+    results = run_benchmarks(args.names, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["benchmarks"]
+    print_results(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "benchmarks": {**baseline, **results}}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save to create one")
+        return 0
+    regressed = compare(results, baseline, args.threshold)
+    if regressed:
+        print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    print("No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+class BitBoard:
+    """
+    Game state layers stored as arbitrary-precision integer bitboards.
+    Cell (x, y) is bit y * stride + x of each layer. Rows are one bit wider than the maze so that
+    shifting a layer left or right can never wrap a cell onto the next row.
+
+    Neighbour expansion is a handful of shifts and masks over the whole layer, so searches advance
+    a full BFS frontier per step and pellet totals are a popcount.
+    """
+    def __init__(self, width, height, walls=0, pellets=0, ghosts=0):
+        """
+        Initializes the board.
+        :param width: Maze width in cells.
+        :param height: Maze height in cells.
+        :param walls: Wall layer.
+        :param pellets: Pellet layer.
+        :param ghosts: Ghost occupancy layer.
+        """
+        self.width = width
+        self.height = height
+        self.stride = width + 1  # Spare column between rows
+        row = (1 << width) - 1
+        # Every real cell of the grid, without the spare column
+        self.board = sum(row << (y * self.stride) for y in range(height))
+        self.walls = walls
+        self.pellets = pellets
+        self.ghosts = ghosts
+
+    @classmethod
+    def from_maze(cls, maze, pellets=(), ghosts=()):
+        """
+        Build a board from a 2D maze and collections of cells.
+        :param maze: the 2D maze, cells equal to 1 are walls.
+        :param pellets: (x, y) pellet positions.
+        :param ghosts: (x, y) ghost positions.
+        """
+        board = cls(len(maze[0]), len(maze))
+        walls = 0
+        for y, row in enumerate(maze):
+            # Highest x first so the string reads as a binary number
+            bits = ''.join('1' if value == 1 else '0' for value in reversed(list(row)))
+            walls |= int(bits, 2) << (y * board.stride)
+        board.walls = walls
+        board.pellets = board.to_mask(pellets)
+        board.ghosts = board.to_mask(ghosts)
+        return board
+
+    # ---------- Cells and masks ----------
+    def bit(self, pos):
+        """Return the single-bit mask of a cell."""
+        return 1 << (pos[1] * self.stride + pos[0])
+
+    def to_mask(self, cells):
+        """Return the mask with a bit set for every (x, y) in cells."""
+        mask = 0
+        for x, y in cells:
+            mask |= 1 << (y * self.stride + x)
+        return mask
+
+    def cell_mask(self, cells):
+        """Return the mask with a bit set for every cell number in cells (y * stride + x, as CellGrid numbers them)."""
+        mask = 0
+        for cell in cells:
+            mask |= 1 << cell
+        return mask
+
+    def cells(self, mask):
+        """Yield the (x, y) cell of every set bit of a mask, lowest bit first."""
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            yield index % self.stride, index // self.stride
+            mask ^= low
+
+    def has(self, mask, pos):
+        """Return whether a cell's bit is set in a mask."""
+        return (mask >> (pos[1] * self.stride + pos[0])) & 1 == 1
+
+    # ---------- Layer operations ----------
+    def expand(self, mask):
+        """Return every cell next to a cell of mask (Up, Down, Left, Right), within the board."""
+        return ((mask >> self.stride) | (mask << self.stride) | (mask >> 1) | (mask << 1)) & self.board
+
+    def open_cells(self):
+        """Cells that are neither walls nor ghosts."""
+        return self.board & ~self.walls & ~self.ghosts
+
+    def passable(self):
+        """Cells Pac-Man may path through: open, with no ghost on or next to them."""
+        return self.open_cells() & ~self.expand(self.ghosts)
+
+    def pellet_count(self):
+        """Number of pellets left on the board."""
+        return self.pellets.bit_count()
+
+    def eat(self, pos):
+        """Remove the pellet at a cell, returning whether there was one."""
+        bit = self.bit(pos)
+        eaten = self.pellets & bit
+        self.pellets &= ~bit
+        return eaten != 0
+
+    def move_ghost(self, old_pos, new_pos):
+        """Move a ghost's bit from one cell to another."""
+        self.ghosts = (self.ghosts & ~self.bit(old_pos)) | self.bit(new_pos)
+
+    # ---------- Frontier search ----------
+    def _layers(self, start, targets):
+        """
+        Expand BFS frontiers from start through passable cells until every target bit is reached
+        or the frontier dies out. Returns the list of frontier layers, layer k holding the cells k steps away.
+        """
+        passable = self.passable()
+        frontier = self.bit(start)
+        seen = frontier
+        layers = [frontier]
+        remaining = targets & ~frontier
+        while remaining and frontier:
+            frontier = self.expand(frontier) & passable & ~seen
+            seen |= frontier
+            layers.append(frontier)
+            remaining &= ~frontier
+        return layers
+
+    def _trace(self, layers, goal, depth):
+        """Walk back from a goal found in layers[depth] to the start, returning the path start→goal."""
+        path = [goal]
+        x, y = goal
+        for k in range(depth - 1, -1, -1):
+            for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height and self.has(layers[k], (nx, ny)):
+                    x, y = nx, ny
+                    break
+            path.append((x, y))
+        path.reverse()
+        return path
+
+    def multi_bfs(self, start, goals):
+        """
+        Shortest paths from start to several goals with one frontier-at-a-time search.
+        Returns a dict mapping each reachable goal to its path from start→goal (inclusive).
+        """
+        targets = self.to_mask(goals)
+        layers = self._layers(start, targets)
+        paths = {}
+        for goal in goals:
+            bit = self.bit(goal)
+            for depth, layer in enumerate(layers):
+                if layer & bit:
+                    paths[goal] = self._trace(layers, goal, depth)
+                    break
+        return paths
+
+    def bfs(self, start, goal):
+        """
+        Shortest path from start to goal through passable cells.
+        Returns a list of grid cells from start→goal (inclusive) or [] if none.
+        """
+        return self.multi_bfs(start, [goal]).get(goal, [])
+
+    def nearest_pellet_distance(self, start):
+        """Return the number of steps to the closest reachable pellet, or None if none can be reached."""
+        if not self.pellets:
+            return None
+        layers = self._layers(start, self.pellets)
+        for depth, layer in enumerate(layers):
+            if layer & self.pellets:
+                return depth
+        return None
+
+    # ---------- State hashing ----------
+    def key(self):
+        """Hashable snapshot of the dynamic layers (pellets and ghosts)."""
+        return self.pellets, self.ghosts
+
+    def __eq__(self, other):
+        return (isinstance(other, BitBoard) and self.width == other.width and self.height == other.height
+                and self.walls == other.walls and self.key() == other.key())
+
+    def __hash__(self):
+        return hash((self.width, self.height) + self.key())
@@ -0,0 +1,58 @@
+class CellGrid:
+    """
+    Numbers the cells of a maze so the engine can pass a cell around as one int: cell = y * stride + x.
+    As in BitBoard, rows are one cell wider than the maze (stride = width + 1) and that spare column is
+    a wall. Two wall rows also follow the last row. Stepping off any edge therefore lands on a wall, and
+    neighbours need no bounds checks, even two steps out (D* Lite repairs the neighbours of the cells
+    around a ghost). Steps up from the first row give negative cells, which index the bytearray from
+    its end, into those wall rows.
+    Cells are turned back into (x, y) only where they leave the engine: drawing and replays.
+    """
+    def __init__(self, maze, lazy=False):
+        """
+        Numbers a maze's cells.
+        :param maze: the 2D maze (0=open, any other value is a wall), e.g. a list of rows, MazeGrid or MappedMaze.
+        :param lazy: Ask the maze about every cell instead of copying its walls into a bytearray, for level
+                     files too big to copy.
+        """
+        self.maze = maze
+        self.width, self.height = len(maze[0]), len(maze)
+        self.stride = self.width + 1
+        self.size = (self.height + 2) * self.stride  # Cells including the spare column and rows
+        self.offsets = (-self.stride, self.stride, -1, 1)  # Up, Down, Left, Right, like GameAgent.DIRECTIONS
+        self.lazy = lazy
+        if lazy:
+            self.open = None
+        else:
+            # 1 for open cells; the spare column and rows stay 0
+            self.open = bytearray(self.size)
+            open_values = bytes.maketrans(bytes(range(256)), b"\x01" + b"\x00" * 255)
+            for y, row in enumerate(maze):
+                start = y * self.stride
+                self.open[start:start + self.width] = bytes(list(row)).translate(open_values)
+            self.is_open = self.open.__getitem__  # Skip a method call on the hot path
+
+    def is_open(self, cell):
+        """Return whether a cell is inside the maze and not a wall."""
+        y, x = divmod(cell, self.stride)
+        return self.maze.is_open(x, y)
+
+    def cell(self, x, y):
+        """Return the number of cell (x, y)."""
+        return y * self.stride + x
+
+    def xy(self, cell):
+        """Return the (x, y) coordinates of a cell."""
+        y, x = divmod(cell, self.stride)
+        return x, y
+
+    def neighbors(self, cell):
+        """Return the open cells next to a cell in Up, Down, Left, Right order."""
+        is_open = self.is_open
+        return [cell + offset for offset in self.offsets if is_open(cell + offset)]
+
+    def distance(self, a, b):
+        """Manhattan distance between two cells."""
+        ay, ax = divmod(a, self.stride)
+        by, bx = divmod(b, self.stride)
+        return abs(ax - bx) + abs(ay - by)
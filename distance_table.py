@@ -0,0 +1,257 @@
+from array import array
+from collections import deque
+import heapq
+
+class DistanceTable:
+    """
+    Precomputed shortest-path distances over the open cells of a static maze.
+    Walls (1) are the only obstacles; ghosts are left to the caller to check on top of the returned paths.
+
+    Small mazes get a full all-pairs distance matrix and next-hop table, so a path query is a walk of
+    next hops. Mazes with more than max_cells open cells only store distances from a few landmark
+    cells and answer path queries with an A* search guided by those landmarks.
+    """
+    MAX_CELLS = 2048  # Largest number of open cells to build full tables for
+    LANDMARKS = 8  # Landmarks to keep when the full tables would be too big
+    CACHE_SIZE = 4  # Tables kept by for_maze()
+    _cache = {}
+
+    DIRECTIONS = [
+        (0, -1),  # Up
+        (0, 1),   # Down
+        (-1, 0),  # Left
+        (1, 0)    # Right
+    ]
+
+    def __init__(self, maze, max_cells=MAX_CELLS, landmarks=LANDMARKS):
+        """
+        Builds the tables for a maze.
+        :param maze: the 2D maze, any cell that is not 1 is open.
+        :param max_cells: build full tables only if there are at most this many open cells.
+        :param landmarks: number of landmark cells to use for larger mazes.
+        """
+        self.width, self.height = len(maze[0]), len(maze)
+
+        # Map every grid cell (y * width + x) to its index among the open cells, or -1 for walls
+        self._index = array('i', [-1]) * (self.width * self.height)
+        self._cells = array('i')
+        for y in range(self.height):
+            row = maze[y]
+            for x in range(self.width):
+                if row[x] != 1:
+                    self._index[y * self.width + x] = len(self._cells)
+                    self._cells.append(y * self.width + x)
+
+        # Open neighbours of each open cell, by direction, as open-cell indexes (-1 if blocked)
+        self._adjacent = array('i', [-1]) * (len(self._cells) * 4)
+        for i, cell in enumerate(self._cells):
+            x, y = cell % self.width, cell // self.width
+            for d, (dx, dy) in enumerate(self.DIRECTIONS):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height:
+                    self._adjacent[i * 4 + d] = self._index[ny * self.width + nx]
+
+        self.full = len(self._cells) <= max_cells
+        # Full tables hold short distances, landmark rows may need to count past 65535 steps
+        self._typecode = 'H' if self.full else 'I'
+        self._unreachable = (1 << (8 * array(self._typecode).itemsize)) - 1  # Distance between unconnected cells
+        if self.full:
+            self._build_full()
+        else:
+            self._build_landmarks(landmarks)
+
+    @classmethod
+    def for_maze(cls, maze, max_cells=MAX_CELLS, landmarks=LANDMARKS):
+        """
+        Return the table for a maze's walls, reusing the one built for an earlier maze with the same walls.
+        Games played one after another on the same level then only pay for the precompute once.
+        """
+        walls = tuple(tuple(value == 1 for value in row) for row in maze)
+        key = (walls, max_cells, landmarks)
+        table = cls._cache.get(key)
+        if table is None:
+            if len(cls._cache) >= cls.CACHE_SIZE:
+                cls._cache.pop(next(iter(cls._cache)))  # Drop the oldest table
+            table = cls._cache[key] = cls(maze, max_cells, landmarks)
+        return table
+
+    def __len__(self):
+        """Number of open cells in the table."""
+        return len(self._cells)
+
+    def _bfs_row(self, source):
+        """
+        Distances from one open cell to every other open cell.
+        Returns (distances, first_moves) where first_moves holds the direction of the first step taken from source.
+        """
+        n = len(self._cells)
+        adjacent = self._adjacent
+        dist = array(self._typecode, [self._unreachable]) * n
+        first = bytearray(n)
+        dist[source] = 0
+
+        queue = deque([source])
+        while queue:
+            i = queue.popleft()
+            next_dist = dist[i] + 1
+            for d in range(4):
+                j = adjacent[i * 4 + d]
+                if j >= 0 and dist[j] == self._unreachable:
+                    dist[j] = next_dist
+                    # The first move is inherited from the parent, except for the source's own neighbours
+                    first[j] = d if i == source else first[i]
+                    queue.append(j)
+        return dist, first
+
+    def _build_full(self):
+        """Build the all-pairs distance matrix and next-hop table, one BFS per open cell."""
+        n = len(self._cells)
+        self._dist = array(self._typecode)
+        self._next = bytearray()
+        for source in range(n):
+            dist, first = self._bfs_row(source)
+            self._dist.extend(dist)
+            self._next.extend(first)
+
+    def _build_landmarks(self, count):
+        """
+        Pick landmark cells spread across the maze and store the distances from each of them.
+        Each new landmark is the cell furthest from the landmarks picked so far.
+        """
+        self._landmarks = []
+        self._landmark_dist = []
+        if not self._cells:
+            return
+
+        nearest = array(self._typecode, [self._unreachable]) * len(self._cells)
+        landmark = 0
+        for _ in range(count):
+            dist, _first = self._bfs_row(landmark)
+            self._landmarks.append(landmark)
+            self._landmark_dist.append(dist)
+            for i, d in enumerate(dist):
+                if d < nearest[i]:
+                    nearest[i] = d
+            # Next landmark is the reachable cell furthest from every landmark so far
+            landmark = max(range(len(nearest)), key=lambda i: nearest[i] if nearest[i] != self._unreachable else -1)
+            if nearest[landmark] in (0, self._unreachable):
+                break
+
+    def _lookup(self, pos):
+        """Return the open-cell index of a grid position, or -1 for walls and positions off the grid."""
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._index[y * self.width + x]
+        return -1
+
+    def _position(self, i):
+        """Return the grid position of an open-cell index."""
+        cell = self._cells[i]
+        return cell % self.width, cell // self.width
+
+    def _lower_bound(self, i, j):
+        """Admissible estimate of the distance between two open cells from the landmark distances."""
+        a = self._cells[i]
+        b = self._cells[j]
+        bound = abs(a % self.width - b % self.width) + abs(a // self.width - b // self.width)
+        for dist in self._landmark_dist:
+            di, dj = dist[i], dist[j]
+            if di == self._unreachable or dj == self._unreachable:
+                if di != dj:
+                    return self._unreachable  # Different components
+                continue
+            bound = max(bound, abs(di - dj))
+        return bound
+
+    def distance(self, start, goal):
+        """
+        Shortest path length between two cells ignoring ghosts.
+        Returns None if either cell is a wall or the cells are not connected.
+        """
+        i, j = self._lookup(start), self._lookup(goal)
+        if i < 0 or j < 0:
+            return None
+        if self.full:
+            d = self._dist[i * len(self._cells) + j]
+        else:
+            path = self._search(i, j)
+            d = len(path) - 1 if path else self._unreachable
+        return None if d == self._unreachable else d
+
+    def next_hop(self, start, goal):
+        """Return the first cell to move to on a shortest path from start to goal, or None."""
+        i, j = self._lookup(start), self._lookup(goal)
+        if self.full:
+            if i < 0 or j < 0 or i == j or self._dist[i * len(self._cells) + j] == self._unreachable:
+                return None
+            return self._position(self._adjacent[i * 4 + self._next[i * len(self._cells) + j]])
+        path = self.path(start, goal)
+        if len(path) < 2:
+            return None
+        return path[1]
+
+    def path(self, start, goal):
+        """
+        Shortest path between two cells ignoring ghosts.
+        Returns a list of grid cells from start→goal (inclusive) or [] if none.
+        """
+        return [self._position(k) for k in self._open_path(self._lookup(start), self._lookup(goal))]
+
+    def cell_path(self, start, goal, stride):
+        """
+        Shortest path between two cells numbered y * stride + x (as CellGrid numbers them), ignoring ghosts.
+        Returns an array('i') of those cell numbers from start→goal (inclusive), empty if there is none.
+        """
+        y, x = divmod(start, stride)
+        i = self._index[y * self.width + x] if 0 <= x < self.width and 0 <= y < self.height else -1
+        y, x = divmod(goal, stride)
+        j = self._index[y * self.width + x] if 0 <= x < self.width and 0 <= y < self.height else -1
+        width, cells = self.width, self._cells
+        return array('i', [cells[k] // width * stride + cells[k] % width for k in self._open_path(i, j)])
+
+    def _open_path(self, i, j):
+        """Shortest path between two open-cell indexes (-1 for none) as a list of open-cell indexes, or []."""
+        if i < 0 or j < 0:
+            return []
+        if not self.full:
+            return self._search(i, j)
+
+        n = len(self._cells)
+        if self._dist[i * n + j] == self._unreachable:
+            return []
+
+        # Walk the next-hop table from start to goal
+        path = [i]
+        while i != j:
+            i = self._adjacent[i * 4 + self._next[i * n + j]]
+            path.append(i)
+        return path
+
+    def _search(self, start, goal):
+        """A* search between two open-cell indexes using the landmark lower bound as its heuristic."""
+        if start == goal:
+            return [start]
+        if self._lower_bound(start, goal) == self._unreachable:
+            return []
+
+        parents = {start: None}
+        g = {start: 0}
+        heap = [(self._lower_bound(start, goal), 0, start)]
+        while heap:
+            _f, cost, i = heapq.heappop(heap)
+            if i == goal:
+                path = []
+                while i is not None:
+                    path.append(i)
+                    i = parents[i]
+                path.reverse()
+                return path
+            if cost > g[i]:
+                continue  # Stale heap entry
+            for d in range(4):
+                j = self._adjacent[i * 4 + d]
+                if j >= 0 and cost + 1 < g.get(j, self._unreachable):
+                    g[j] = cost + 1
+                    parents[j] = i
+                    heapq.heappush(heap, (cost + 1 + self._lower_bound(j, goal), cost + 1, j))
+        return []
@@ -22,6 +22,10 @@ class GameState:
     Represents the current state of the game from Pac-Man's perspective
     This is what the agent "perceives" about its environment
     """
+    # One state is built per decision, so skip the per-instance dict (no field has a default, so this is allowed)
+    __slots__ = ("pacman_pos", "pellet_north", "pellet_south", "pellet_east", "pellet_west", "ghost_nearby",
+                 "ghost_distance", "pellets_remaining", "nearest_pellet_distance")
+
     pacman_pos: Tuple[int, int]
     pellet_north: bool
     pellet_south: bool
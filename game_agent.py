@@ -1,5 +1,8 @@
+import random
 from enum import Enum
 from typing import Tuple, Dict
+from cell_grid import CellGrid
+from occupancy import Occupancy
 
 class AgentAction(Enum):
     """
@@ -27,9 +30,15 @@ class GameState(Enum):
 class GameAgent:
     """ 
     Parent class for game agents: Pac-man and Ghosts. 
+    Agents use __slots__, so a game (or thousands of saved ones) carries no per-agent attribute dict.
+    An agent's cell is an int numbered by its CellGrid; pos gives it as (x, y) for drawing and replays.
     """
+    __slots__ = ("grid", "rng", "occupancy", "perception", "start_cell", "cell")
+
     MOVE_COST = 1 # Cost to move one space
+    PERCEPTION_RADIUS = 2 # Spaces an agent looks in each direction when there's no perception service
 
+    # Steps in (x, y); the grid's offsets are the same steps between cell numbers
     DIRECTIONS = [
         (0, -1),  # Up
         (0, 1),   # Down
@@ -59,69 +68,66 @@ class GameAgent:
         (AgentState.BLOCKED, GameState.GOAL) : AgentAction.STOP
     }
 
-    def __init__(self, start_pos, maze):
+    def __init__(self, start_pos, maze, occupancy=None, perception=None, rng=None):
         """
         Initializes the Agent.
         :param start_pos: Initial X and Y-coordinate on the grid.
-        :param maze: the 2D maze to navigate.
+        :param maze: the 2D maze of walls to navigate (0=open, 1=wall), or the CellGrid numbering its cells.
+        :param occupancy: Occupancy layer holding where the other agents stand (defaults to an empty one).
+        :param perception: Optional shared Perception service that counts nearby agents for every agent.
+        :param rng: random.Random the agent draws its random choices from (defaults to the random module).
         """
-        self.maze = maze
-        self.start_pos = start_pos
-        self.pos = start_pos
+        self.grid = maze if isinstance(maze, CellGrid) else CellGrid(maze)
+        self.rng = rng if rng is not None else random
+        self.occupancy = occupancy if occupancy is not None else Occupancy(self.grid.stride)
+        self.perception = perception
+        self.start_cell = self.grid.cell(*start_pos)
+        self.cell = self.start_cell
+
+    @property
+    def maze(self):
+        """The 2D maze of walls the agent navigates."""
+        return self.grid.maze
+
+    @property
+    def pos(self):
+        """The agent's (x, y) coordinates."""
+        return self.grid.xy(self.cell)
+
+    @pos.setter
+    def pos(self, pos):
+        self.cell = self.grid.cell(*pos)
+
+    @property
+    def start_pos(self):
+        """The (x, y) coordinates the agent starts from."""
+        return self.grid.xy(self.start_cell)
+
+    def _is_open(self, cell):
+        """Return whether a cell is inside the maze, not a wall and not taken by another agent."""
+        return self.grid.is_open(cell) and cell not in self.occupancy.cells
     
     def _neighbors_list(self):
-        """Get all valid neighboring cells within bounds"""
-        rows, cols = len(self.maze), len(self.maze[0])
-        x, y = self.get_position()
-
-        # List of adjacent spaces the agent can move to
-        neighs = []
-        for dx, dy in self.DIRECTIONS:
-            nx, ny = x + dx, y + dy
-            # Bounds check
-            if 0 <= nx < cols and 0 <= ny < rows and self.maze[ny][nx] == 0:
-                neighs.append((nx, ny))
-        return neighs  
+        """Get the open neighboring cells no other agent stands on, in Up, Down, Left, Right order"""
+        occupied = self.occupancy.cells
+        return [cell for cell in self.grid.neighbors(self.cell) if cell not in occupied]
     
-    def _adjacent_agent(self, pos):
+    def _adjacent_agent(self, cell):
         """
         Return whether a cell is next to an agent.
-        :param pos: The cell to check.
+        :param cell: The cell to check.
         """
-        rows, cols = len(self.maze), len(self.maze[0])
-        x, y = pos
-
-        for dx, dy in self.DIRECTIONS:
-            nx, ny = x + dx, y + dy
-            # Bounds check
-            if 0 <= nx < cols and 0 <= ny < rows and self.maze[ny][nx] == 2:
-                return True
-        return False 
+        return self.occupancy.has_adjacent(cell)
     
-    def manhattan_distance(self, p1, p2):
-        """Calculates the Manhattan distance heuristic (h(n))."""
-        return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
+    def manhattan_distance(self, a, b):
+        """Calculates the Manhattan distance heuristic (h(n)) between two cells."""
+        return self.grid.distance(a, b)
 
     def _perceive(self):
-        """Check the Agent's current surroundings within 2 spaces and return the number of other agents detected."""
-        rows, cols = len(self.maze), len(self.maze[0])
-        x, y = self.get_position()
-        num_agents = 0
-
-        # Check all spaces within 2 spaces
-        for r_offset in range(-2, 3):  # From -2 to 2 (inclusive)
-            for c_offset in range(-2, 3):  # From -2 to 2 (inclusive)
-                # Skip the central cell itself
-                if r_offset == 0 and c_offset == 0:
-                    continue
-
-                ny = y + r_offset
-                nx = x + c_offset
-
-                # Check if the neighbor coordinates are within the grid boundaries
-                if 0 <= ny < rows and 0 <= nx < cols and self.maze[ny][nx] == 2:
-                    num_agents += 1
-        return num_agents
+        """Check the Agent's current surroundings and return the number of other agents detected."""
+        if self.perception is not None:
+            return self.perception.count(self.cell)
+        return self.occupancy.count_near(self.cell, self.PERCEPTION_RADIUS)
         
     def _state(self, agents, neighs):
         """ 
@@ -145,12 +151,12 @@ class GameAgent:
         return self.RULE_TABLE.get(state)
             
     def get_position(self):
-        """ Returns the ghost's current grid coordinates. """
+        """ Returns the agent's current (x, y) grid coordinates. """
         return self.pos
         
     def reset_position(self):
         """Sets this agent's position to its starting position."""
-        self.pos = self.start_pos
+        self.cell = self.start_cell
     
     def pick_action(self, game_state):
         """ 
@@ -0,0 +1,45 @@
+class FixedTimestep:
+    """
+    Runs the simulation at a fixed tick rate however often frames are drawn.
+    Each frame's elapsed wall-clock time, multiplied by the speed, goes into an accumulator, and every
+    whole tick's worth in it is one game step, so a 60 FPS window still ticks every tick_ms and a turbo
+    speed runs several ticks per frame. Leftover time carries over to the next frame.
+    """
+    SPEEDS = (1, 4, 16, 64, 256)  # Turbo multipliers, cycled by faster()
+
+    def __init__(self, tick_ms=200, max_ticks_per_frame=32):
+        """
+        Initializes the timestep.
+        :param tick_ms: Simulated milliseconds per game tick at normal speed.
+        :param max_ticks_per_frame: Most ticks run for one frame. Time beyond that is dropped, so a level
+            whose ticks take longer than they simulate slows the game down instead of falling further behind.
+        """
+        self.tick_ms = tick_ms
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.speed = 1
+        self.accumulator = 0.0  # Simulated milliseconds not yet stepped
+        self.dropped = 0  # Ticks skipped by the max_ticks_per_frame limit
+
+    def advance(self, elapsed_ms):
+        """
+        Add one frame's elapsed wall-clock time.
+        Returns the number of game ticks to run for this frame.
+        """
+        self.accumulator += elapsed_ms * self.speed
+        ticks = int(self.accumulator // self.tick_ms)
+        if ticks > self.max_ticks_per_frame:
+            self.dropped += ticks - self.max_ticks_per_frame
+            ticks = self.max_ticks_per_frame
+        self.accumulator -= ticks * self.tick_ms
+        self.accumulator = min(self.accumulator, self.tick_ms)  # Don't bank dropped time
+        return ticks
+
+    def faster(self):
+        """Switch to the next turbo speed, wrapping back to normal speed. Returns the new speed."""
+        speeds = self.SPEEDS
+        self.speed = speeds[(speeds.index(self.speed) + 1) % len(speeds)] if self.speed in speeds else 1
+        return self.speed
+
+    def reset(self):
+        """Forget accumulated time, e.g. after the game was fast-forwarded without drawing."""
+        self.accumulator = 0.0
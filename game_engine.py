@@ -0,0 +1,210 @@
+import random
+from pacman_ai import PacmanAI
+from level import Level
+from ghost import Ghost
+from game_agent import AgentAction, GameState
+from score_tracker import ScoreTracker
+from bitboard import BitBoard
+from perception import Perception
+from tick_profiler import NULL_PROFILER
+from background_planner import BackgroundPlanner
+
+def nearest_pellets(pos, pellets):
+    """
+    Find the nearest 3 or fewer pellets using Manhattan distance
+    :param pos: The cell to search from.
+    :param pellets: PelletStore of the remaining pellets.
+    """
+    if not pellets:
+        return None
+    return pellets.nearest(pos, 3)
+
+class GameEngine:
+    """
+    Headless Pac-Man simulation.
+    Owns the level, pellets, score and agents and advances them one game tick per call to step().
+    Nothing here opens a window or sleeps, so a front end (or a batch job) decides how fast to tick.
+    """
+    PACMAN_START = (1, 1)
+
+    # Ghost name and spawn position
+    GHOST_SPAWNS = {"Inky": (23, 1), "Blinky": (1, 23), "Pinky": (23, 23), "Clyde": (12, 12)}
+
+    def __init__(self, verbose=False, precompute=False, use_numpy=False, maze=None, num_ghosts=None,
+                 pathfinder="bfs", retain_plan=False, perception_radius=2, seed=None, profiler=None,
+                 background_planning=False):
+        """
+        Initializes a new game.
+        :param verbose: Print game events (pellets eaten, paths found, captures) to stdout.
+        :param precompute: Build the level's distance tables so Pac-Man can look paths up instead of searching.
+        :param use_numpy: Store the maze in a padded NumPy MazeGrid (requires NumPy).
+        :param maze: 2D maze to play (0=open, 1=wall, 2=ghost spawn) or an open LevelFile,
+                     defaults to the standard level.
+        :param num_ghosts: Play with only the first num_ghosts ghosts.
+        :param pathfinder: Pac-Man's search backend: "bfs", "astar", "bidirectional", "jps" or "dstar".
+        :param retain_plan: Pac-Man follows its path until it's invalidated instead of searching every tick.
+        :param perception_radius: How many cells around them agents look for other agents.
+        :param seed: Seed for every random choice in the game; one is drawn at random if not given.
+        :param profiler: TickProfiler to time each phase of a tick with (default: no instrumentation).
+        :param background_planning: Pac-Man searches on a worker thread and follows its last plan until a new
+                                    one is ready. Ticks no longer wait for searches, so the game depends on
+                                    thread timing and can't be replayed from its seed. Call close() when done.
+        """
+        self.verbose = verbose
+        self.profiler = profiler or NULL_PROFILER
+
+        # Every agent draws from one seeded generator, so the seed and options replay the game exactly
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.options = {"precompute": precompute, "use_numpy": use_numpy, "maze": maze, "num_ghosts": num_ghosts,
+                        "pathfinder": pathfinder, "retain_plan": retain_plan, "perception_radius": perception_radius,
+                        "background_planning": background_planning}
+
+        # Create maze: 0=open path, 1=wall
+        self.level = Level(maze=maze, precompute=precompute, use_numpy=use_numpy)
+        self.maze = self.level.maze
+        start_x, start_y = self.PACMAN_START
+        if self.maze[start_y][start_x] == 1:
+            raise ValueError(f"Pac-Man's start {self.PACMAN_START} is a wall in this maze")
+
+        # Place pellets in all open spaces (ghost spawns and Pac-Man's start included)
+        self.grid = self.level.grid  # Numbers the cells positions, paths and pellets are kept as
+        self.pellets = self.level.pellet_store()
+        self.eaten_pellets = []  # Cells of the pellets in the order they were eaten
+
+        # Score tracking
+        self.score_tracker = ScoreTracker(total_pellets=len(self.pellets))
+
+        # Where the ghosts stand, kept apart from the walls, and who can see whom
+        self.occupancy = self.level.occupancy
+        self.perception = Perception(self.occupancy, radius=perception_radius)
+
+        # Pac-Man AI agent
+        self.pacman = PacmanAI(start_pos=self.PACMAN_START, maze=self.grid, verbose=verbose,
+                               distances=self.level.distances, pathfinder=pathfinder,
+                               retain_plan=retain_plan, occupancy=self.occupancy, perception=self.perception,
+                               rng=self.rng)
+        if background_planning:
+            self.pacman.planner = BackgroundPlanner(self.pacman)
+
+        # Ghost obstacles and their last known cells
+        if maze is None:
+            spawns = self.GHOST_SPAWNS
+        else:
+            spawns = {f"Ghost {i + 1}": pos for i, pos in enumerate(self.level.spawn_points())}
+        spawns = list(spawns.items())[:num_ghosts]
+        self.ghosts = [Ghost(name, pos, self.grid, self.occupancy, self.perception, self.rng) for name, pos in spawns]
+        self.ghost_info = {ghost.name: ghost.cell for ghost in self.ghosts}
+        for ghost in self.ghosts:
+            self.occupancy.move(ghost.name, ghost.cell)
+
+        self.current_state = GameState.ACTING
+        self.ticks = 0
+        self.deaths = 0
+
+    def game_state(self):
+        """Returns whether the game is finished (Agent at goal) or still playing"""
+        if not self.pellets:
+            return GameState.GOAL
+        else:
+            return GameState.ACTING
+
+    def bitboard(self):
+        """Snapshot the walls, pellets and ghost positions as a BitBoard (hashable, cheap to search)."""
+        board = BitBoard.from_maze(self.maze)
+        # BitBoard numbers its bits like the engine's cells
+        board.pellets = board.cell_mask(self.pellets)
+        board.ghosts = board.cell_mask(self.ghost_info.values())
+        return board
+
+    @property
+    def replans_per_tick(self):
+        """Average number of path searches Pac-Man has made per tick."""
+        return self.pacman.replans / self.ticks if self.ticks else 0.0
+
+    def _log(self, message):
+        """Print a game event if the engine is verbose."""
+        if self.verbose:
+            print(message)
+
+    def step(self):
+        """
+        Advance the game by one tick: move Pac-Man, eat pellets, move ghosts and handle captures.
+        Returns the game state after the tick.
+        """
+        self.ticks += 1
+        profiler = self.profiler
+        tick_start = start = profiler.clock()
+
+        # Let an incremental search repair its plans around last tick's ghost moves
+        self.pacman.cells_changed(self.occupancy.take_changes())
+        # Everyone perceives the agents where they stood at the start of the tick
+        self.perception.refresh()
+        start = profiler.lap("repair", start)
+
+        # Find pac-man's nearest targets if pellets remain
+        if self.current_state == GameState.ACTING:
+            if profiler.enabled:
+                nodes, replans = self.pacman.nodes_expanded, self.pacman.replans
+            targets = nearest_pellets(self.pacman.cell, self.pellets)
+            self.pacman.step(self.current_state, targets, self.pellets)
+            start = profiler.lap("plan", start)
+            if profiler.enabled:
+                searches = self.pacman.replans - replans
+                profiler.record("replans", searches)
+                if searches:
+                    profiler.record("nodes/search", (self.pacman.nodes_expanded - nodes) / searches)
+
+        # Check if Pac-Man reached a pellet
+        if self.pacman.cell in self.pellets:
+            self.pellets.remove(self.pacman.cell)
+            self.eaten_pellets.append(self.pacman.cell)
+            score, pellets_eaten, remaining = self.score_tracker.eat_pellet(self.pacman.pos)
+            self._log(f"Pellet eaten at {self.pacman.pos}! Score: {score}, Remaining: {remaining}")
+
+        # Get the game state based on whether pellets remain
+        self.current_state = self.game_state()
+        start = profiler.lap("pellets", start)
+
+        # Move Ghosts one step
+        for ghost in self.ghosts:
+            action = ghost.step(self.current_state)
+            # If the ghost has moved, update the occupancy layer
+            if action != AgentAction.STOP:
+                self.occupancy.move(ghost.name, ghost.cell)
+
+            # Update ghost info
+            self.ghost_info[ghost.name] = ghost.cell
+
+            # Respawn pacman at start if caught
+            if ghost.cell == self.pacman.cell:
+                self._log("Ghost caught pac-man!")
+                self.deaths += 1
+                self._respawn()
+                break
+        profiler.lap("ghosts", start)
+        profiler.lap("tick", tick_start)
+
+        return self.current_state
+
+    def _respawn(self):
+        """Return Pac-Man and every ghost to their start positions."""
+        self.pacman.reset_position()
+        for ghost in self.ghosts:
+            ghost.reset_position()
+            self.occupancy.move(ghost.name, ghost.cell)
+            self.ghost_info[ghost.name] = ghost.cell
+
+    def close(self):
+        """Stop Pac-Man's background planner, if it has one."""
+        if self.pacman.planner is not None:
+            self.pacman.planner.close()
+
+    def run(self, max_ticks):
+        """
+        Step the game until every pellet is eaten or max_ticks is reached.
+        Returns the final game state.
+        """
+        while self.current_state == GameState.ACTING and self.ticks < max_ticks:
+            self.step()
+        return self.current_state
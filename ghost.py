@@ -1,39 +1,42 @@
-import pygame
-import random
+from asset_manager import assets
 from game_agent import *
 
 class Ghost(GameAgent):
     """
     A Pac-Man style ghost that moves straight until it hits an obstacle, then turns in a random direction.
     """
+    __slots__ = ("name", "direction")
+    IMAGE = 'randghost.png'
 
-    def __init__(self, name, start_pos, maze):
+    def __init__(self, name, start_pos, maze, occupancy=None, perception=None, rng=None):
         """
         Initializes the Ghost.
-        Stores the ghost's last known direction.
+        Stores the ghost's last known direction, as the offset between cell numbers.
         """
-        super().__init__(start_pos, maze)
+        super().__init__(start_pos, maze, occupancy, perception, rng)
         self.name = name
-        self.direction = self.DIRECTIONS[3]
-        self.image = pygame.image.load('assets/randghost.png')
+        self.direction = self.grid.offsets[3]  # Right
+
+    @property
+    def image(self):
+        """ The ghost sprite, shared by every ghost through the asset cache. """
+        return assets.image(self.IMAGE)
 
     def move(self):
         """
         Attempt to keep moving in the same direction. If obstacles, turn in a random direction.
         """
-        rows, cols = len(self.maze), len(self.maze[0])
-        current_x, current_y = self.get_position()
-        neighbor_x, neighbor_y = current_x + self.direction[0], current_y + self.direction[1]
+        neighbor = self.cell + self.direction
         # Move in the same direction
-        if (0 <= neighbor_x < cols) and (0 <= neighbor_y < rows) and self.maze[neighbor_y][neighbor_x] == 0:
-            self.pos = (neighbor_x, neighbor_y)
+        if self._is_open(neighbor):
+            self.cell = neighbor
         else:
             # Choose a random new direction
             valid_dirs = self._neighbors_list()
             if valid_dirs:
-                new_pos = valid_dirs[random.randint(0, (len(valid_dirs) - 1))]
-                self.direction = (new_pos[0] - self.pos[0], new_pos[1] - self.pos[1])
-                self.pos = new_pos
+                new_cell = valid_dirs[self.rng.randint(0, (len(valid_dirs) - 1))]
+                self.direction = new_cell - self.cell
+                self.cell = new_cell
         
     def step(self, game_state):
         """ 
@@ -50,4 +53,4 @@ class Ghost(GameAgent):
         """ Return agent to start position and reset its direction. """
         super().reset_position()
         # Reset old direction
-        self.direction = self.DIRECTIONS[3]
\ No newline at end of file
+        self.direction = self.grid.offsets[3]
\ No newline at end of file
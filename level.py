@@ -1,44 +1,82 @@
-import pygame
+from asset_manager import assets
+from cell_grid import CellGrid
+from distance_table import DistanceTable
+from occupancy import Occupancy
+from pellet_store import PelletStore
+from level_file import LevelFile
+
+# Standard level: 0=open path, 1=wall, 2=ghost spawn
+DEFAULT_MAZE = [
+    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1],
+    [1,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,2,1],
+    [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
+    [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
+    [1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1],
+    [1,0,1,1,0,1,0,1,1,1,1,1,1,1,1,1,1,1,0,1,0,1,1,0,1],
+    [1,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,1],
+    [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
+    [1,0,1,1,0,0,0,0,0,1,1,0,0,0,1,1,0,0,0,0,0,1,1,0,1],
+    [1,0,1,1,0,1,1,1,0,1,1,1,1,1,1,1,0,1,1,1,0,1,1,0,1],
+    [1,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,1],
+    [1,0,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,0,1],
+    [1,0,0,0,0,0,0,0,0,0,0,0,2,0,0,0,0,0,0,0,0,0,0,0,1],
+    [1,0,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,0,1],
+    [1,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,1],
+    [1,0,1,1,0,1,1,1,0,1,1,1,1,1,1,1,0,1,1,1,0,1,1,0,1],
+    [1,0,1,1,0,0,0,0,0,1,1,0,0,0,1,1,0,0,0,0,0,1,1,0,1],
+    [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
+    [1,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,1],
+    [1,0,1,1,0,1,0,1,0,1,1,1,1,1,1,1,0,1,0,1,0,1,1,0,1],
+    [1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1],
+    [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
+    [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
+    [1,2,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,2,1],
+    [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1]
+    ]
+
 """Class containing the level's maze and tile types"""
 class Level(object):
-    def __init__(self):
-        self.tiles = [pygame.image.load('assets/empty.png'), pygame.image.load('assets/wall.png'), pygame.image.load('assets/empty.png')]
-        self.maze = [
-            [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1],
-            [1,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,2,1],
-            [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
-            [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
-            [1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1],
-            [1,0,1,1,0,1,0,1,1,1,1,1,1,1,1,1,1,1,0,1,0,1,1,0,1],
-            [1,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,1],
-            [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
-            [1,0,1,1,0,0,0,0,0,1,1,0,0,0,1,1,0,0,0,0,0,1,1,0,1],
-            [1,0,1,1,0,1,1,1,0,1,1,1,1,1,1,1,0,1,1,1,0,1,1,0,1],
-            [1,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,1],
-            [1,0,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,0,1],
-            [1,0,0,0,0,0,0,0,0,0,0,0,2,0,0,0,0,0,0,0,0,0,0,0,1],
-            [1,0,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,1,0,1,1,1,1,0,1],
-            [1,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,1],
-            [1,0,1,1,0,1,1,1,0,1,1,1,1,1,1,1,0,1,1,1,0,1,1,0,1],
-            [1,0,1,1,0,0,0,0,0,1,1,0,0,0,1,1,0,0,0,0,0,1,1,0,1],
-            [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
-            [1,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,0,0,1,0,0,0,0,1],
-            [1,0,1,1,0,1,0,1,0,1,1,1,1,1,1,1,0,1,0,1,0,1,1,0,1],
-            [1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1],
-            [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
-            [1,0,1,1,0,1,1,1,0,1,1,0,1,0,1,1,0,1,1,1,0,1,1,0,1],
-            [1,2,0,0,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0,0,0,0,0,2,1],
-            [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1]
-            ]
-    def update(self, old_pos, new_pos):
-        if self._flip(old_pos, 0):
-            self._flip(new_pos, 2)
-
-    def _flip(self, pos, value):
-        x, y = pos
-        if x < len(self.maze[0]) and y < len(self.maze):
-            self.maze[y][x] = value
-            return True
-        return False
+    # Tile image for each maze value: 0=open, 1=wall (level files mark ghost spawns with 2)
+    TILE_IMAGES = ['empty.png', 'wall.png', 'empty.png']
+
+    def __init__(self, maze=None, precompute=False, use_numpy=False):
+        maze = DEFAULT_MAZE if maze is None else maze
+        if isinstance(maze, LevelFile):
+            # The walls stay in the file and are decoded chunk by chunk as agents reach them
+            self.level_file = maze
+            self.spawns = list(maze.spawns)
+            self.maze = maze.maze
+            self.width, self.height = maze.width, maze.height
+        else:
+            self.level_file = None
+            # Ghost spawns are floor; where agents stand is kept in the occupancy layer, so the walls never change
+            self.spawns = [(x, y) for y in range(len(maze)) for x in range(len(maze[0])) if maze[y][x] == 2]
+            self.maze = [tuple(0 if value == 2 else value for value in row) for row in maze]
+            self.width, self.height = len(maze[0]), len(maze)  # Any size; the standard level is 25x25
+        if use_numpy:
+            # Opt-in padded NumPy grid, only imported when asked for so NumPy stays optional
+            from maze_grid import MazeGrid
+            self.maze = MazeGrid(self.maze)
+
+        # Numbers the cells the engine and agents pass around; a level file's walls stay in the file
+        self.grid = CellGrid(self.maze, lazy=self.level_file is not None)
+        self.occupancy = Occupancy(self.grid.stride)
+
+        # Walls never move, so shortest paths between open cells can be looked up instead of searched
+        self.distances = DistanceTable.for_maze(self.maze) if precompute else None
+
+    def pellet_store(self):
+        """Return a new store with a pellet on every open cell."""
+        if self.level_file is not None:
+            return self.level_file.pellets()
+        grid = self.grid
+        return PelletStore(grid.stride, (cell for cell, open_cell in enumerate(grid.open) if open_cell))
 
+    def spawn_points(self):
+        """Return the ghost spawn cells (marked 2 in the level's maze) in reading order."""
+        return list(self.spawns)
 
+    @property
+    def tiles(self):
+        """Tile surfaces indexed by maze value, loaded on first use so headless games never touch images."""
+        return [assets.image(name) for name in self.TILE_IMAGES]
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Compact on-disk levels for mazes too big to keep as Python lists.
+
+A level file holds a header, the ghost spawns, the number of pellets in each chunk, then the walls
+as a bit-packed grid cut into square chunks (chunk_size x chunk_size cells, one bit per cell,
+1 = wall, bit x % 8 of byte x // 8 in each chunk row). Chunks are stored row by row at fixed
+offsets from a page-aligned start, so a chunk is found with arithmetic alone. Cells of edge chunks
+that lie outside the maze are stored as walls.
+
+LevelFile reads the file through mmap and decodes chunks only when a cell in them is asked for,
+keeping the most recently used ones. Opening a 10000x10000 level reads the header and nothing
+else; the operating system pages in only the chunks the agents and the screen touch.
+Pellets start on every open cell (ghost spawns included), as in GameEngine.
+
+Usage: python3 level_file.py convert standard.pml                   # the standard level
+       python3 level_file.py convert big.pml --size 10000 --seed 3  # a generated maze
+       python3 level_file.py convert mine.pml --from maze.json      # a JSON list of rows
+       python3 level_file.py info big.pml
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import time
+from array import array
+from collections import OrderedDict
+
+MAGIC = b"PACLVL01"
+HEADER = struct.Struct("<IIHHQ")  # width, height, chunk size, ghost spawns, pellets
+POINT = struct.Struct("<II")
+COUNT = struct.Struct("<I")  # Pellets in one chunk
+PAGE = 4096
+CHUNK_SIZE = 64
+
+# Byte value -> the 8 cells (0 or 1) it packs, lowest bit first
+_BYTE_CELLS = [bytes((value >> bit) & 1 for bit in range(8)) for value in range(256)]
+# Cell value (0=open, 1=wall, 2=ghost spawn) -> wall bit as a binary digit
+_WALL_DIGITS = bytes.maketrans(bytes(range(256)), b"0" + b"1" + b"0" * 254)
+
+def _chunk_layout(width, height, chunk_size):
+    """Return (chunks across, chunks down, bytes per chunk row)."""
+    return -(-width // chunk_size), -(-height // chunk_size), chunk_size // 8
+
+def write_level(path, rows, width=None, height=None, chunk_size=CHUNK_SIZE):
+    """
+    Write a maze to a level file.
+    :param path: File to write.
+    :param rows: The maze, one sequence of cell values (0=open, 1=wall, 2=ghost spawn) per row: a list of
+                 lists, or any iterable of rows such as bytes slices of a flat grid.
+    :param width: Columns, needed only when rows is a one-pass iterable (default: from the rows).
+    :param height: Rows, likewise.
+    :param chunk_size: Width and height of a chunk in cells, a multiple of 8.
+    Returns the number of pellets (open cells) in the level.
+    """
+    if chunk_size % 8 or not 8 <= chunk_size <= 4096:
+        raise ValueError(f"chunk_size must be a multiple of 8 between 8 and 4096, got {chunk_size}")
+    if width is None or height is None:
+        rows = list(rows)
+        height, width = len(rows), len(rows[0])
+    across, down, row_bytes = _chunk_layout(width, height, chunk_size)
+    padded_width = across * chunk_size
+    wall_row = b"\xff" * (across * row_bytes)  # Rows below the maze in the last band of chunks
+
+    spawns = []
+    counts = array("I")
+    data = []  # Encoded chunks, one bytes object per band of chunk rows
+    rows = iter(rows)
+    for band in range(down):
+        packed = []
+        for y in range(band * chunk_size, (band + 1) * chunk_size):
+            if y >= height:
+                packed.append(wall_row)
+                continue
+            row = bytes(next(rows))
+            if len(row) != width:
+                raise ValueError(f"Row {y} has {len(row)} cells, expected {width}")
+            x = row.find(2)
+            while x != -1:
+                spawns.append((x, y))
+                x = row.find(2, x + 1)
+            # Highest x first so the digits read as one binary number; cells past the edge are walls
+            digits = (b"1" * (padded_width - width) + row.translate(_WALL_DIGITS)[::-1])
+            packed.append(int(digits, 2).to_bytes(across * row_bytes, "little"))
+        chunks = []
+        for cx in range(across):
+            start = cx * row_bytes
+            chunk = b"".join(line[start:start + row_bytes] for line in packed)
+            counts.append(chunk_size * chunk_size - int.from_bytes(chunk, "little").bit_count())
+            chunks.append(chunk)
+        data.append(b"".join(chunks))
+
+    pellets = sum(counts)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(width, height, chunk_size, len(spawns), pellets))
+        for spawn in spawns:
+            f.write(POINT.pack(*spawn))
+        f.write(counts.tobytes())
+        f.write(bytes(-f.tell() % PAGE))  # Chunks start on a page boundary
+        for band in data:
+            f.write(band)
+    return pellets
+
+class LevelFile:
+    """
+    A level file opened through mmap, decoding wall chunks on first use.
+    Pass it as the maze of a Level or GameEngine to play it without loading the whole grid:
+    maze gives the list-like maze[y][x] view the agents read, pellets() a pellet store that tracks
+    eaten pellets on top of the file. Pickles as its path, so it can be handed to worker processes.
+    """
+    MAX_CHUNKS = 1024  # Decoded chunks kept in memory
+
+    def __init__(self, path, max_chunks=MAX_CHUNKS):
+        """
+        Opens a level file.
+        :param path: The file to open.
+        :param max_chunks: Decoded chunks to keep; the least recently used ones are dropped past this.
+        """
+        self.path = path
+        self.max_chunks = max_chunks
+        self._file = open(path, "rb")
+        self._map = None
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._read_header()
+        except (ValueError, OSError, struct.error):
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+            raise
+        self._chunks = OrderedDict()  # Chunk index -> decoded cells (0=open, 1=wall), row by row
+        self.chunks_loaded = 0  # Chunks decoded so far, including ones decoded again after being dropped
+        self.maze = MappedMaze(self)
+
+    def _read_header(self):
+        """Read the header, spawns and pellet counts, and work out where the chunks start."""
+        data = self._map
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a level file")
+        pos = len(MAGIC)
+        self.width, self.height, self.chunk_size, num_spawns, self.total_pellets = HEADER.unpack_from(data, pos)
+        pos += HEADER.size
+        self.spawns = [POINT.unpack_from(data, pos + i * POINT.size) for i in range(num_spawns)]
+        pos += num_spawns * POINT.size
+        self.across, self.down, self._row_bytes = _chunk_layout(self.width, self.height, self.chunk_size)
+        self.chunk_pellets = array("I")  # Pellets at the start of the game, per chunk in storage order
+        self.chunk_pellets.frombytes(data[pos:pos + self.across * self.down * COUNT.size])
+        pos += self.across * self.down * COUNT.size
+        self._data_start = pos + (-pos % PAGE)
+        self._chunk_bytes = self.chunk_size * self._row_bytes
+        if len(data) < self._data_start + self.across * self.down * self._chunk_bytes:
+            raise ValueError(f"{self.path} is truncated")
+
+    def chunk(self, index):
+        """Return the decoded cells of a chunk (chunk_size * chunk_size bytes, row by row)."""
+        chunks = self._chunks
+        cells = chunks.get(index)
+        if cells is not None:
+            try:
+                chunks.move_to_end(index)
+            except KeyError:
+                pass  # Evicted meanwhile by another thread (a background planner reads the maze too)
+            return cells
+        start = self._data_start + index * self._chunk_bytes
+        cells = b"".join([_BYTE_CELLS[value] for value in self._map[start:start + self._chunk_bytes]])
+        chunks[index] = cells
+        self.chunks_loaded += 1
+        if len(chunks) > self.max_chunks:
+            chunks.popitem(last=False)
+        return cells
+
+    def chunk_of(self, x, y):
+        """Return the index of the chunk holding cell (x, y)."""
+        return (y // self.chunk_size) * self.across + x // self.chunk_size
+
+    def cell(self, x, y):
+        """Return 1 if (x, y) is a wall (cells outside the maze count as walls), otherwise 0."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 1
+        size = self.chunk_size
+        return self.chunk((y // size) * self.across + x // size)[(y % size) * size + x % size]
+
+    def pellets(self):
+        """Return a new MappedPellets store with a pellet on every open cell."""
+        return MappedPellets(self)
+
+    def close(self):
+        """Unmap and close the file."""
+        self._chunks.clear()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        return {"path": self.path, "max_chunks": self.max_chunks}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_chunks"])
+
+class MappedRow:
+    """List-compatible view of one row of a LevelFile. Indexes outside the maze read as walls."""
+    def __init__(self, level, y):
+        self._level = level
+        self._y = y
+
+    def __getitem__(self, x):
+        return self._level.cell(x, self._y)
+
+    def __len__(self):
+        return self._level.width
+
+    def __iter__(self):
+        for x in range(self._level.width):
+            yield self._level.cell(x, self._y)
+
+class MappedMaze:
+    """
+    List-compatible maze[y][x] view of a LevelFile's walls (0=open, 1=wall).
+    Like MazeGrid it answers is_open and open_neighbors itself, so agents skip their own bounds checks.
+    """
+    def __init__(self, level):
+        self._level = level
+        self._rows = {}  # y -> MappedRow, made on first use
+
+    def __getitem__(self, y):
+        if not 0 <= y < self._level.height:
+            raise IndexError(y)
+        row = self._rows.get(y)
+        if row is None:
+            row = self._rows[y] = MappedRow(self._level, y)
+        return row
+
+    def __len__(self):
+        return self._level.height
+
+    def __iter__(self):
+        for y in range(self._level.height):
+            yield self[y]
+
+    def is_open(self, x, y):
+        """Return whether a cell is inside the maze and not a wall."""
+        return self._level.cell(x, y) == 0
+
+    def open_neighbors(self, x, y):
+        """Return the open cells next to (x, y) in Up, Down, Left, Right order."""
+        cell = self._level.cell
+        return [(nx, ny) for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)) if cell(nx, ny) == 0]
+
+class MappedPellets:
+    """
+    The pellets of a LevelFile: every open cell, minus the ones eaten since.
+    Behaves like PelletStore (in, len, iteration, add, remove, discard and nearest) but only
+    remembers eaten pellets, so it costs nothing up front whatever the size of the level.
+    Cells are numbered y * stride + x with stride = width + 1, as CellGrid numbers them.
+    """
+    def __init__(self, level):
+        self.level = level
+        self.stride = level.width + 1
+        self._eaten = set()
+        self._remaining = array("I", level.chunk_pellets)  # Pellets left per chunk
+        self._count = level.total_pellets
+
+    def __contains__(self, pos):
+        y, x = divmod(pos, self.stride)
+        return self.level.cell(x, y) == 0 and pos not in self._eaten
+
+    def __len__(self):
+        return self._count
+
+    def _chunk_of(self, pos):
+        y, x = divmod(pos, self.stride)
+        return self.level.chunk_of(x, y)
+
+    def remove(self, pos):
+        """Remove the pellet on a cell, raising KeyError if there is none."""
+        if pos not in self:
+            raise KeyError(pos)
+        self._eaten.add(pos)
+        self._remaining[self._chunk_of(pos)] -= 1
+        self._count -= 1
+
+    def discard(self, pos):
+        """Remove the pellet on a cell if there is one."""
+        if pos in self:
+            self.remove(pos)
+
+    def add(self, pos):
+        """Put back a pellet that was eaten (pellets only ever sit on open cells)."""
+        if pos in self._eaten:
+            self._eaten.remove(pos)
+            self._remaining[self._chunk_of(pos)] += 1
+            self._count += 1
+
+    def _chunk_pellets(self, index):
+        """Yield the pellets left in a chunk."""
+        level = self.level
+        size, stride = level.chunk_size, self.stride
+        corner = index // level.across * size * stride + index % level.across * size
+        cells = level.chunk(index)
+        i = cells.find(0)
+        while i != -1:
+            pos = corner + i // size * stride + i % size
+            if pos not in self._eaten:
+                yield pos
+            i = cells.find(0, i + 1)
+
+    def __iter__(self):
+        for index, remaining in enumerate(self._remaining):
+            if remaining:
+                yield from self._chunk_pellets(index)
+
+    def nearest(self, pos, k=1):
+        """
+        Return up to k pellets closest to pos by Manhattan distance, closest first (ties go to the
+        smaller x, then the smaller y).
+        Looks at rings of cells around pos first, since pellets are usually close by. If none of the
+        k are within a chunk's width, it searches rings of chunks instead, skipping chunks with no
+        pellets left.
+        :param pos: The cell to search from.
+        :param k: Number of pellets to return.
+        """
+        if not self._count or k <= 0:
+            return []
+        stride, width = self.stride, self.level.width
+        y, x = divmod(pos, stride)
+        candidates = []
+        for radius in range(self.level.chunk_size):
+            for cx, cy in _ring(x, y, radius):
+                # Columns off the maze would wrap onto the next or previous row
+                if 0 <= cx < width and cy * stride + cx in self:
+                    candidates.append((abs(cx - x) + abs(cy - y), cx, cy * stride + cx))
+            # Every pellet not seen yet is more than radius cells away
+            if len(candidates) >= k:
+                candidates.sort()
+                if candidates[k - 1][0] <= radius:
+                    return [p for _, _, p in candidates[:k]]
+
+        level = self.level
+        size = level.chunk_size
+        bx, by = x // size, y // size
+        candidates = []
+        for radius in range(max(level.across, level.down)):
+            for kx, ky in _ring(bx, by, radius):
+                if 0 <= kx < level.across and 0 <= ky < level.down and self._remaining[ky * level.across + kx]:
+                    for p in self._chunk_pellets(ky * level.across + kx):
+                        py, px = divmod(p, stride)
+                        candidates.append((abs(px - x) + abs(py - y), px, p))
+            # Any pellet beyond this ring of chunks is more than radius * chunk_size cells away
+            if len(candidates) >= k:
+                candidates.sort()
+                if candidates[k - 1][0] <= radius * size:
+                    break
+        candidates.sort()
+        return [p for _, _, p in candidates[:k]]
+
+def _ring(x, y, radius):
+    """Yield the cells exactly radius away from (x, y) by Chebyshev distance."""
+    if radius == 0:
+        yield x, y
+        return
+    for kx in range(x - radius, x + radius + 1):
+        yield kx, y - radius
+        yield kx, y + radius
+    for ky in range(y - radius + 1, y + radius):
+        yield x - radius, ky
+        yield x + radius, ky
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert mazes to level files and inspect them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="write a level file")
+    convert.add_argument("output", help="level file to write")
+    convert.add_argument("--from", dest="source", help="JSON file holding the maze as a list of rows")
+    convert.add_argument("--size", type=int, help="generate a SIZE x SIZE maze instead")
+    convert.add_argument("--seed", type=int, default=0, help="seed of a generated maze")
+    convert.add_argument("--loops", type=float, default=0.1, help="loop density of a generated maze (0 to 1)")
+    convert.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="chunk width and height in cells")
+    info = commands.add_parser("info", help="describe a level file")
+    info.add_argument("level", help="level file to read")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        start = time.perf_counter()
+        with LevelFile(args.level) as level:
+            seconds = time.perf_counter() - start
+            print(f"{level.width}x{level.height} level, {level.total_pellets} pellets, {len(level.spawns)} ghost "
+                  f"spawns, {level.across}x{level.down} chunks of {level.chunk_size}x{level.chunk_size} cells "
+                  f"(opened in {seconds * 1000:.2f}ms)")
+        return
+
+    start = time.perf_counter()
+    if args.size is not None:
+        from maze_generator import generate_grid
+        width = height = args.size
+        grid = generate_grid(args.size, seed=args.seed, loop_density=args.loops)
+        rows = (grid[y * width:(y + 1) * width] for y in range(height))
+    elif args.source is not None:
+        with open(args.source) as f:
+            rows = json.load(f)
+        width, height = len(rows[0]), len(rows)
+    else:
+        from level import DEFAULT_MAZE
+        rows = DEFAULT_MAZE
+        width, height = len(rows[0]), len(rows)
+    pellets = write_level(args.output, rows, width, height, args.chunk)
+    print(f"Wrote {width}x{height} level with {pellets} pellets to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Seeded generator for Pac-Man style mazes of any size, for playing and for scaling tests.
+Corridors are one cell wide and run between wall blocks on a two-cell lattice. A random spanning tree
+carves the corridors, every dead end is then opened into a neighbouring corridor (Pac-Man mazes
+have none), and loop_density knocks out a share of the remaining walls between corridors.
+The same size, seed and density always give the same maze.
+
+Usage: python3 maze_generator.py 51 --seed 7 --loops 0.2
+"""
+
+import argparse
+import random
+import time
+
+def generate_maze(width, height=None, seed=0, loop_density=0.1, num_ghosts=4):
+    """
+    Generate a maze in the level format (0=open, 1=wall, 2=ghost spawn), as a list of rows.
+    Takes the same arguments as generate_grid().
+    """
+    height = width if height is None else height
+    grid = generate_grid(width, height, seed, loop_density, num_ghosts)
+    return [list(grid[y * width:(y + 1) * width]) for y in range(height)]
+
+def generate_grid(width, height=None, seed=0, loop_density=0.1, num_ghosts=4):
+    """
+    Generate a maze in the level format (0=open, 1=wall, 2=ghost spawn).
+    Pac-Man's start, (1, 1), is always open and every open cell can be reached from it.
+    :param width: Columns, at least 7. An even width leaves an extra wall column on the right.
+    :param height: Rows, defaults to width. An even height leaves an extra wall row at the bottom.
+    :param seed: Seed for the generator.
+    :param loop_density: Share (0 to 1) of the walls between two corridors to knock out for extra loops.
+    :param num_ghosts: Ghost spawns to mark: the three far corners and the centre first, then random cells.
+    Returns a flat row-major bytearray, cell (x, y) at index y * width + x.
+    """
+    height = width if height is None else height
+    if width < 7 or height < 7:
+        raise ValueError(f"A maze needs at least 7x7 cells, got {width}x{height}")
+    if not 0 <= loop_density <= 1:
+        raise ValueError(f"loop_density must be between 0 and 1, got {loop_density}")
+    # Work on the largest odd-sized area, so corridor cells sit at odd coordinates
+    w, h = width - 1 + width % 2, height - 1 + height % 2
+    cols, rows = (w - 1) // 2, (h - 1) // 2
+    if num_ghosts > cols * rows - 1:  # Ghosts spawn on corridor cells other than Pac-Man's start
+        raise ValueError(f"A {width}x{height} maze has room for at most {cols * rows - 1} ghosts, got {num_ghosts}")
+    rng = random.Random(seed)
+    grid = bytearray(b'\x01' * (width * height))
+
+    # Carve a spanning tree of the corridor lattice (iterative depth-first search gives long corridors).
+    # The walk runs on a lattice with a visited border, where a step is one index offset in each array.
+    stride = cols + 2
+    visited = bytearray(b'\x01' * (stride * (rows + 2)))
+    for j in range(1, rows + 1):
+        visited[j * stride + 1:j * stride + 1 + cols] = bytes(cols)
+    moves = ((1, 1), (-1, -1), (stride, width), (-stride, -width))  # Lattice step, grid step to the wall between
+
+    cell, at = stride + 1, width + 1  # Pac-Man's start
+    visited[cell] = 1
+    grid[at] = 0
+    stack = [(cell, at)]
+    while stack:
+        cell, at = stack[-1]
+        options = [move for move in moves if not visited[cell + move[0]]]
+        if not options:
+            stack.pop()
+            continue
+        step, wall = options[0] if len(options) == 1 else rng.choice(options)
+        grid[at + wall] = 0
+        grid[at + 2 * wall] = 0
+        visited[cell + step] = 1
+        stack.append((cell + step, at + 2 * wall))
+
+    # Open every dead end (a corridor cell with one way out) into another corridor, never through the border
+    for y in range(1, h, 2):
+        for x in range(1, w, 2):
+            at = y * width + x
+            if grid[at - 1] + grid[at + 1] + grid[at - width] + grid[at + width] == 3:
+                walls = [wall for wall, inside in ((-1, x > 1), (1, x < w - 2), (-width, y > 1), (width, y < h - 2))
+                         if inside and grid[at + wall]]
+                grid[at + rng.choice(walls)] = 0
+
+    # Knock out a share of the remaining walls between two corridors
+    if loop_density:
+        for y in range(1, h - 1):
+            # Walls between corridors sit between two odd cells: odd x on even rows, even x on odd rows
+            for x in range(1 + y % 2, w - 1, 2):
+                if grid[y * width + x] and rng.random() < loop_density:
+                    grid[y * width + x] = 0
+
+    for x, y in _spawn_cells(w, h, num_ghosts, rng):
+        grid[y * width + x] = 2
+    return grid
+
+def _spawn_cells(w, h, num_ghosts, rng):
+    """Pick num_ghosts distinct corridor cells away from Pac-Man's start (generate_grid checks there are enough)."""
+    center = (w // 2 | 1, h // 2 | 1)  # Nearest corridor cell at or after the middle
+    anchors = [(w - 2, 1), (1, h - 2), (w - 2, h - 2), center]
+    spawns = []
+    for cell in anchors:
+        if len(spawns) == num_ghosts:
+            break
+        if cell != (1, 1) and cell not in spawns:
+            spawns.append(cell)
+    while len(spawns) < num_ghosts:
+        cell = (rng.randrange(1, w, 2), rng.randrange(1, h, 2))
+        if cell != (1, 1) and cell not in spawns:
+            spawns.append(cell)
+    return spawns
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded Pac-Man style maze.")
+    parser.add_argument("width", type=int, help="columns")
+    parser.add_argument("height", type=int, nargs="?", help="rows (default: same as width)")
+    parser.add_argument("--seed", type=int, default=0, help="generator seed")
+    parser.add_argument("--loops", type=float, default=0.1, help="share of walls between corridors to knock out")
+    parser.add_argument("--ghosts", type=int, default=4, help="ghost spawns to mark")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    maze = generate_maze(args.width, args.height, args.seed, args.loops, args.ghosts)
+    seconds = time.perf_counter() - start
+    if len(maze) <= 100 and len(maze[0]) <= 200:
+        for row in maze:
+            print("".join(" #G"[value] for value in row))
+    open_cells = sum(row.count(0) + row.count(2) for row in maze)
+    print(f"{len(maze[0])}x{len(maze)} maze, {open_cells} open cells, generated in {seconds:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import numpy as np
+
+class MazeRow:
+    """
+    List-compatible view of one row of a MazeGrid.
+    Index -1 and index width land on the wall border instead of raising or wrapping around.
+    """
+    def __init__(self, cells):
+        self._cells = cells  # Padded numpy row, including the border cells
+
+    def __getitem__(self, x):
+        return int(self._cells[x + 1])
+
+    def __setitem__(self, x, value):
+        self._cells[x + 1] = value
+
+    def __len__(self):
+        return len(self._cells) - 2
+
+    def __iter__(self):
+        return iter(self._cells[1:-1].tolist())
+
+class MazeGrid:
+    """
+    NumPy uint8 maze surrounded by a one cell wall border.
+    Single cell queries skip bounds checks because every neighbour of an in-bounds cell exists,
+    and bulk queries answer for every cell or every agent at once.
+    maze[y][x] indexing, len() and iteration keep working like the list of lists it replaces.
+    Cell values: 0=open, 1=wall. Agents live in the level's Occupancy layer, not in the grid.
+    """
+    WALL = 1
+
+    def __init__(self, maze):
+        """
+        Initializes the grid from a 2D list maze.
+        :param maze: 2D list (or array) of cell values.
+        """
+        self.height, self.width = len(maze), len(maze[0])
+        self.cells = np.full((self.height + 2, self.width + 2), self.WALL, dtype=np.uint8)
+        self.cells[1:-1, 1:-1] = np.asarray([list(row) for row in maze], dtype=np.uint8)
+        self._rows = [MazeRow(self.cells[y + 1]) for y in range(self.height)]
+
+    # ---------- List-compatible view ----------
+    def __getitem__(self, y):
+        return self._rows[y]
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def tolist(self):
+        """Return the maze as a plain 2D list."""
+        return self.cells[1:-1, 1:-1].tolist()
+
+    # ---------- Single cell queries ----------
+    def is_open(self, x, y):
+        """Return whether an in-bounds cell (or its border neighbour) is open."""
+        return self.cells[y + 1, x + 1] == 0
+
+    def open_neighbors(self, x, y):
+        """Return the open cells next to (x, y) in Up, Down, Left, Right order."""
+        cells = self.cells
+        px, py = x + 1, y + 1
+        neighs = []
+        if cells[py - 1, px] == 0:
+            neighs.append((x, y - 1))
+        if cells[py + 1, px] == 0:
+            neighs.append((x, y + 1))
+        if cells[py, px - 1] == 0:
+            neighs.append((x - 1, y))
+        if cells[py, px + 1] == 0:
+            neighs.append((x + 1, y))
+        return neighs
+
+    # ---------- Bulk queries ----------
+    def open_mask(self):
+        """Return an (height, width) boolean array of open cells."""
+        return self.cells[1:-1, 1:-1] == 0
+
+    def open_neighbor_mask(self):
+        """
+        Return a (4, height, width) boolean array telling, for every cell, whether the neighbour
+        in each direction (Up, Down, Left, Right) is open.
+        """
+        open_cells = self.cells == 0
+        return np.stack([
+            open_cells[:-2, 1:-1],  # Up
+            open_cells[2:, 1:-1],   # Down
+            open_cells[1:-1, :-2],  # Left
+            open_cells[1:-1, 2:]    # Right
+        ])
+
+    def agent_mask(self, occupancy):
+        """Return an (height, width) boolean array of cells holding an agent."""
+        agents = np.zeros((self.height, self.width), dtype=bool)
+        stride = occupancy.stride
+        for cell in occupancy.cells:
+            y, x = divmod(cell, stride)
+            agents[y, x] = True
+        return agents
+
+    def agent_counts(self, occupancy, radius=2):
+        """
+        Return an (height, width) array with, for every cell, the number of agents within radius
+        cells of it (the cell itself not included), computed with one summed-area table.
+        :param occupancy: The Occupancy layer to count agents from.
+        :param radius: Half width of the square window.
+        """
+        agents = self.agent_mask(occupancy)
+        table = np.zeros((self.height + 1, self.width + 1), dtype=np.int32)
+        np.cumsum(np.cumsum(agents, axis=0, dtype=np.int32), axis=1, out=table[1:, 1:])
+
+        rows = np.arange(self.height)
+        cols = np.arange(self.width)
+        top = np.clip(rows - radius, 0, self.height)[:, None]
+        bottom = np.clip(rows + radius + 1, 0, self.height)[:, None]
+        left = np.clip(cols - radius, 0, self.width)[None, :]
+        right = np.clip(cols + radius + 1, 0, self.width)[None, :]
+        counts = table[bottom, right] - table[top, right] - table[bottom, left] + table[top, left]
+        return counts - agents
+
+    def count_agents_at(self, occupancy, positions, radius=2):
+        """
+        Return the number of agents near each of many positions at once.
+        :param occupancy: The Occupancy layer to count agents from.
+        :param positions: Sequence of (x, y) cells.
+        :param radius: Half width of the square window around each position.
+        """
+        positions = np.asarray(positions, dtype=np.intp).reshape(-1, 2)
+        counts = self.agent_counts(occupancy, radius)
+        return counts[positions[:, 1], positions[:, 0]]
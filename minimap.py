@@ -0,0 +1,65 @@
+import pygame
+
+class Minimap:
+    """
+    Downsampled map of a whole level, with the agents and the camera's view marked on it.
+    Each minimap pixel covers a square block of cells and is shaded by how many of the block's cells
+    are open, judged from a few cells sampled evenly across it, so building it reads at most
+    SAMPLES x SAMPLES cells per pixel however big the level is.
+    """
+    WALL_COLOR = (33, 33, 160)
+    OPEN_COLOR = (0, 0, 0)
+    PACMAN_COLOR = (255, 255, 0)
+    GHOST_COLOR = (255, 60, 60)
+    VIEW_COLOR = (255, 255, 255)
+    SAMPLES = 3  # Cells sampled along each side of a block
+
+    def __init__(self, level, size=160):
+        """
+        Builds the minimap.
+        :param level: The Level to map.
+        :param size: Longest side of the minimap in pixels.
+        """
+        self.width, self.height = level.width, level.height
+        self.scale = max(1, -(-max(self.width, self.height) // size))  # Cells per minimap pixel
+        self.surface = pygame.Surface((-(-self.width // self.scale), -(-self.height // self.scale)))
+        self._render(level.maze)
+
+    def _render(self, maze):
+        """Shade every pixel by the share of open cells among the samples of its block."""
+        scale = self.scale
+        samples = min(self.SAMPLES, scale)
+        offsets = [scale * (2 * i + 1) // (2 * samples) for i in range(samples)]  # Evenly spread in the block
+        wall, floor = self.WALL_COLOR, self.OPEN_COLOR
+        shades = [tuple(w + (f - w) * n // len(offsets) ** 2 for w, f in zip(wall, floor))
+                  for n in range(len(offsets) ** 2 + 1)]  # Shade by number of open samples
+        for py in range(self.surface.get_height()):
+            ys = [y for y in (py * scale + dy for dy in offsets) if y < self.height]
+            rows = [maze[y] for y in ys]
+            for px in range(self.surface.get_width()):
+                xs = [x for x in (px * scale + dx for dx in offsets) if x < self.width]
+                open_cells = sum(row[x] == 0 for row in rows for x in xs)
+                # Blocks cut short by the level's edge have fewer samples; scale them up to a full block
+                self.surface.set_at((px, py), shades[open_cells * len(offsets) ** 2 // (len(rows) * len(xs))])
+
+    def draw(self, window, topleft, pacman, ghosts, view):
+        """
+        Draw the minimap with Pac-Man, the ghosts and the camera's view on it.
+        :param window: Surface to draw on.
+        :param topleft: Pixel position of the minimap's top left corner.
+        :param pacman: Pac-Man's (x, y) cell.
+        :param ghosts: The ghosts' (x, y) cells.
+        :param view: (x, y, width, height) of the cells on screen.
+        Returns the rect covered.
+        """
+        left, top = topleft
+        rect = window.blit(self.surface, topleft)
+        scale = self.scale
+        x, y, width, height = view
+        pygame.draw.rect(window, self.VIEW_COLOR,
+                         (left + x // scale, top + y // scale, max(1, width // scale), max(1, height // scale)), 1)
+        for ghost in ghosts:
+            pygame.draw.circle(window, self.GHOST_COLOR, (left + ghost[0] // scale, top + ghost[1] // scale), 2)
+        pygame.draw.circle(window, self.PACMAN_COLOR, (left + pacman[0] // scale, top + pacman[1] // scale), 2)
+        # Markers on the edge can reach a couple of pixels past the map
+        return rect.inflate(4, 4)
@@ -0,0 +1,80 @@
+class Occupancy:
+    """
+    Which agents stand on which cells, kept apart from the level's static wall grid.
+    Moving an agent and asking whether a cell is occupied or has an agent next to it are O(1);
+    counting the agents near a cell looks at each agent once.
+    Cells are numbered y * stride + x, as CellGrid numbers them.
+    """
+    def __init__(self, stride):
+        """
+        Initializes an empty layer.
+        :param stride: Cells per row of the numbering (the maze's width plus one, see CellGrid).
+        """
+        self.stride = stride
+        self.cells = {}  # cell -> names of the agents standing on it
+        self.positions = {}  # agent name -> cell
+        self.changes = set()  # Cells that gained or lost an agent since the last take_changes()
+        self.version = 0  # Bumped on every change, so caches built from the layer know when they're stale
+
+    def move(self, agent, pos):
+        """
+        Put an agent on a cell, taking it off the cell it stood on before (if any).
+        :param agent: The agent's name.
+        :param pos: The cell to put it on.
+        """
+        old_pos = self.positions.get(agent)
+        if old_pos == pos:
+            return
+        if old_pos is not None:
+            self._leave(agent, old_pos)
+        self.positions[agent] = pos
+        self.cells.setdefault(pos, []).append(agent)
+        self.changes.add(pos)
+        self.version += 1
+
+    def remove(self, agent):
+        """Take an agent off the grid."""
+        pos = self.positions.pop(agent, None)
+        if pos is not None:
+            self._leave(agent, pos)
+
+    def _leave(self, agent, pos):
+        agents = self.cells[pos]
+        agents.remove(agent)
+        if not agents:
+            del self.cells[pos]
+        self.changes.add(pos)
+        self.version += 1
+
+    def is_occupied(self, pos):
+        """Return whether any agent stands on a cell."""
+        return pos in self.cells
+
+    def agents_at(self, pos):
+        """Return the names of the agents standing on a cell."""
+        return list(self.cells.get(pos, ()))
+
+    def has_adjacent(self, pos):
+        """Return whether an agent stands on any of the four cells next to a cell."""
+        cells, stride = self.cells, self.stride
+        return pos - stride in cells or pos + stride in cells or pos - 1 in cells or pos + 1 in cells
+
+    def count_near(self, pos, radius=2):
+        """Return the number of agents within radius cells of a cell, not counting ones on the cell itself."""
+        y, x = divmod(pos, self.stride)
+        count = 0
+        for cell in self.positions.values():
+            ay, ax = divmod(cell, self.stride)
+            if abs(ax - x) <= radius and abs(ay - y) <= radius and cell != pos:
+                count += 1
+        return count
+
+    def take_changes(self):
+        """Return the cells that gained or lost an agent since the last call, and start recording afresh."""
+        changes = self.changes
+        self.changes = set()
+        return changes
+
+    def __len__(self):
+        """Number of agents placed."""
+        return len(self.positions)
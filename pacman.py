@@ -1,202 +1,194 @@
 import pygame
-import copy
-from pacman_ai import PacmanAI
-from level import Level
-from ghost import Ghost
-from game_agent import AgentAction, GameState
-from score_tracker import ScoreTracker
+from game_engine import GameEngine
+from game_agent import GameState
+from renderer import Renderer
+from asset_manager import assets
+from replay import ReplayWriter, MAX_CELLS as REPLAY_MAX_CELLS
+from tick_profiler import TickProfiler, NULL_PROFILER
+from maze_generator import generate_maze
+from level_file import LevelFile
+from game_clock import FixedTimestep
+import argparse
+import os
+import random
 import sys
+import time
+
+parser = argparse.ArgumentParser(description="Watch the Pac-Man AI play.")
+parser.add_argument("--profile", action="store_true", help="time each phase of every tick from the start")
+parser.add_argument("--seed", type=int, default=None, help="seed for the game and a generated maze (default: random)")
+parser.add_argument("--size", type=int, default=None, help="play a generated SIZE x SIZE maze instead of the standard level")
+parser.add_argument("--loops", type=float, default=0.1, help="loop density of a generated maze (0 to 1)")
+parser.add_argument("--level", help="play a level file (see level_file.py) instead of the standard level")
+parser.add_argument("--background-planning", action="store_true",
+                    help="search Pac-Man's paths on a worker thread so the window never waits for them")
+parser.add_argument("--fast-forward", type=int, default=None, metavar="TICK",
+                    help="run without drawing until this tick (or until a key is pressed)")
+args = parser.parse_args()
 
 # Initialize Pygame
 pygame.init()
 
+# ---------- Game Simulation ----------
+# The engine owns the maze, pellets, score and agents; this file only draws it
+seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+maze = None
+if args.level is not None:
+    maze = LevelFile(args.level)
+elif args.size is not None:
+    try:
+        maze = generate_maze(args.size, seed=seed, loop_density=args.loops)
+    except ValueError as error:
+        parser.error(str(error))
+engine = GameEngine(verbose=True, maze=maze, seed=seed, profiler=TickProfiler() if args.profile else None,
+                    background_planning=args.background_planning)
+grid = engine.level
+maze = engine.maze
+pellets = engine.pellets
+score_tracker = engine.score_tracker
+pacman = engine.pacman
+ghosts = engine.ghosts
+
 # ---------- Window Configuration ----------
-WIDTH, HEIGHT = 500, 500
+# Cells are up to 20x20 pixels, shrunk to fit a 1000 pixel window; levels that still don't fit scroll
+CELL, (WIDTH, HEIGHT) = Renderer.fit(grid)
 window = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("PACMAN - AI Agent")
+CAPTION = "PACMAN - AI Agent"
+pygame.display.set_caption(CAPTION)
 
 # Try to load icon (if exists)
 try:
-    icon = pygame.image.load('assets/PACicon.png')
+    icon = assets.image('PACicon.png')
     pygame.display.set_icon(icon)
 except Exception:
     pass  # Icon is optional
 
 clock = pygame.time.Clock()
 
-# ---------- Grid / Maze Configuration ----------
-CELL = 20  # Each cell is 20x20 pixels
-GRID_W, GRID_H = WIDTH // CELL, HEIGHT // CELL  # 20x20 grid
-
-# Create maze: 0=open path, 1=wall
-grid = Level()
-maze = grid.maze
-
-# ---------- Game Elements ----------
-# Place pellets in all open spaces (except Pac-Man's start)
-pellets = set()
-for y in range(GRID_H):
-    for x in range(GRID_W):
-        if maze[y][x] == 0 or maze[y][x] == 2 and (x, y) != (1, 1):  # Not at Pac-Man start
-            pellets.add((x, y))
-
-# Score tracking
-score_tracker = ScoreTracker(total_pellets=len(pellets))
-
-# ---------- Pac-Man AI Agent ----------
-pacman_start = (1, 1)
-pacman = PacmanAI(start_pos=pacman_start, maze=maze)
-pac1 = pygame.image.load('assets/pac1.png')
-pac2 = pygame.image.load('assets/pac2.png')
+# Every game is recorded so a run that went wrong can be played back and inspected. Replay keyframes
+# hold the whole pellet grid, so games on very large levels aren't recorded.
+REPLAY_DIR = 'replays'
+RUN_NAME = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{engine.seed}")
+replay = None
+if grid.width * grid.height <= REPLAY_MAX_CELLS:
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    replay = ReplayWriter(RUN_NAME + '.pmr', engine)
+else:
+    print(f"Level has over {REPLAY_MAX_CELLS} cells, not recording a replay")
+
+pac1 = assets.image('pac1.png', (CELL, CELL))
+pac2 = assets.image('pac2.png', (CELL, CELL))
 pacimage = pac1
 
-# ---------- Ghost obstacles ----------
-# Ghost name and last known position
-ghost_info = {"Inky": (23, 1), "Blinky": (1, 23), "Pinky": (23, 23), "Clyde": (12,12)}
-ghosts = [Ghost("Inky", ghost_info["Inky"], maze), 
-          Ghost("Blinky", ghost_info["Blinky"], maze), 
-          Ghost("Pinky", ghost_info["Pinky"], maze),
-          Ghost("Clyde", ghost_info["Clyde"], maze)]
-
-# ---------- Helper Functions ----------
-def game_state():
-    """Returns whether the game is finished (Agent at goal) or still playing"""
-    if not pellets:
-        return GameState.GOAL
-    else:
-        return GameState.ACTING
-    
-def nearest_pellets(pos, pellets_set):
-    """Find the nearest 3 or fewer pellets using Manhattan distance"""
-    if not pellets_set:
-        return None
-    pellets_copy = copy.deepcopy(pellets_set)
-    nearest = []
-
-    for _ in range(3):
-        if pellets_copy:
-            next_nearest = min(pellets_copy, key=lambda p: abs(p[0]-pos[0]) + abs(p[1]-pos[1]))
-            nearest.append(next_nearest)
-            pellets_copy.remove(next_nearest)
-    return nearest
-
-def grid_to_pixel(cell):
-    """Convert grid coordinates to pixel coordinates (center of cell)"""
-    x, y = cell
-    return x * CELL + CELL // 2, y * CELL + CELL // 2
+# ---------- Rendering ----------
+# The camera follows Pac-Man; the level is drawn in cached chunks and only what changed is redrawn
+renderer = Renderer(window, engine, CELL)
 
 def draw():
     """Draw the game state"""
-    window.fill((0, 0, 0))  # Black background
-    
-    # Draw maze walls
-    for y in range(GRID_H):
-        for x in range(GRID_W):
-                window.blit(grid.tiles[maze[y][x]], (x*CELL, y*CELL))
-    
-    # Draw pellets
-    for (px, py) in pellets:
-        cx, cy = grid_to_pixel((px, py))
-        pygame.draw.circle(window, (255, 255, 255), (cx, cy), CELL//8)
-    
-    # Draw Pac-Man's path (optional visualization)
-    if pacman.path:
-        for i in range(len(pacman.path) - 1):
-            start = grid_to_pixel(pacman.path[i])
-            end = grid_to_pixel(pacman.path[i + 1])
-            pygame.draw.line(window, (0, 255, 0), start, end, 2)
-    
-    # Draw Pac-Man
-    # cx, cy = grid_to_pixel(pacman.pos)
-    # pygame.draw.circle(window, (255, 255, 0), (cx, cy), CELL//2 - 2)
-
-    cx, cy = pacman.pos
-    window.blit(pacimage, (cx * CELL, cy * CELL))
-
-    # Draw Ghosts
-    for ghost in ghosts:
-        gx, gy = ghost.get_position()
-        window.blit(ghost.image, (gx * CELL, gy * CELL))
-    
-    # Draw score and stats
-    score_tracker.draw(window, len(pellets), WIDTH, HEIGHT)
-    
-    pygame.display.flip()
+    renderer.draw(pacimage)
+
+def advance():
+    """Run one game tick and record it."""
+    global pacimage
+    # Animate pac-man while it is still hunting pellets
+    if engine.current_state == GameState.ACTING:
+        pacimage = pac2 if pacimage == pac1 else pac1
+    engine.step()
+    if replay is not None:
+        replay.record()
 
 # ---------- Main Game Loop ----------
-# Initial game state
-current_state = GameState.ACTING
-
+# The game ticks every TICK_MS of simulated time whatever the frame rate; turbo runs several ticks a frame
 running = True
-MOVE_DELAY = 200  # Milliseconds between moves
-last_move_time = pygame.time.get_ticks()
-
-print(f"Game started! Total pellets: {score_tracker.get_total_pellets()}")
+TICK_MS = 200  # Milliseconds between moves at normal speed
+SLOW_TICK_MS = 1000
+timestep = FixedTimestep(TICK_MS)
+# While fast-forwarding, ticks run without drawing in batches of this long, then events are checked
+FAST_FORWARD_BATCH_MS = 50
+fast_forward_to = args.fast_forward  # Tick to fast-forward to, or None
+
+def stop_fast_forward():
+    """Go back to drawing every frame at the normal tick rate."""
+    global fast_forward_to
+    fast_forward_to = None
+    timestep.reset()
+    pygame.display.set_caption(CAPTION)
+    print(f"Fast-forward stopped at tick {engine.ticks}")
+
+print(f"Game started! Seed: {engine.seed}, Total pellets: {score_tracker.get_total_pellets()}")
 print("Pac-Man will automatically navigate using BFS algorithm")
-print("Press ESC to quit")
+print("Press ESC to quit, P to show tick timings, M to toggle the minimap")
+print("Press T to cycle turbo speeds, F to fast-forward without drawing (any key stops it)")
 
 while running:
-    current_time = pygame.time.get_ticks()
-    
+    elapsed = clock.tick(60)  # 60 FPS
+
     # Handle events
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+            # The window contents were lost or resized, redraw everything
+            renderer.invalidate()
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 running = False
+            elif fast_forward_to is not None:
+                # Any other key stops a fast-forward
+                stop_fast_forward()
             elif event.key == pygame.K_SPACE:
-                # Space to pause/unpause
-                MOVE_DELAY = 1000 if MOVE_DELAY == 200 else 200
-                print(f"Speed changed: {'Slow' if MOVE_DELAY == 1000 else 'Normal'}")
-
-    # Move Pac-Man and ghosts at intervals
-    if current_time - last_move_time > MOVE_DELAY:
-        last_move_time = current_time
-            
-        # Find pac-man's nearest target if pellets remain
-        if current_state == GameState.ACTING:
-            pacimage = pac2 if pacimage == pac1 else pac1
-            targets = nearest_pellets(pacman.pos, pellets)
-            #pacman.set_target(target)
-            pacman.step(current_state, targets)
-
-        # Check if Pac-Man reached a pellet
-        if pacman.pos in pellets:
-            pellets.remove(pacman.pos)
-            score, pellets_eaten, remaining = score_tracker.eat_pellet(pacman.pos)
-            print(f"Pellet eaten at {pacman.pos}! Score: {score}, Remaining: {remaining}")
-
-        # Get the game state based on whether pellets remain
-        current_state = game_state()
-
-        #Move Ghosts one step
-        for ghost in ghosts:
-            action = ghost.step(current_state)
-            #If the ghost has moved, update the maze
-            if action != AgentAction.STOP:
-                grid.update(ghost_info[ghost.name], ghost.pos)
-
-            #Update ghost info
-            ghost_info[ghost.name] = ghost.pos
-
-            # Respawn pacman at start if caught
-            if ghost.get_position() == pacman.pos:
-                print("Ghost caught pac-man!")
-                pacman.reset_position()
-                # Reset ghosts at start
-                for ghost in ghosts:
-                    ghost.reset_position()
-                    grid.update(ghost_info[ghost.name], ghost.pos)
-                    ghost_info[ghost.name] = ghost.pos
-                break
-
-    # Draw everything
+                # Space to toggle slow motion
+                timestep.tick_ms = SLOW_TICK_MS if timestep.tick_ms == TICK_MS else TICK_MS
+                print(f"Speed changed: {'Slow' if timestep.tick_ms == SLOW_TICK_MS else 'Normal'}")
+            elif event.key == pygame.K_t:
+                # T to cycle the turbo speeds
+                print(f"Turbo: {timestep.faster()}x")
+            elif event.key == pygame.K_f:
+                # F to fast-forward until a key is pressed
+                fast_forward_to = float('inf')
+                print(f"Fast-forwarding from tick {engine.ticks}, press any key to stop")
+            elif event.key == pygame.K_m:
+                # M to show/hide the minimap of a level bigger than the window
+                renderer.toggle_minimap()
+            elif event.key == pygame.K_p:
+                # P to show/hide the tick timings, which starts the profiler if it isn't running
+                if engine.profiler is NULL_PROFILER:
+                    engine.profiler = TickProfiler()
+                renderer.toggle_profile()
+
+    if fast_forward_to is not None:
+        # Tick flat out without drawing, stopping at the target tick or when the pellets run out
+        deadline = time.perf_counter() + FAST_FORWARD_BATCH_MS / 1000
+        while (engine.ticks < fast_forward_to and engine.current_state == GameState.ACTING
+               and time.perf_counter() < deadline):
+            advance()
+        if engine.ticks >= fast_forward_to or engine.current_state != GameState.ACTING:
+            stop_fast_forward()
+        else:
+            pygame.display.set_caption(f"{CAPTION} - fast-forwarding, tick {engine.ticks}")
+            continue
+
+    # Run the ticks that are due, then draw once
+    for _ in range(timestep.advance(elapsed)):
+        advance()
     draw()
-    clock.tick(60)  # 60 FPS
 
 # Cleanup
+engine.close()
 
 score_tracker.print_stats()
+if timestep.dropped:
+    print(f"{timestep.dropped} ticks were skipped because they took longer to run than to simulate")
+if replay is not None:
+    replay.close()
+    print(f"Replay saved to {replay.path} (seed {engine.seed})")
+if engine.profiler.enabled:
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    profile_path = RUN_NAME + '.profile.txt'
+    with open(profile_path, 'w') as f:
+        score_tracker.print_stats(file=f)
+        engine.profiler.write(f)
+    print(f"Tick profile saved to {profile_path}")
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -1,71 +1,136 @@
 # pacman_ai.py
-from collections import deque
+from array import array
 from game_agent import GameAgent, AgentAction
-import random
+from pathfinding import PATHFINDERS, BreadthFirstSearch
 
 class PacmanAI (GameAgent):
     """
-    Grid-based Pac-Man agent using BFS shortest-path search.
-    Maze: 2D list of ints -> 0=open, 1=wall
-    Positions are integer grid coords: (x, y)
+    Grid-based Pac-Man agent using shortest-path search (BFS by default, see pathfinding.py for the other backends).
+    Maze: 2D list of ints -> 0=open, 1=wall; ghosts are looked up in the occupancy layer
+    Positions are cells numbered by the agent's CellGrid (y * stride + x); paths are array('i')s of them
     """
-    def __init__(self, start_pos, maze):
-        self.pos = start_pos
-        self.prev_pos = start_pos
-        self.start_pos = start_pos
+    __slots__ = ("prev_cell", "performance_measure", "path", "visited", "verbose", "distances",
+                 "retain_plan", "replans", "planner", "pathfinder")
+
+    def __init__(self, start_pos, maze, verbose=True, distances=None, pathfinder="bfs", retain_plan=False,
+                 occupancy=None, perception=None, rng=None):
+        super().__init__(start_pos, maze, occupancy, perception, rng)
+        self.prev_cell = self.cell
         self.performance_measure = 0
-        self.maze = maze
-        self.path = []  # list of grid cells to walk through
-        self.visited_cells = set()  # Track visited cells for visualization
-
-    def _neighbors(self, x, y):
-        """Get valid neighboring cells (not walls, within bounds)"""
-        for dx, dy in ((1,0), (-1,0), (0,1), (0,-1)):
-            nx, ny = x + dx, y + dy
-            # Check if inside bounds and not a wall
-            if 0 <= ny < len(self.maze) and 0 <= nx < len(self.maze[0]) and self.maze[ny][nx] == 0:
-                yield nx, ny
+        self.path = array('i')  # Cells to walk through
+        # 1 for every cell Pac-Man has left, grown as it reaches further cells
+        self.visited = bytearray()
+        self.verbose = verbose  # Print path search results
+        self.distances = distances  # Optional precomputed DistanceTable for the maze's walls
+        # Keep following the current path until it's done, its pellet is gone or a ghost gets near it
+        self.retain_plan = retain_plan
+        self.replans = 0  # Number of times paths were searched for
+        self.planner = None  # BackgroundPlanner searching on a worker thread, if attached
+        # Search backend used when planning: "bfs", "astar", "bidirectional", "jps" or "dstar" (incremental)
+        self.pathfinder = self.make_pathfinder(pathfinder)
+
+    def make_pathfinder(self, name=None):
+        """
+        Return a new search backend for this agent's grid.
+        :param name: The backend's name in PATHFINDERS, defaults to the kind the agent plans with.
+        """
+        return PATHFINDERS[name or self.pathfinder.name](self.grid.stride)
+
+    def _passable(self, cell):
+        """Return whether Pac-Man may path through a cell: open and not next to a ghost."""
+        return self._is_open(cell) and not self._adjacent_agent(cell)
+
+    def _visit(self, cell):
+        """Mark a cell as visited, growing the visited bytes to reach it."""
+        visited = self.visited
+        if cell >= len(visited):
+            visited.extend(bytes(min(max(cell + 1, 2 * len(visited)), self.grid.size) - len(visited)))
+        visited[cell] = 1
+
+    def cells_changed(self, cells):
+        """
+        Tell an incremental search backend which maze cells changed since the last plan.
+        Whether a cell is passable also depends on its neighbours, so those are passed on too.
+        :param cells: Cells that gained or lost an agent, e.g. from Occupancy.take_changes().
+        """
+        if self.pathfinder.incremental:
+            self.repair(cells)
+
+    def repair(self, cells, pathfinder=None):
+        """
+        Pass cells that gained or lost an agent, and their neighbours, on to an incremental search backend.
+        :param pathfinder: The backend to repair, defaults to the agent's own.
+        """
+        pathfinder = pathfinder or self.pathfinder
+        offsets = self.grid.offsets
+        affected = set(cells)
+        for cell in cells:
+            for offset in offsets:
+                affected.add(cell + offset)
+        pathfinder.cells_changed(affected)
+
+    @property
+    def nodes_expanded(self):
+        """Nodes expanded by the search backend over the whole game (the background planner's included)."""
+        if self.planner is not None:
+            return self.pathfinder.nodes_expanded + self.planner.pathfinder.nodes_expanded
+        return self.pathfinder.nodes_expanded
 
     def bfs(self, start, goal):
         """
         Breadth-First Search to find shortest path from start to goal.
-        Returns a list of grid cells from start→goal (inclusive) or [] if none.
-        """
-        if start == goal:
-            return [start]
-        
-        queue = deque([(start, [])])
-        seen = {start}
-        
-        while queue:
-            (x, y), path = queue.popleft()
-            
-            for nx, ny in self._neighbors(x, y):
-                # Avoid repeats in path or moving too close to ghosts
-                if (nx, ny) in seen or self._adjacent_agent((nx, ny)):
-                    continue
-                    
-                if (nx, ny) == goal:
-                    # Found the goal! Return complete path
-                    return path + [(x, y), (nx, ny)]
-                
-                queue.append(((nx, ny), path + [(x, y)]))
-                seen.add((nx, ny))
-        
-        return []  # No path found
-
-    def set_targets(self, targets):
-        """
-        Compute a path to each of the target pellets.
-        :param targets: list of target pellet coordinates.
+        Returns an array('i') of cells from start→goal (inclusive), empty if there is none.
+        """
+        return BreadthFirstSearch(self.grid.stride).search(start, goal, self._passable)
+
+    def set_targets(self, targets, start=None, passable=None, pathfinder=None):
+        """
+        Compute a path to each of the target pellets with the search backend.
+        Paths from the precomputed distance table are used when no ghost blocks them.
+        :param targets: list of target pellet cells.
+        :param start: Cell to search from, defaults to Pac-Man's position.
+        :param passable: passable(cell) test to search with, defaults to the live maze and ghosts.
+        :param pathfinder: Search backend to use, defaults to the agent's own.
+        Returns an array('i') path for each reachable target, in the targets' order.
         """
+        start = self.cell if start is None else start
+        pathfinder = pathfinder or self.pathfinder
+        passable = passable or self._passable
+        found = {}
+        unresolved = []
+        for target in targets:
+            if self.distances is None:
+                unresolved.append(target)
+                continue
+            path = self.distances.cell_path(start, target, self.grid.stride)
+            if path and self._path_clear(path, passable):
+                found[target] = path
+            elif path:
+                # A ghost is in the way, fall back to searching around it
+                unresolved.append(target)
+
+        if unresolved:
+            found.update(pathfinder.search_many(start, unresolved, passable))
+
         paths = []
         for target in targets:
-            path = self.bfs(self.pos, target)
+            path = found.get(target)
             if path:
                 paths.append(path)
 
         return paths
+
+    def _path_clear(self, path, passable=None):
+        """
+        Return whether a path can be walked without entering a ghost cell or a cell next to a ghost.
+        :param path: Cells, the first of which is the agent's own position.
+        :param passable: passable(cell) test to check with, defaults to the live maze and ghosts.
+        """
+        passable = passable or self._passable
+        for cell in path[1:]:
+            if not passable(cell):
+                return False
+        return True
     
     def _performance_measure(self, paths):
         """ 
@@ -73,56 +138,148 @@ class PacmanAI (GameAgent):
         :param paths: List of possible paths the agent can take.
         """
         scored_points = []
+        visited = self.visited
+        reached = len(visited).__gt__
         for path in paths:
             if path:
-                # Paths with more revisited cells score lower
-                penalty = len(self.visited_cells.intersection(set(path))) * 3
+                # Paths with more revisited cells score lower (cells on a shortest path are distinct)
+                penalty = sum(map(visited.__getitem__, filter(reached, path))) * 3
                 # Discourage oscillating behavior
-                oscillation_penalty = 100 if self.prev_pos in path else 0
+                oscillation_penalty = 100 if self.prev_cell in path else 0
                 scored_points.append(500 - len(path) - penalty - oscillation_penalty)
         return scored_points
 
-    def step(self, current_state, targets):
-        """Advance one grid cell along current path."""
+    def _plan_valid(self, pellets):
+        """
+        Return whether the current path can still be followed: it has steps left, the pellet it
+        leads to hasn't been eaten and no ghost is on or next to any of its remaining cells.
+        :param pellets: The remaining pellets, or None to skip the pellet check.
+        """
+        if not self.path:
+            return False
+        if pellets is not None and self.path[-1] not in pellets:
+            return False
+        passable = self._passable
+        for cell in self.path:
+            if not passable(cell):
+                return False
+        return True
+
+    def _replan(self, targets):
+        """
+        Search paths to the targets and adopt the best scored one.
+        Returns whether a path was found.
+        """
+        self.replans += 1
+        return self._choose(self.set_targets(targets), targets)
+
+    def _choose(self, paths, targets):
+        """
+        Adopt the best scored of some paths starting at Pac-Man's position.
+        Returns whether there was one to adopt.
+        """
+        if not paths:
+            return False
+
+        # Score potential moves
+        performance_scores = self._performance_measure(paths)
+        # Update path to best scored path
+        best_index = performance_scores.index(max(performance_scores))
+        self.path = paths[best_index]
+        # Update the performance measure
+        self.performance_measure += performance_scores[best_index]
+
+        if self.verbose:
+            if self.path:
+                print(f"Found path from {self.pos} to {self.grid.xy(self.path[-1])}: {len(self.path)} steps")
+            else:
+                print(f"No path found from {self.pos} to {[self.grid.xy(target) for target in targets]}")
+
+        # First element might be current position, skip it
+        if self.path[0] == self.cell:
+            self.path.pop(0)
+        return True
+
+    def _plan_in_background(self, targets, pellets):
+        """
+        Follow the current path while the background planner searches the next one, starting from the
+        path's last cell, then switch to it. If that plan isn't ready or usable by the time it's needed,
+        search right away instead, so Pac-Man never stands still waiting for the worker (as when ticks
+        run back to back under turbo or fast-forward).
+        Returns whether there is a path to follow this tick.
+        """
+        planner = self.planner
+        # A search for pellets that have all been eaten since is no use
+        if planner.pending is not None and pellets is not None and not any(
+                target in pellets for target in planner.pending.targets):
+            planner.cancel()
+        if self._plan_valid(pellets):
+            return True
+
+        adopted = False
+        found = planner.take()
+        if found is not None:
+            self.replans += 1
+            # The search started where the last path was going to end, so pick up each path from where
+            # Pac-Man stands now, and drop the ones it isn't on or that ghosts have since blocked
+            paths = []
+            for path in found:
+                if self.cell in path:
+                    path = path[path.index(self.cell):]
+                    if (pellets is None or path[-1] in pellets) and self._path_clear(path):
+                        paths.append(path)
+            adopted = self._choose(paths, targets)
+        if not adopted:
+            # Whatever is still being searched starts from a path that's no longer followed
+            planner.cancel()
+            if not self._replan(targets):
+                return False
+
+        # Start on the next plan: from the end of this one, to the pellets nearest there that it doesn't eat
+        if self.path and pellets is not None:
+            on_path = set(self.path)
+            ahead = [pellet for pellet in pellets.nearest(self.path[-1], len(targets) + len(on_path))
+                     if pellet not in on_path][:len(targets)]
+            if ahead:
+                planner.request(self.path[-1], ahead, self.occupancy.cells)
+        return self._plan_valid(pellets)
+
+    def step(self, current_state, targets, pellets=None):
+        """
+        Advance one grid cell along current path.
+        :param current_state: The GameState.
+        :param targets: Pellets to plan paths to when a new plan is needed.
+        :param pellets: The remaining pellets, so a retained plan is dropped once its pellet is eaten.
+        """
         action = self.pick_action(current_state)
 
         if action == AgentAction.MOVE:
-            # Move toward next target
-            paths = self.set_targets(targets)
-            if paths:
-                # Score potential moves
-                performance_scores = self._performance_measure(paths)
-                # Update path to best scored path
-                best_index = performance_scores.index(max(performance_scores))
-                self.path = paths[best_index]
-                # Update the performance measure
-                self.performance_measure += performance_scores[best_index]
-
-                if self.path:
-                    print(f"Found path from {self.pos} to {self.path[-1]}: {len(self.path)} steps")
-                else:
-                    print(f"No path found from {self.pos} to {targets}")
-
-                # First element might be current position, skip it
-                if self.path[0] == self.pos:
-                    self.path.pop(0)
-                
-                # Move to next position in path
-                if self.path:
-                    self.prev_pos = self.pos
-                    self.visited_cells.add(self.pos)
-                    self.pos = self.path.pop(0)
+            # Move toward next target, searching only when the current plan can't be kept
+            if self.planner is not None:
+                planned = self._plan_in_background(targets, pellets)
+            elif self.retain_plan and self._plan_valid(pellets):
+                planned = True
+            else:
+                planned = self._replan(targets)
+
+            # Move to next position in path
+            if planned and self.path:
+                self.prev_cell = self.cell
+                self._visit(self.cell)
+                self.cell = self.path.pop(0)
         elif action == AgentAction.AVOID:
-            # Move away from other agents
-            self.path = []
+            # Move away from other agents; a plan being searched from the old cell would be stale
+            self.path = array('i')
+            if self.planner is not None:
+                self.planner.cancel()
             valid_moves = []
             for neigh in self._neighbors_list():
                 if not self._adjacent_agent(neigh):
                     valid_moves.append(neigh)
             if valid_moves:
-                self.prev_pos = self.pos
-                self.visited_cells.add(self.pos)
-                self.pos = valid_moves[random.randint(0, (len(valid_moves) - 1))]
+                self.prev_cell = self.cell
+                self._visit(self.cell)
+                self.cell = valid_moves[self.rng.randint(0, (len(valid_moves) - 1))]
 
     def has_path(self):
         """Check if Pac-Man has a path to follow"""
@@ -132,4 +289,6 @@ class PacmanAI (GameAgent):
         """Sets this agent's position to its starting position and resets path."""
         super().reset_position()
         #Clear old path
-        self.path = []
\ No newline at end of file
+        self.path = array('i')
+        if self.planner is not None:
+            self.planner.cancel()
\ No newline at end of file
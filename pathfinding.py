@@ -0,0 +1,515 @@
+"""
+Interchangeable grid search backends for PacmanAI.
+Every backend searches 4-connected grid cells through a passable(cell) test. Cells are ints numbered
+y * stride + x, as CellGrid numbers them, so a neighbour is the cell plus an offset. The start cell
+is always allowed, since it is where the agent already stands. Each one counts the nodes it expands,
+so backends can be compared on the same queries.
+Incremental backends keep their search state between calls and must be told through
+cells_changed() which cells' passability may have changed since the last search.
+"""
+
+from array import array
+from collections import deque
+import heapq
+
+INF = float('inf')
+
+def build_path(parents, goal):
+    """
+    Follow parent pointers back from goal to rebuild the path start→goal.
+    :param parents: Dict mapping each searched cell to the cell it was reached from (None for the start).
+    :param goal: The cell to rebuild the path for.
+    Returns the path as an array('i') of cells.
+    """
+    path = array('i')
+    cell = goal
+    while cell is not None:
+        path.append(cell)
+        cell = parents[cell]
+    path.reverse()
+    return path
+
+class Pathfinder:
+    """Base class for search backends."""
+    name = None
+    incremental = False  # Whether the backend keeps search state that cells_changed() must repair
+
+    def __init__(self, stride):
+        """
+        :param stride: Cells per row of the numbering (the maze's width plus one, see CellGrid).
+        """
+        self.stride = stride
+        self.neighbors = (1, -1, stride, -stride)  # Right, Left, Down, Up
+        self.nodes_expanded = 0  # Nodes taken off the frontier, over every search so far
+        self.searches = 0
+
+    def distance(self, a, b):
+        """Manhattan distance between two cells."""
+        ay, ax = divmod(a, self.stride)
+        by, bx = divmod(b, self.stride)
+        return abs(ax - bx) + abs(ay - by)
+
+    def search(self, start, goal, passable):
+        """
+        Find a shortest path from start to goal.
+        Returns an array('i') of cells from start→goal (inclusive), empty if there is none.
+        """
+        raise NotImplementedError
+
+    def cells_changed(self, cells):
+        """
+        Note cells whose passability may have changed since the last search.
+        Backends that search from scratch every time have nothing to repair.
+        """
+        pass
+
+    def reset(self):
+        """Forget any search state kept between calls, e.g. after a search was abandoned midway."""
+        pass
+
+    def search_many(self, start, goals, passable):
+        """
+        Find a shortest path from start to each goal.
+        Returns a dict mapping each reachable goal to its path.
+        """
+        paths = {}
+        for goal in goals:
+            path = self.search(start, goal, passable)
+            if path:
+                paths[goal] = path
+        return paths
+
+class BreadthFirstSearch(Pathfinder):
+    """
+    Breadth-First Search with parent pointers.
+    Searching for several goals is a single pass that stops once every reachable goal is settled.
+    """
+    name = "bfs"
+
+    def search(self, start, goal, passable):
+        return self.search_many(start, [goal], passable).get(goal, array('i'))
+
+    def search_many(self, start, goals, passable):
+        self.searches += 1
+        remaining = set(goals)
+        paths = {}
+        if start in remaining:
+            paths[start] = array('i', [start])
+            remaining.discard(start)
+
+        parents = {start: None}
+        queue = deque([start])
+        neighbors = self.neighbors
+
+        while queue and remaining:
+            cell = queue.popleft()
+            self.nodes_expanded += 1
+
+            for offset in neighbors:
+                neighbor = cell + offset
+                # Avoid repeats in path or moving too close to ghosts
+                if neighbor in parents or not passable(neighbor):
+                    continue
+
+                parents[neighbor] = cell
+                if neighbor in remaining:
+                    # Found a goal! Keep searching for the others
+                    paths[neighbor] = build_path(parents, neighbor)
+                    remaining.discard(neighbor)
+
+                queue.append(neighbor)
+
+        return paths
+
+class AStarSearch(Pathfinder):
+    """A* search on a binary heap, guided by an admissible heuristic (Manhattan distance by default)."""
+    name = "astar"
+
+    def __init__(self, stride, heuristic=None):
+        """
+        :param stride: Cells per row of the numbering (the maze's width plus one, see CellGrid).
+        :param heuristic: Function (cell, goal) -> lower bound on the steps between them (default: Manhattan distance).
+        """
+        super().__init__(stride)
+        self.heuristic = heuristic or self.distance
+
+    def search(self, start, goal, passable):
+        self.searches += 1
+        if start == goal:
+            return array('i', [start])
+        if not passable(goal):
+            return array('i')
+
+        parents = {start: None}
+        g = {start: 0}
+        # Ties on f go to the node with the larger g (closer to the goal); the counter keeps pops stable
+        counter = 0
+        heap = [(self.heuristic(start, goal), 0, counter, start)]
+        closed = set()
+        while heap:
+            _f, neg_g, _count, cell = heapq.heappop(heap)
+            if cell in closed:
+                continue  # Stale entry
+            closed.add(cell)
+            self.nodes_expanded += 1
+            if cell == goal:
+                return build_path(parents, goal)
+
+            next_g = -neg_g + 1
+            for offset in self.neighbors:
+                neighbor = cell + offset
+                if neighbor in closed or next_g >= g.get(neighbor, next_g + 1) or not passable(neighbor):
+                    continue
+                g[neighbor] = next_g
+                parents[neighbor] = cell
+                counter += 1
+                heapq.heappush(heap, (next_g + self.heuristic(neighbor, goal), -next_g, counter, neighbor))
+        return array('i')
+
+class BidirectionalSearch(Pathfinder):
+    """
+    Breadth-First Search from both ends at once, always growing the smaller frontier by one layer.
+    Each side only explores to about half the path length.
+    """
+    name = "bidirectional"
+
+    def search(self, start, goal, passable):
+        self.searches += 1
+        if start == goal:
+            return array('i', [start])
+        if not passable(goal):
+            return array('i')
+
+        # Every cell on the path but the start must be passable, so the backward side may still step onto the start
+        def allowed(cell):
+            return cell == start or passable(cell)
+
+        forward = {start: None}
+        backward = {goal: None}
+        forward_frontier = [start]
+        backward_frontier = [goal]
+
+        while forward_frontier and backward_frontier:
+            grow_forward = len(forward_frontier) <= len(backward_frontier)
+            frontier = forward_frontier if grow_forward else backward_frontier
+            parents, others = (forward, backward) if grow_forward else (backward, forward)
+
+            next_frontier = []
+            meetings = []
+            for cell in frontier:
+                self.nodes_expanded += 1
+                for offset in self.neighbors:
+                    neighbor = cell + offset
+                    if neighbor in parents or not allowed(neighbor):
+                        continue
+                    parents[neighbor] = cell
+                    next_frontier.append(neighbor)
+                    if neighbor in others:
+                        meetings.append(neighbor)
+            if meetings:
+                # Every meeting in this layer is the same distance from this side; pick the shortest join
+                return min((self._join(forward, backward, meeting) for meeting in meetings), key=len)
+
+            if grow_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return array('i')
+
+    def _join(self, forward, backward, meeting):
+        """Stitch start→meeting from the forward parents onto meeting→goal from the backward parents."""
+        path = build_path(forward, meeting)
+        cell = backward[meeting]
+        while cell is not None:
+            path.append(cell)
+            cell = backward[cell]
+        return path
+
+class JumpPointSearch(Pathfinder):
+    """
+    Jump Point Search for 4-connected grids.
+    A* over "jump points" only: from each node the search runs in a straight line until it hits
+    the goal, a dead end, or a cell where a new corridor opens up (a forced neighbour). Long open
+    corridors and rooms are crossed without putting their cells on the heap.
+    """
+    name = "jps"
+
+    def search(self, start, goal, passable):
+        self.searches += 1
+        if start == goal:
+            return array('i', [start])
+        if not passable(goal):
+            return array('i')
+
+        def walkable(cell):
+            return cell == start or passable(cell)
+
+        distance = self.distance
+        parents = {start: None}
+        g = {start: 0}
+        counter = 0
+        heap = [(distance(start, goal), 0, counter, start)]
+        closed = set()
+        while heap:
+            _f, neg_g, _count, cell = heapq.heappop(heap)
+            if cell in closed:
+                continue
+            closed.add(cell)
+            self.nodes_expanded += 1
+            if cell == goal:
+                return self._expand(build_path(parents, goal))
+
+            for direction in self._directions(cell, parents[cell]):
+                jump_point = self._jump(cell, direction, goal, walkable)
+                if jump_point is None or jump_point in closed:
+                    continue
+                next_g = -neg_g + distance(cell, jump_point)
+                if next_g < g.get(jump_point, next_g + 1):
+                    g[jump_point] = next_g
+                    parents[jump_point] = cell
+                    counter += 1
+                    heapq.heappush(heap, (next_g + distance(jump_point, goal), -next_g, counter, jump_point))
+        return array('i')
+
+    def _step(self, cell, target):
+        """The offset of one step along the straight line from cell towards target."""
+        step = 1 if abs(target - cell) < self.stride else self.stride
+        return step if target > cell else -step
+
+    def _directions(self, cell, parent):
+        """Directions worth searching from a node, pruned by the direction it was reached from."""
+        if parent is None:
+            return self.neighbors
+        step = self._step(parent, cell)
+        if abs(step) == 1:
+            return (step, self.stride, -self.stride)
+        return (step, 1, -1)
+
+    def _jump(self, cell, direction, goal, walkable):
+        """
+        Walk from cell in a straight line; return the first jump point found, or None at a dead end.
+        Vertical walks also stop where a horizontal walk would find a jump point.
+        """
+        stride = self.stride
+        while True:
+            cell += direction
+            if not walkable(cell):
+                return None
+            if cell == goal:
+                return cell
+            if direction == 1 or direction == -1:
+                # A corridor opens above or below that was walled off one step back
+                if (walkable(cell - stride) and not walkable(cell - direction - stride)) or \
+                        (walkable(cell + stride) and not walkable(cell - direction + stride)):
+                    return cell
+            else:
+                if (walkable(cell - 1) and not walkable(cell - 1 - direction)) or \
+                        (walkable(cell + 1) and not walkable(cell + 1 - direction)):
+                    return cell
+                if self._jump(cell, 1, goal, walkable) or self._jump(cell, -1, goal, walkable):
+                    return cell
+
+    def _expand(self, jump_points):
+        """Fill in the straight runs between consecutive jump points."""
+        path = array('i', jump_points[:1])
+        for target in jump_points[1:]:
+            cell = path[-1]
+            step = self._step(cell, target)
+            while cell != target:
+                cell += step
+                path.append(cell)
+        return path
+
+class _DStarLitePlanner:
+    """
+    D* Lite search state towards one goal.
+    The search runs backwards from the goal, so g holds each cell's distance to the goal and a
+    moving start only shifts the heap keys (by km) instead of invalidating them. Stepping into a
+    cell costs 1 if it is passable; cells that aren't are left out of the search, except for the
+    start, which is where the agent stands.
+    """
+    def __init__(self, goal, neighbors, distance):
+        """
+        :param goal: The cell to plan towards.
+        :param neighbors: Offsets from a cell to its neighbours.
+        :param distance: Function (cell, cell) -> Manhattan distance, the heuristic.
+        """
+        self.goal = goal
+        self.neighbors = neighbors
+        self.distance = distance
+        self.start = None  # Start of the last plan
+        self.km = 0  # Heuristic drift from the start moving since the keys were computed
+        self.g = {}
+        self.rhs = {goal: 0}  # One-step lookahead of g
+        self.queued = {}  # Inconsistent cell -> its key in the heap (other heap entries are stale)
+        self.heap = []
+        self.counter = 0
+        self.pending = set()  # Cells whose passability may have changed since the last plan
+        self.seen = {}  # Passability of cells when they were last pending, to skip ones that didn't change
+        self.passable = None
+
+    def _key(self, cell):
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return best + self.distance(self.start, cell) + self.km, best
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        self.counter += 1
+        heapq.heappush(self.heap, (key, self.counter, cell))
+
+    def _in_search(self, cell):
+        return cell == self.goal or cell == self.start or self.passable(cell)
+
+    def _update(self, cell):
+        """Recompute a cell's rhs from its neighbours and queue it if it is now inconsistent."""
+        self.queued.pop(cell, None)
+        if not self._in_search(cell):
+            return
+        if cell != self.goal:
+            best = INF
+            for offset in self.neighbors:
+                neighbor = cell + offset
+                g = self.g.get(neighbor, INF)
+                if g + 1 < best and self.passable(neighbor):
+                    best = g + 1
+            self.rhs[cell] = best
+        if self.g.get(cell, INF) != self.rhs.get(cell, INF):
+            self._push(cell)
+
+    def _update_around(self, cell):
+        """Update the cells that can step into cell, after its g changed."""
+        if not self.passable(cell):
+            return  # Nothing paths into an impassable cell
+        for offset in self.neighbors:
+            self._update(cell + offset)
+
+    def _top(self):
+        while self.heap:
+            key, _count, cell = self.heap[0]
+            if self.queued.get(cell) == key:
+                return key, cell
+            heapq.heappop(self.heap)
+        return (INF, INF), None
+
+    def _compute(self):
+        """Settle cells until the start's distance is known. Returns the number of cells expanded."""
+        expanded = 0
+        start = self.start
+        while True:
+            key, cell = self._top()
+            if cell is None or not (key < self._key(start) or self.rhs.get(start, INF) > self.g.get(start, INF)):
+                return expanded
+            expanded += 1
+            new_key = self._key(cell)
+            if key < new_key:
+                self._push(cell)  # Key was computed before the start moved
+            elif self.g.get(cell, INF) > self.rhs[cell]:
+                # Overconsistent: its distance went down, settle it
+                self.g[cell] = self.rhs[cell]
+                del self.queued[cell]
+                self._update_around(cell)
+            else:
+                # Underconsistent: its distance went up, reopen it and everything that went through it
+                self.g[cell] = INF
+                self._update(cell)
+                self._update_around(cell)
+
+    def plan(self, start, passable):
+        """
+        Repair the search for any pending changes and the new start, then read off a path.
+        Returns (array('i') path from start→goal, empty if there is none, cells expanded).
+        """
+        self.passable = passable
+        if self.start is None:
+            self.start = start
+            self._push(self.goal)
+        else:
+            self.km += self.distance(self.start, start)
+            self.start = start
+            # A cell's own rhs and the rhs of every cell that can step into it depend on whether it's passable
+            changed = set()
+            g = self.g
+            neighbors = self.neighbors
+            for cell in self.pending:
+                if g.get(cell, INF) == INF and all(g.get(cell + offset, INF) == INF for offset in neighbors):
+                    # Nothing settled here yet, so no distance depends on this cell
+                    self.seen.pop(cell, None)
+                    continue
+                now = passable(cell)
+                if self.seen.get(cell) == now:
+                    continue  # Flipped back, or a neighbour changed without affecting it
+                self.seen[cell] = now
+                changed.add(cell)
+                for offset in neighbors:
+                    changed.add(cell + offset)
+            self.pending.clear()
+            changed.add(start)  # Its rhs was not kept up to date while it wasn't the start
+            for cell in changed:
+                self._update(cell)
+
+        expanded = self._compute()
+        if self.rhs.get(start, INF) == INF:
+            return array('i'), expanded
+
+        # Walk downhill in g from the start
+        path = array('i', [start])
+        cell = start
+        while cell != self.goal and len(path) <= len(self.g):
+            best, best_g = None, INF
+            for offset in self.neighbors:
+                neighbor = cell + offset
+                g = self.g.get(neighbor, INF)
+                if g < best_g and passable(neighbor):
+                    best, best_g = neighbor, g
+            if best is None:
+                return array('i'), expanded
+            path.append(best)
+            cell = best
+        return (path, expanded) if cell == self.goal else (array('i'), expanded)
+
+class IncrementalSearch(Pathfinder):
+    """
+    D* Lite with a planner kept per goal.
+    Between searches the planners are told which cells changed (ghosts moving) and repair only the
+    distances those changes affect, so a search costs about as much as what changed around the
+    agent rather than the size of the maze. The least recently searched planners are dropped once
+    more than max_planners goals are tracked.
+    """
+    name = "dstar"
+    incremental = True
+
+    def __init__(self, stride, max_planners=8):
+        """
+        :param stride: Cells per row of the numbering (the maze's width plus one, see CellGrid).
+        :param max_planners: Goals to keep search state for.
+        """
+        super().__init__(stride)
+        self.max_planners = max_planners
+        self.planners = {}  # goal -> _DStarLitePlanner, least recently searched first
+
+    def cells_changed(self, cells):
+        for planner in self.planners.values():
+            planner.pending.update(cells)
+
+    def reset(self):
+        self.planners.clear()
+
+    def search(self, start, goal, passable):
+        self.searches += 1
+        if start == goal:
+            return array('i', [start])
+        if not passable(goal):
+            return array('i')
+
+        planner = self.planners.pop(goal, None) or _DStarLitePlanner(goal, self.neighbors, self.distance)
+        self.planners[goal] = planner
+        while len(self.planners) > self.max_planners:
+            del self.planners[next(iter(self.planners))]
+
+        path, expanded = planner.plan(start, passable)
+        self.nodes_expanded += expanded
+        return path
+
+PATHFINDERS = {backend.name: backend for backend in
+               (BreadthFirstSearch, AStarSearch, BidirectionalSearch, JumpPointSearch, IncrementalSearch)}
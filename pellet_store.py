@@ -0,0 +1,118 @@
+class PelletStore:
+    """
+    Set of pellet cells bucketed into square blocks of the grid.
+    Behaves like a set of cells (in, len, iteration, remove), and answers nearest-pellet queries by
+    searching outward from a cell one ring of buckets at a time.
+    Cells are numbered y * stride + x, as CellGrid numbers them.
+    """
+    BUCKET_SIZE = 4  # Width and height of a bucket in grid cells
+
+    def __init__(self, stride, pellets=(), bucket_size=BUCKET_SIZE):
+        """
+        Initializes the store.
+        :param stride: Cells per row of the numbering (the maze's width plus one, see CellGrid).
+        :param pellets: Initial pellet cells.
+        :param bucket_size: Width and height of a bucket in grid cells.
+        """
+        self.stride = stride
+        self.bucket_size = bucket_size
+        self._buckets = {}  # (bucket x, bucket y) -> set of pellets in that bucket
+        self._count = 0
+        # Bounds of the occupied buckets, so ring searches know when to stop
+        self._min_bx = self._min_by = self._max_bx = self._max_by = 0
+        for pellet in pellets:
+            self.add(pellet)
+
+    def _bucket_of(self, pos):
+        """Return the bucket coordinates containing a cell."""
+        y, x = divmod(pos, self.stride)
+        return x // self.bucket_size, y // self.bucket_size
+
+    def add(self, pos):
+        """Add a pellet on a cell."""
+        key = self._bucket_of(pos)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if not self._buckets:
+                self._min_bx, self._min_by = self._max_bx, self._max_by = key
+            else:
+                self._min_bx, self._max_bx = min(self._min_bx, key[0]), max(self._max_bx, key[0])
+                self._min_by, self._max_by = min(self._min_by, key[1]), max(self._max_by, key[1])
+            bucket = self._buckets[key] = set()
+        if pos not in bucket:
+            bucket.add(pos)
+            self._count += 1
+
+    def remove(self, pos):
+        """Remove the pellet on a cell, raising KeyError if there is none."""
+        key = self._bucket_of(pos)
+        bucket = self._buckets[key]
+        bucket.remove(pos)
+        self._count -= 1
+        if not bucket:
+            del self._buckets[key]
+
+    def discard(self, pos):
+        """Remove the pellet on a cell if there is one."""
+        if pos in self:
+            self.remove(pos)
+
+    def __contains__(self, pos):
+        bucket = self._buckets.get(self._bucket_of(pos))
+        return bucket is not None and pos in bucket
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for bucket in self._buckets.values():
+            yield from bucket
+
+    def _ring(self, bx, by, radius):
+        """Yield the non-empty buckets exactly radius buckets away (Chebyshev distance) from bucket (bx, by)."""
+        if radius == 0:
+            bucket = self._buckets.get((bx, by))
+            if bucket:
+                yield bucket
+            return
+        for kx in range(bx - radius, bx + radius + 1):
+            for ky in (by - radius, by + radius):
+                bucket = self._buckets.get((kx, ky))
+                if bucket:
+                    yield bucket
+        for ky in range(by - radius + 1, by + radius):
+            for kx in (bx - radius, bx + radius):
+                bucket = self._buckets.get((kx, ky))
+                if bucket:
+                    yield bucket
+
+    def nearest(self, pos, k=1):
+        """
+        Return up to k pellets closest to pos by Manhattan distance, closest first (ties go to the
+        smaller x, then the smaller y).
+        Only the rings of buckets that can still hold a closer pellet are visited.
+        :param pos: The cell to search from.
+        :param k: Number of pellets to return.
+        """
+        if not self._count or k <= 0:
+            return []
+        stride = self.stride
+        y, x = divmod(pos, stride)
+        bx, by = self._bucket_of(pos)
+        # Furthest ring that can still contain a bucket
+        max_radius = max(bx - self._min_bx, self._max_bx - bx, by - self._min_by, self._max_by - by, 0)
+
+        candidates = []
+        for radius in range(max_radius + 1):
+            for bucket in self._ring(bx, by, radius):
+                for p in bucket:
+                    py, px = divmod(p, stride)
+                    candidates.append((abs(px - x) + abs(py - y), px, p))
+            # Any pellet beyond this ring is more than radius * bucket_size cells away
+            if len(candidates) >= k:
+                candidates.sort()
+                if candidates[k - 1][0] <= radius * self.bucket_size:
+                    break
+
+        candidates.sort()
+        return [p for _, _, p in candidates[:k]]
@@ -0,0 +1,67 @@
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+
+class Perception:
+    """
+    Answers "how many agents are near this cell" for every agent from one summed-area table.
+    The table is built from the occupancy layer once per tick (refresh()), after which the count
+    in any square window is four table lookups, whatever the radius.
+    Only the rows and columns that hold an agent get a place in the table, so building it costs
+    at most (agents x agents) and never depends on the size of the maze.
+    Counts reflect where agents stood when the table was last refreshed.
+    """
+    def __init__(self, occupancy, radius=2):
+        """
+        Initializes the service.
+        :param occupancy: The Occupancy layer to count agents from.
+        :param radius: Default half width of the square window agents look in.
+        """
+        self.occupancy = occupancy
+        self.radius = radius
+        self.xs = []  # Sorted columns holding an agent
+        self.ys = []  # Sorted rows holding an agent
+        self.table = [[0]]  # table[j][i] = agents in the first j rows and first i columns of xs/ys
+        self._version = None  # Occupancy version the table was built from
+
+    def refresh(self):
+        """Rebuild the table if any agent moved since the last refresh."""
+        if self._version == self.occupancy.version:
+            return
+        stride = self.occupancy.stride
+        cells = [(divmod(cell, stride), len(agents)) for cell, agents in self.occupancy.cells.items()]
+        self.xs = sorted({x for (y, x), count in cells})
+        self.ys = sorted({y for (y, x), count in cells})
+        column = {x: i for i, x in enumerate(self.xs)}
+        row = {y: j for j, y in enumerate(self.ys)}
+
+        grid = [[0] * len(self.xs) for _ in self.ys]
+        for (y, x), count in cells:
+            grid[row[y]][column[x]] = count
+
+        above = [0] * (len(self.xs) + 1)
+        table = [above]
+        for counts in grid:
+            above = [a + b for a, b in zip(above, chain((0,), accumulate(counts)))]
+            table.append(above)
+        self.table = table
+        self._version = self.occupancy.version
+
+    def _count_in(self, left, top, right, bottom):
+        """Agents in the cells left <= x <= right, top <= y <= bottom."""
+        i0, i1 = bisect_left(self.xs, left), bisect_right(self.xs, right)
+        j0, j1 = bisect_left(self.ys, top), bisect_right(self.ys, bottom)
+        table = self.table
+        return table[j1][i1] - table[j0][i1] - table[j1][i0] + table[j0][i0]
+
+    def count(self, pos, radius=None):
+        """
+        Return the number of agents within radius cells of a cell, not counting ones on the cell itself.
+        :param pos: The cell, numbered like the occupancy layer's.
+        :param radius: Half width of the window, defaults to the service's radius.
+        """
+        if self._version is None:
+            self.refresh()
+        if radius is None:
+            radius = self.radius
+        y, x = divmod(pos, self.occupancy.stride)
+        return self._count_in(x - radius, y - radius, x + radius, y + radius) - self._count_in(x, y, x, y)
@@ -0,0 +1,303 @@
+import pygame
+from collections import OrderedDict
+from asset_manager import assets
+from ghost import Ghost
+from minimap import Minimap
+
+class Renderer:
+    """
+    Draws a GameEngine onto a window through a camera that follows Pac-Man, redrawing only what changed.
+    The level is rendered in square chunks of cells (walls plus the pellets not eaten yet) that are
+    cached and erased as pellets are eaten. When the camera moves, the background is put together from
+    the chunks in view; otherwise each frame the background is restored under last frame's sprites,
+    path and HUD, the new ones are drawn, and only those rectangles are pushed to the display.
+    Only cells, pellets and ghosts in view are drawn, so frame time doesn't grow with the level.
+    """
+    PELLET_COLOR = (255, 255, 255)
+    PATH_COLOR = (0, 255, 0)
+    PROFILE_COLOR = (255, 255, 0)
+    PROFILE_REFRESH = 10  # Ticks between updates of the profiler overlay's text
+    CHUNK = 16  # Width and height of a pre-rendered chunk in cells
+    PREFETCH = 2  # Chunks just outside the view rendered ahead of time per frame
+    MINIMAP_SIZE = 160  # Longest side of the minimap in pixels
+
+    def __init__(self, window, engine, cell):
+        """
+        Initializes the renderer.
+        :param window: Pygame display surface.
+        :param engine: The GameEngine to draw.
+        :param cell: Width and height of a grid cell in pixels.
+        """
+        self.window = window
+        self.engine = engine
+        self.cell = cell
+        self.tiles = None  # Tile images scaled to the cell size
+        self.ghost_image = None  # Ghost sprite scaled to the cell size
+        self.camera = (0, 0)  # Top left cell in view
+        self.view = (0, 0)  # Width and height of the view in cells
+        self._chunks = OrderedDict()  # (chunk x, chunk y) -> rendered chunk, least recently used first
+        self.max_chunks = 0  # Rendered chunks kept, enough for two views' worth
+        self.background = None  # Chunks in view, as composed for self.camera
+        self._eaten_drawn = 0  # How many of engine.eaten_pellets are already erased
+        self._overlay_rects = []  # Areas drawn over the background last frame
+        self._drawn_tick = None
+        self.minimap = None  # Built the first time the level doesn't fit the window
+        self.show_minimap = True
+        self.show_profile = False  # Draw the engine profiler's percentiles over the game
+        self._profile_font = None
+        self._profile_surfaces = []  # Rendered cells of the profiler overlay, row by row
+        self._profile_tick = None  # Tick the overlay text was rendered at
+
+    @staticmethod
+    def fit(level, max_window=1000, max_cell=20, min_cell=8):
+        """
+        Pick a cell size that shows as much of a level as possible, and the window size to go with it.
+        Levels that don't fit max_window at min_cell pixels per cell are scrolled by the camera.
+        Returns (cell, (window width, window height)).
+        """
+        cell = max(min_cell, min(max_cell, max_window // max(level.width, level.height)))
+        return cell, (min(level.width * cell, max_window), min(level.height * cell, max_window))
+
+    def toggle_profile(self):
+        """Show or hide the profiler overlay, redrawing on the next frame."""
+        self.show_profile = not self.show_profile
+        self._profile_tick = None
+        self._drawn_tick = None
+
+    def toggle_minimap(self):
+        """Show or hide the minimap (it is only ever shown when the level doesn't fit the window)."""
+        self.show_minimap = not self.show_minimap
+        self._drawn_tick = None
+
+    def invalidate(self):
+        """Rebuild the background and redraw the whole window on the next frame (after a resize or expose event)."""
+        self.background = None
+
+    def grid_to_pixel(self, cell):
+        """Convert grid coordinates to pixel coordinates on the window (center of cell)"""
+        x, y = cell
+        return ((x - self.camera[0]) * self.cell + self.cell // 2,
+                (y - self.camera[1]) * self.cell + self.cell // 2)
+
+    def _cell_rect(self, pos):
+        """Pixel rectangle of the window covered by a grid cell."""
+        return pygame.Rect((pos[0] - self.camera[0]) * self.cell, (pos[1] - self.camera[1]) * self.cell,
+                           self.cell, self.cell)
+
+    def _in_view(self, pos):
+        """Return whether a grid cell is on screen."""
+        x, y = pos[0] - self.camera[0], pos[1] - self.camera[1]
+        return 0 <= x < self.view[0] and 0 <= y < self.view[1]
+
+    # ---------- Layers ----------
+    def _build_layers(self):
+        """Load the sprites, size the view to the window and compose the background around Pac-Man."""
+        size = (self.cell, self.cell)
+        self.tiles = [assets.image(name, size) for name in self.engine.level.TILE_IMAGES]
+        self.ghost_image = assets.image(Ghost.IMAGE, size)
+        width, height = self.window.get_size()
+        self.view = (-(-width // self.cell), -(-height // self.cell))
+        chunks_in_view = (self.view[0] // self.CHUNK + 2) * (self.view[1] // self.CHUNK + 2)
+        self.max_chunks = 2 * chunks_in_view
+        level = self.engine.level
+        if self.minimap is None and (level.width > self.view[0] or level.height > self.view[1]):
+            self.minimap = Minimap(level, self.MINIMAP_SIZE)
+        self._follow()
+        self._compose()
+
+    def _render_chunk(self, key):
+        """Render the walls and remaining pellets of one chunk of cells."""
+        level, maze, pellets = self.engine.level, self.engine.maze, self.engine.pellets
+        stride = self.engine.grid.stride
+        cell, size = self.cell, self.CHUNK
+        surface = pygame.Surface((size * cell, size * cell))
+        surface.fill((0, 0, 0))  # Black past the edge of the level
+        left, top = key[0] * size, key[1] * size
+        radius = cell // 8  # Cells under 8 pixels are too small to show pellets
+        for y in range(top, min(top + size, level.height)):
+            row = maze[y]
+            for x in range(left, min(left + size, level.width)):
+                # Agents are drawn as sprites, so anything that isn't a wall gets the empty tile
+                wall = row[x] == 1
+                surface.blit(self.tiles[1 if wall else 0], ((x - left) * cell, (y - top) * cell))
+                if radius and not wall and y * stride + x in pellets:
+                    center = ((x - left) * cell + cell // 2, (y - top) * cell + cell // 2)
+                    pygame.draw.circle(surface, self.PELLET_COLOR, center, radius)
+        return surface
+
+    def _chunk(self, key):
+        """Return a rendered chunk, rendering it if it isn't cached."""
+        chunks = self._chunks
+        surface = chunks.get(key)
+        if surface is not None:
+            chunks.move_to_end(key)
+            return surface
+        surface = chunks[key] = self._render_chunk(key)
+        if len(chunks) > self.max_chunks:
+            chunks.popitem(last=False)
+        return surface
+
+    def _chunks_in_view(self, margin=0):
+        """Return the keys of the chunks overlapping the view, widened by margin chunks, within the level."""
+        size, level = self.CHUNK, self.engine.level
+        left = max(0, self.camera[0] // size - margin)
+        top = max(0, self.camera[1] // size - margin)
+        right = min(-(-level.width // size), (self.camera[0] + self.view[0] - 1) // size + 1 + margin)
+        bottom = min(-(-level.height // size), (self.camera[1] + self.view[1] - 1) // size + 1 + margin)
+        return [(cx, cy) for cy in range(top, bottom) for cx in range(left, right)]
+
+    def _compose(self):
+        """Build the background for the current camera position from the chunks in view."""
+        self.background = pygame.Surface(self.window.get_size())
+        self.background.fill((0, 0, 0))
+        span = self.CHUNK * self.cell
+        for key in self._chunks_in_view():
+            self.background.blit(self._chunk(key), ((key[0] * self.CHUNK - self.camera[0]) * self.cell,
+                                                    (key[1] * self.CHUNK - self.camera[1]) * self.cell,
+                                                    span, span))
+
+    def _prefetch(self):
+        """Render a few of the chunks just outside the view, so scrolling onto them doesn't stall a frame."""
+        rendered = 0
+        for key in self._chunks_in_view(margin=1):
+            if rendered == self.PREFETCH:
+                break
+            if key not in self._chunks:
+                self._chunk(key)
+                rendered += 1
+
+    def _follow(self):
+        """
+        Move the camera so Pac-Man stays in the middle half of the view, keeping the view inside the level.
+        Returns whether the camera moved.
+        """
+        level = self.engine.level
+        camera = []
+        for pos, start, view, size in zip(self.engine.pacman.pos, self.camera, self.view, (level.width, level.height)):
+            margin = view // 4
+            if pos < start + margin:
+                start = pos - margin
+            elif pos >= start + view - margin:
+                start = pos - view + margin + 1
+            camera.append(max(0, min(start, size - view)))
+        moved = tuple(camera) != self.camera
+        self.camera = tuple(camera)
+        return moved
+
+    def _erase_eaten_pellets(self):
+        """
+        Paint the empty tile over every pellet eaten since the last frame, in its cached chunk and on the
+        background; return the rects of the window that changed. Chunks rendered later start without them.
+        """
+        rects = []
+        eaten = self.engine.eaten_pellets
+        size, cell, xy = self.CHUNK, self.cell, self.engine.grid.xy
+        for pellet in map(xy, eaten[self._eaten_drawn:]):
+            key = (pellet[0] // size, pellet[1] // size)
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                chunk.blit(self.tiles[0], ((pellet[0] - key[0] * size) * cell, (pellet[1] - key[1] * size) * cell))
+            if self.background is not None and self._in_view(pellet):
+                rects.append(self.background.blit(self.tiles[0], self._cell_rect(pellet)))
+        self._eaten_drawn = len(eaten)
+        return rects
+
+    def _draw_overlay(self, pacimage):
+        """Draw the path, agents and HUD on top of the background; return the rects they cover."""
+        engine = self.engine
+        rects = []
+
+        # Draw the part of Pac-Man's path that is on screen (optional visualization)
+        path = [engine.grid.xy(cell) for cell in engine.pacman.path]
+        for i in range(len(path) - 1):
+            if self._in_view(path[i]) or self._in_view(path[i + 1]):
+                start = self.grid_to_pixel(path[i])
+                end = self.grid_to_pixel(path[i + 1])
+                rects.append(pygame.draw.line(self.window, self.PATH_COLOR, start, end, 2))
+
+        # Draw Pac-Man
+        rects.append(self.window.blit(pacimage, self._cell_rect(engine.pacman.pos)))
+
+        # Draw the ghosts in view
+        for ghost in engine.ghosts:
+            if self._in_view(ghost.get_position()):
+                rects.append(self.window.blit(self.ghost_image, self._cell_rect(ghost.get_position())))
+
+        # Draw score and stats
+        width, height = self.window.get_size()
+        rects.extend(engine.score_tracker.draw(self.window, len(engine.pellets), width, height))
+
+        if self.minimap is not None and self.show_minimap:
+            size = self.minimap.surface.get_size()
+            rects.append(self.minimap.draw(self.window, (width - size[0] - 8, height - size[1] - 8), engine.pacman.pos,
+                                           [ghost.get_position() for ghost in engine.ghosts],
+                                           self.camera + self.view))
+        if self.show_profile:
+            rects.append(self._draw_profile(height))
+        return rects
+
+    def _draw_profile(self, height):
+        """Draw a table of the profiler's percentiles in the bottom left corner; return the rect covered."""
+        ticks = self.engine.ticks
+        if self._profile_tick is None or ticks - self._profile_tick >= self.PROFILE_REFRESH:
+            if self._profile_font is None:
+                self._profile_font = pygame.font.Font(None, 16)
+            rows = [["", "p50", "p95", "p99", "max"]]
+            profiler = self.engine.profiler
+            if profiler.enabled:
+                for metric, stats in profiler.summary().items():
+                    # Phases are timed in milliseconds; counters (replans, nodes/search) have no unit
+                    label = f"{metric} (ms)" if metric in profiler.timings else metric
+                    rows.append([label] + [f"{stats[key]:.3f}" for key in rows[0][1:]])
+            self._profile_surfaces = [[self._profile_font.render(text, True, self.PROFILE_COLOR) for text in row]
+                                      for row in rows]
+            self._profile_tick = ticks
+
+        # Lay the cells out in columns as wide as their widest cell
+        rows = self._profile_surfaces
+        widths = [max(row[i].get_width() for row in rows) + 8 for i in range(len(rows[0]))]
+        line_height = self._profile_font.get_linesize()
+        box = pygame.Rect(0, height - line_height * len(rows) - 8, sum(widths) + 8, line_height * len(rows) + 8)
+        self.window.fill((0, 0, 0), box)
+        for j, row in enumerate(rows):
+            x = 4
+            for surface, width in zip(row, widths):
+                self.window.blit(surface, (x, box.top + 4 + j * line_height))
+                x += width
+        return box
+
+    def draw(self, pacimage):
+        """
+        Draw the current game state. Does nothing if the game has not ticked since the last frame.
+        :param pacimage: Pac-Man sprite for this frame.
+        """
+        ticks = self.engine.ticks
+        if self.background is not None and self._drawn_tick == ticks:
+            return
+        profiler = self.engine.profiler
+        start = profiler.clock()
+
+        erased = self._erase_eaten_pellets()
+        if self.background is None:
+            self._build_layers()
+            moved = True
+        else:
+            moved = self._follow()
+            if moved:
+                self._compose()
+
+        if moved:
+            # Everything on screen shifted, so push the whole window
+            self.window.blit(self.background, (0, 0))
+            self._overlay_rects = self._draw_overlay(pacimage)
+            pygame.display.flip()
+        else:
+            # Restore the background under last frame's overlay and wherever pellets were eaten
+            dirty = self._overlay_rects + erased
+            for rect in dirty:
+                self.window.blit(self.background, rect, rect)
+            self._overlay_rects = self._draw_overlay(pacimage)
+            pygame.display.update(dirty + self._overlay_rects)
+        self._prefetch()
+        profiler.lap("draw", start)
+        self._drawn_tick = ticks
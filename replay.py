@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Compact binary replays of headless games.
+
+A replay file holds a header (seed, engine options, walls and start cells), then one chunk per
+keyframe interval: a full-state keyframe followed by a few bytes per tick saying how each agent
+moved, and finally an index of chunk offsets. Seeking to a tick decodes one keyframe and at most
+one interval of moves. A file that was cut short (e.g. the game crashed) stays readable up to
+its last complete tick: the chunks are found by scanning instead of through the index.
+
+Usage: python3 replay.py replays/game.pmr --seek 250 --verify
+"""
+
+import argparse
+import json
+import struct
+import time
+
+from game_agent import GameAgent, GameState
+from game_engine import GameEngine
+
+MAGIC = b"PACRPLY1"
+INDEX_MAGIC = b"PRIX"
+HEADER = struct.Struct("<qHHBHHHH")  # seed (signed), width, height, ghosts, keyframe interval, pellet value, Pac-Man start x, y
+KEYFRAME = struct.Struct("<IHHII")  # tick, Pac-Man x, y, score, deaths; then ghost cells and the pellet bitmap
+POINT = struct.Struct("<HH")
+LENGTH = struct.Struct("<I")
+OFFSET = struct.Struct("<Q")
+INDEX_TAIL = struct.Struct("<II4s")  # chunks, ticks, INDEX_MAGIC
+# Largest level (in cells) worth recording: the header lists every wall and each keyframe holds the
+# whole pellet bitmap, so bigger levels take seconds to start recording and megabytes per keyframe
+MAX_CELLS = 1_000_000
+
+# Each tick is a flags byte, then a 4-bit move code per agent: Pac-Man's own move, then the ghosts' (unless Pac-Man died)
+DEATH = 1  # Pac-Man was caught, so every agent ends the tick back on its start cell
+EATEN = 2  # Pac-Man ate the pellet on the cell its move took it to
+STAY = 0
+JUMP = 15  # The agent's cell follows the codes as two uint16s
+MOVES = [(0, 0)] + GameAgent.DIRECTIONS  # Move code -> step
+CODES = {step: code for code, step in enumerate(MOVES)}
+
+def _pack_cells(cells, width, height):
+    """Pack a set of cells into a row-major bitmap."""
+    bits = bytearray((width * height + 7) // 8)
+    for x, y in cells:
+        i = y * width + x
+        bits[i >> 3] |= 1 << (i & 7)
+    return bytes(bits)
+
+def _unpack_cells(bits, width, height):
+    """Return the set of cells set in a row-major bitmap."""
+    cells = set()
+    for byte_index, byte in enumerate(bits):
+        while byte:
+            low = byte & -byte
+            i = byte_index * 8 + low.bit_length() - 1
+            if i < width * height:
+                cells.add((i % width, i // width))
+            byte ^= low
+    return cells
+
+class ReplayState:
+    """Where everything stood after one tick of a replay."""
+    def __init__(self, tick, pacman, ghosts, pellets, score, deaths):
+        self.tick = tick
+        self.pacman = pacman
+        self.ghosts = ghosts  # Ghost cells in the engine's ghost order
+        self.pellets = pellets  # Set of the remaining pellet cells
+        self.score = score
+        self.deaths = deaths
+
+    @classmethod
+    def from_engine(cls, engine):
+        """Snapshot a GameEngine in the same form."""
+        return cls(engine.ticks, engine.pacman.pos, [ghost.pos for ghost in engine.ghosts],
+                   set(map(engine.grid.xy, engine.pellets)), engine.score_tracker.get_score(), engine.deaths)
+
+    def copy(self):
+        return ReplayState(self.tick, self.pacman, list(self.ghosts), set(self.pellets), self.score, self.deaths)
+
+    def __eq__(self, other):
+        return isinstance(other, ReplayState) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return (f"ReplayState(tick={self.tick}, pacman={self.pacman}, ghosts={self.ghosts}, "
+                f"pellets={len(self.pellets)}, score={self.score}, deaths={self.deaths})")
+
+class ReplayWriter:
+    """
+    Records a GameEngine's game as it is played.
+    Create it before the first step, call record() after every engine.step() and close() at the end.
+    """
+    def __init__(self, path, engine, keyframe_interval=64):
+        """
+        Writes the header and the first keyframe.
+        :param path: File to write the replay to.
+        :param engine: The GameEngine to record, before its first step.
+        :param keyframe_interval: Ticks between full-state keyframes; seeking decodes at most this many.
+        """
+        self.path = path
+        self.engine = engine
+        self.keyframe_interval = keyframe_interval
+        self.width, self.height = len(engine.maze[0]), len(engine.maze)
+        self.offsets = []  # File offset of every keyframe
+        self.ticks = 0
+
+        options = dict(engine.options)
+        options["custom_maze"] = options.pop("maze") is not None
+        options = json.dumps(options).encode()
+        walls = {(x, y) for y in range(self.height) for x in range(self.width) if engine.maze[y][x] == 1}
+
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.file.write(HEADER.pack(engine.seed, self.width, self.height, len(engine.ghosts), keyframe_interval,
+                                    engine.score_tracker.pellet_value, *engine.pacman.start_pos))
+        for ghost in engine.ghosts:
+            self.file.write(POINT.pack(*ghost.start_pos))
+        self.file.write(_pack_cells(walls, self.width, self.height))
+        self.file.write(LENGTH.pack(len(options)) + options)
+
+        self._remember()
+        self._keyframe()
+
+    def _remember(self):
+        """Keep what the next tick's moves are measured from."""
+        engine = self.engine
+        self.pacman = engine.pacman.pos
+        self.ghosts = [ghost.pos for ghost in engine.ghosts]
+        self.deaths = engine.deaths
+        self.eaten = len(engine.eaten_pellets)
+
+    def _keyframe(self):
+        engine = self.engine
+        self.offsets.append(self.file.tell())
+        self.file.write(KEYFRAME.pack(engine.ticks, *engine.pacman.pos, engine.score_tracker.get_score(), engine.deaths))
+        for ghost in engine.ghosts:
+            self.file.write(POINT.pack(*ghost.pos))
+        self.file.write(_pack_cells(map(engine.grid.xy, engine.pellets), self.width, self.height))
+        self.file.flush()
+
+    def _encode(self, old, new, codes, jumps):
+        code = CODES.get((new[0] - old[0], new[1] - old[1]), JUMP)
+        codes.append(code)
+        if code == JUMP:
+            jumps.append(POINT.pack(*new))
+
+    def record(self):
+        """Append the tick the engine just played."""
+        engine = self.engine
+        died = engine.deaths != self.deaths
+        eaten = len(engine.eaten_pellets) != self.eaten
+        flags = (DEATH if died else 0) | (EATEN if eaten else 0)
+
+        codes, jumps = [], []
+        if died:
+            # Pac-Man's own move only matters for the pellet it ate before being sent back to the start
+            self._encode(self.pacman, engine.grid.xy(engine.eaten_pellets[-1]) if eaten else self.pacman, codes, jumps)
+        else:
+            self._encode(self.pacman, engine.pacman.pos, codes, jumps)
+            for old, ghost in zip(self.ghosts, engine.ghosts):
+                self._encode(old, ghost.pos, codes, jumps)
+
+        packed = bytearray([flags])
+        for i in range(0, len(codes), 2):
+            packed.append(codes[i] | (codes[i + 1] << 4 if i + 1 < len(codes) else 0))
+        self.file.write(packed)
+        for jump in jumps:
+            self.file.write(jump)
+
+        self._remember()
+        self.ticks += 1
+        if self.ticks % self.keyframe_interval == 0:
+            self._keyframe()
+
+    def close(self):
+        """Write the seek index and close the file."""
+        if self.file.closed:
+            return
+        for offset in self.offsets:
+            self.file.write(OFFSET.pack(offset))
+        self.file.write(INDEX_TAIL.pack(len(self.offsets), self.ticks, INDEX_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class Replay:
+    """A replay file loaded for playback and seeking."""
+    def __init__(self, path):
+        """
+        Reads the file and its index (or rebuilds the index if the file was cut short).
+        :param path: Replay file written by ReplayWriter.
+        """
+        with open(path, "rb") as f:
+            self.data = data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+
+        pos = len(MAGIC)
+        (self.seed, self.width, self.height, self.num_ghosts, self.keyframe_interval, self.pellet_value,
+         start_x, start_y) = HEADER.unpack_from(data, pos)
+        pos += HEADER.size
+        self.pacman_start = (start_x, start_y)
+        self.spawns = [POINT.unpack_from(data, pos + i * POINT.size) for i in range(self.num_ghosts)]
+        pos += self.num_ghosts * POINT.size
+        self._bitmap_size = (self.width * self.height + 7) // 8
+        self.walls = _unpack_cells(data[pos:pos + self._bitmap_size], self.width, self.height)
+        pos += self._bitmap_size
+        (length,) = LENGTH.unpack_from(data, pos)
+        pos += LENGTH.size
+        self.options = json.loads(data[pos:pos + length])
+        pos += length
+        self._keyframe_size = KEYFRAME.size + self.num_ghosts * POINT.size + self._bitmap_size
+
+        if data.endswith(INDEX_MAGIC):
+            chunks, self.ticks, _magic = INDEX_TAIL.unpack_from(data, len(data) - INDEX_TAIL.size)
+            start = len(data) - INDEX_TAIL.size - chunks * OFFSET.size
+            self.offsets = [OFFSET.unpack_from(data, start + i * OFFSET.size)[0] for i in range(chunks)]
+        else:
+            self.offsets, self.ticks = self._scan(pos)
+
+    def _record_end(self, pos):
+        """Offset just past the tick record at pos, or None if the file ends inside it."""
+        data = self.data
+        if pos >= len(data):
+            return None
+        agents = 1 if data[pos] & DEATH else 1 + self.num_ghosts
+        end = pos + 1 + (agents + 1) // 2
+        if end > len(data):
+            return None
+        jumps = sum(1 for i in range(agents) if (data[pos + 1 + (i >> 1)] >> (4 * (i & 1))) & 15 == JUMP)
+        end += jumps * POINT.size
+        return end if end <= len(data) else None
+
+    def _scan(self, pos):
+        """Find the keyframes and the number of complete ticks by walking the chunks."""
+        offsets = []
+        ticks = 0
+        while pos + self._keyframe_size <= len(self.data):
+            offsets.append(pos)
+            pos += self._keyframe_size
+            for _ in range(self.keyframe_interval):
+                end = self._record_end(pos)
+                if end is None:
+                    return offsets, ticks
+                pos = end
+                ticks += 1
+        return offsets, ticks
+
+    def _keyframe(self, index):
+        """Decode a keyframe into a fresh ReplayState."""
+        data = self.data
+        pos = self.offsets[index]
+        tick, x, y, score, deaths = KEYFRAME.unpack_from(data, pos)
+        pos += KEYFRAME.size
+        ghosts = [POINT.unpack_from(data, pos + i * POINT.size) for i in range(self.num_ghosts)]
+        pos += self.num_ghosts * POINT.size
+        pellets = _unpack_cells(data[pos:pos + self._bitmap_size], self.width, self.height)
+        return ReplayState(tick, (x, y), ghosts, pellets, score, deaths)
+
+    def _apply(self, state, pos):
+        """Advance state by the tick record at pos; return the offset of the next record."""
+        data = self.data
+        flags = data[pos]
+        died = flags & DEATH
+        agents = [state.pacman] if died else [state.pacman] + state.ghosts
+        codes = pos + 1
+        pos = codes + (len(agents) + 1) // 2
+
+        moved = []
+        for i, (x, y) in enumerate(agents):
+            code = (data[codes + (i >> 1)] >> (4 * (i & 1))) & 15
+            if code == JUMP:
+                moved.append(POINT.unpack_from(data, pos))
+                pos += POINT.size
+            else:
+                dx, dy = MOVES[code]
+                moved.append((x + dx, y + dy))
+
+        if flags & EATEN:
+            state.pellets.discard(moved[0])
+            state.score += self.pellet_value
+        if died:
+            state.pacman = self.pacman_start
+            state.ghosts = list(self.spawns)
+            state.deaths += 1
+        else:
+            state.pacman = moved[0]
+            state.ghosts = moved[1:]
+        state.tick += 1
+        return pos
+
+    def __len__(self):
+        """Number of ticks recorded."""
+        return self.ticks
+
+    def state_at(self, tick):
+        """
+        Return the state after a given tick (0 = before the first step).
+        Decodes the keyframe at or before the tick and the moves after it.
+        """
+        if not 0 <= tick <= self.ticks:
+            raise IndexError(f"tick {tick} is outside the replay (0-{self.ticks})")
+        index = min(tick // self.keyframe_interval, len(self.offsets) - 1)
+        state = self._keyframe(index)
+        pos = self.offsets[index] + self._keyframe_size
+        while state.tick < tick:
+            pos = self._apply(state, pos)
+        return state
+
+    def states(self):
+        """
+        Play the whole replay as fast as it decodes, yielding the state after every tick from 0.
+        The same ReplayState is updated in place; copy() any state you want to keep.
+        """
+        if not self.offsets:
+            return
+        state = self._keyframe(0)
+        pos = self.offsets[0] + self._keyframe_size
+        yield state
+        while state.tick < self.ticks:
+            if state.tick and state.tick % self.keyframe_interval == 0:
+                pos += self._keyframe_size  # Everything in the keyframe is already known
+            pos = self._apply(state, pos)
+            yield state
+
+    def maze(self):
+        """Rebuild the level's maze (0=open, 1=wall, 2=ghost spawn)."""
+        maze = [[1 if (x, y) in self.walls else 0 for x in range(self.width)] for y in range(self.height)]
+        for x, y in self.spawns:
+            maze[y][x] = 2
+        return maze
+
+    def engine(self):
+        """Create a fresh GameEngine set up exactly like the recorded one."""
+        options = dict(self.options)
+        maze = self.maze() if options.pop("custom_maze") else None
+        return GameEngine(maze=maze, seed=self.seed, **options)
+
+    def verify(self):
+        """
+        Play the recorded game again from its seed and compare every tick with the replay.
+        Returns the first tick that differs, or None if the game played out the same.
+        """
+        if self.options.get("background_planning"):
+            raise ValueError("Games planned in the background depend on thread timing and can't be played again")
+        engine = self.engine()
+        for state in self.states():
+            if ReplayState.from_engine(engine) != state:
+                return state.tick
+            if state.tick < self.ticks:
+                engine.step()
+        return None
+
+def record_game(path, seed=None, max_ticks=5000, keyframe_interval=64, **options):
+    """
+    Play one headless game and record it.
+    :param path: File to write the replay to.
+    :param seed: Game seed (drawn at random if not given).
+    :param max_ticks: Give up after this many ticks.
+    :param options: Other GameEngine options.
+    Returns the finished GameEngine.
+    """
+    engine = GameEngine(seed=seed, **options)
+    with ReplayWriter(path, engine, keyframe_interval) as writer:
+        while engine.current_state == GameState.ACTING and engine.ticks < max_ticks:
+            engine.step()
+            writer.record()
+    return engine
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, seek and verify a recorded Pac-Man game.")
+    parser.add_argument("replay", help="replay file")
+    parser.add_argument("--seek", type=int, help="print the state after this tick")
+    parser.add_argument("--verify", action="store_true", help="replay the game from its seed and compare")
+    args = parser.parse_args()
+
+    replay = Replay(args.replay)
+    print(f"{args.replay}: seed {replay.seed}, {len(replay)} ticks, {replay.width}x{replay.height}, "
+          f"{replay.num_ghosts} ghosts, {len(replay.data)} bytes")
+
+    start = time.perf_counter()
+    for state in replay.states():
+        pass
+    seconds = time.perf_counter() - start
+    print(f"Final: score {state.score}, deaths {state.deaths}, {len(state.pellets)} pellets left "
+          f"(played back in {seconds * 1000:.1f} ms)")
+
+    if args.seek is not None:
+        start = time.perf_counter()
+        state = replay.state_at(args.seek)
+        print(f"{state} (seek took {(time.perf_counter() - start) * 1000:.2f} ms)")
+
+    if args.verify and replay.options.get("background_planning"):
+        print("Can't verify: the game was planned in the background, so it depends on thread timing")
+    elif args.verify:
+        tick = replay.verify()
+        print("Verified: the game plays out the same" if tick is None else f"Mismatch at tick {tick}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import pygame
+from asset_manager import assets
 
 class ScoreTracker:
     """Handles all score tracking and display for the Pac-Man game"""
+    FONT_NAME = 'BitcountGridSingle.ttf'
     
     def __init__(self, total_pellets, pellet_value=10):
         """
@@ -15,6 +17,8 @@ class ScoreTracker:
         self.pellets_eaten = 0
         self.total_pellets = total_pellets
         self.pellet_value = pellet_value
+        self.font = None  # Loaded on first draw, once pygame is initialized
+        self.text_cache = {}  # HUD slot -> ((text, color), rendered text surface)
     
     def eat_pellet(self, position):
         """
@@ -43,6 +47,36 @@ class ScoreTracker:
         """Get total number of pellets"""
         return self.total_pellets
     
+    def _load_font(self):
+        """Load the HUD font once, falling back to pygame's default font"""
+        try: 
+            return pygame.font.Font(assets.path(self.FONT_NAME), 20)
+        except Exception:
+            return pygame.font.Font(None, 36)
+    
+    def _render_text(self, slot, text, color):
+        """
+        Render a line of HUD text, reusing last frame's surface if the slot's text is unchanged
+        
+        Args:
+            slot: Name of the HUD line ("score", "pellets", "win")
+            text: The string to render
+            color: RGB text color
+        
+        Returns:
+            Surface: The rendered text
+        """
+        key = (text, color)
+        cached = self.text_cache.get(slot)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        if self.font is None:
+            self.font = self._load_font()
+        surface = self.font.render(text, True, color)
+        self.text_cache[slot] = (key, surface)
+        return surface
+    
     def draw(self, window, pellets_remaining, width, height):
         """
         Draw the score and pellet count on the screen
@@ -52,29 +86,33 @@ class ScoreTracker:
             pellets_remaining: Number of pellets still in the game
             width: Window width
             height: Window height
-        """
-        try: 
-            font = pygame.font.Font('assets/BitCountGridSingle.ttf', 20)
-        except Exception:
-            font = pygame.font.Font(None, 36)
-        
         
+        Returns:
+            list: Rects of the window that were drawn on
+        """
         # Draw score
-        score_text = font.render(f"Score: {self.score}", True, (255, 255, 255))
-        window.blit(score_text, (10, 10))
+        score_text = self._render_text("score", f"Score: {self.score}", (255, 255, 255))
+        rects = [window.blit(score_text, (10, 10))]
         
         # Draw pellets remaining
-        pellets_text = font.render(f"Pellets: {pellets_remaining}/{self.total_pellets}", True, (255, 255, 255))
-        window.blit(pellets_text, (width - 200, 10))
+        pellets_text = self._render_text("pellets", f"Pellets: {pellets_remaining}/{self.total_pellets}", (255, 255, 255))
+        rects.append(window.blit(pellets_text, (width - 200, 10)))
         
         # Draw win message if all pellets eaten
         if pellets_remaining == 0:
-            win_text = font.render("YOU WIN!", True, (0, 255, 0))
+            win_text = self._render_text("win", "YOU WIN!", (0, 255, 0))
             text_rect = win_text.get_rect(center=(width//2, height//2))
-            window.blit(win_text, text_rect)
+            rects.append(window.blit(win_text, text_rect))
+        
+        return rects
     
-    def print_stats(self):
-        """Print final game statistics"""
-        print(f"\nGame Over! Final Score: {self.score}")
-        print(f"Pellets eaten: {self.pellets_eaten}/{self.total_pellets}")
+    def print_stats(self, file=None):
+        """
+        Print final game statistics
+        
+        Args:
+            file: Stream to print to (default: stdout)
+        """
+        print(f"\nGame Over! Final Score: {self.score}", file=file)
+        print(f"Pellets eaten: {self.pellets_eaten}/{self.total_pellets}", file=file)
 
@@ -5,6 +5,10 @@ Run this to verify your pathfinding works correctly
 """
 
 from pacman_ai import PacmanAI
+from distance_table import DistanceTable
+from bitboard import BitBoard
+from pathfinding import PATHFINDERS
+from occupancy import Occupancy
 
 def print_maze_with_path(maze, path, start, goal):
     """Visualize the maze with the path"""
@@ -40,6 +44,10 @@ def print_maze_with_path(maze, path, start, goal):
         print('|' + ''.join(row) + '|')
     print("=" * (width * 2 + 1))
 
+def cells_to_points(pacman, path):
+    """Turn a path of cell numbers into (x, y) points"""
+    return [pacman.grid.xy(cell) for cell in path]
+
 def test_simple_maze():
     """Test on a simple 5x5 maze"""
     print("Testing Simple 5x5 Maze")
@@ -60,8 +68,8 @@ def test_simple_maze():
     # Create Pac-Man AI
     pacman = PacmanAI(start, maze)
     
-    # Find path
-    path = pacman.bfs(start, goal)
+    # Find path (searches run on cell numbers, printed back as (x, y))
+    path = cells_to_points(pacman, pacman.bfs(pacman.grid.cell(*start), pacman.grid.cell(*goal)))
     
     print(f"Start: {start}")
     print(f"Goal: {goal}")
@@ -94,7 +102,7 @@ def test_complex_maze():
     goal = (8, 8)
     
     pacman = PacmanAI(start, maze)
-    path = pacman.bfs(start, goal)
+    path = cells_to_points(pacman, pacman.bfs(pacman.grid.cell(*start), pacman.grid.cell(*goal)))
     
     print(f"Start: {start}")
     print(f"Goal: {goal}")
@@ -123,7 +131,7 @@ def test_no_path():
     goal = (3, 3)  # This position is a wall!
     
     pacman = PacmanAI(start, maze)
-    path = pacman.bfs(start, goal)
+    path = cells_to_points(pacman, pacman.bfs(pacman.grid.cell(*start), pacman.grid.cell(*goal)))
     
     print(f"Start: {start}")
     print(f"Goal: {goal} (blocked by wall)")
@@ -132,6 +140,159 @@ def test_no_path():
     
     return len(path) == 0
 
+def test_multi_target():
+    """Test that one search finds a path to every reachable target"""
+    print("\nTesting Multi-Target Search")
+    print("-" * 30)
+    
+    maze = [
+        [1, 1, 1, 1, 1],
+        [1, 0, 0, 0, 1],
+        [1, 0, 1, 0, 1],
+        [1, 0, 1, 1, 1],
+        [1, 1, 1, 1, 1]
+    ]
+    
+    start = (1, 1)
+    targets = [(3, 2), (3, 3), (1, 3)]  # (3, 3) is a wall
+    
+    pacman = PacmanAI(start, maze)
+    cell = pacman.grid.cell
+    paths = [cells_to_points(pacman, path) for path in pacman.set_targets([cell(*target) for target in targets])]
+    
+    print(f"Start: {start}")
+    print(f"Targets: {targets}")
+    print(f"Paths found: {paths}")
+    
+    assert paths == [cells_to_points(pacman, pacman.bfs(cell(*start), cell(3, 2))),
+                     cells_to_points(pacman, pacman.bfs(cell(*start), cell(1, 3)))]
+
+def test_distance_table():
+    """Test that precomputed tables agree with BFS, in full and landmark mode"""
+    print("\nTesting Distance Table")
+    print("-" * 30)
+    
+    maze = [
+        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0, 0, 1],
+        [1, 0, 1, 0, 1, 0, 1, 1, 0, 1],
+        [1, 0, 1, 0, 0, 0, 0, 1, 0, 1],
+        [1, 0, 1, 1, 1, 1, 0, 1, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1, 0, 1],
+        [1, 1, 1, 0, 1, 1, 1, 1, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 1, 1, 1, 1, 1, 1, 0, 1],
+        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+    ]
+    
+    start = (1, 1)
+    goal = (8, 8)
+    
+    pacman = PacmanAI(start, maze)
+    full = DistanceTable(maze)
+    landmarks = DistanceTable(maze, max_cells=10, landmarks=3)
+    cell, stride = pacman.grid.cell, pacman.grid.stride
+    path = pacman.bfs(cell(*start), cell(*goal))
+    
+    print(f"BFS path length: {len(path)}")
+    print(f"Table path: {full.path(start, goal)}")
+    print(f"Landmark path: {landmarks.path(start, goal)}")
+    
+    assert full.full and not landmarks.full
+    assert full.distance(start, goal) == len(path) - 1
+    assert len(full.path(start, goal)) == len(path)
+    assert landmarks.distance(start, goal) == len(path) - 1
+    assert full.distance(start, (0, 0)) is None
+    assert cells_to_points(pacman, full.cell_path(cell(*start), cell(*goal), stride)) == full.path(start, goal)
+    assert (cells_to_points(pacman, landmarks.cell_path(cell(*start), cell(*goal), stride))
+            == landmarks.path(start, goal))
+
+def test_bitboard():
+    """Test that the bitboard frontier search matches BFS and counts pellets"""
+    print("\nTesting Bitboard Search")
+    print("-" * 30)
+    
+    maze = [
+        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0, 0, 1],
+        [1, 0, 1, 0, 1, 0, 1, 1, 0, 1],
+        [1, 0, 1, 0, 0, 0, 0, 1, 0, 1],
+        [1, 0, 1, 1, 1, 1, 0, 1, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1, 0, 1],
+        [1, 1, 1, 0, 1, 1, 1, 1, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 1, 1, 1, 1, 1, 1, 0, 1],
+        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+    ]
+    
+    start = (1, 1)
+    goal = (8, 8)
+    pellets = [(2, 1), (3, 3), (8, 8)]
+    
+    pacman = PacmanAI(start, maze)
+    board = BitBoard.from_maze(maze, pellets)
+    path = board.bfs(start, goal)
+    
+    print(f"Bitboard path: {path}")
+    print(f"Pellets: {board.pellet_count()}")
+    
+    print_maze_with_path(maze, path, start, goal)
+    
+    board.eat((2, 1))
+    assert len(path) == len(pacman.bfs(pacman.grid.cell(*start), pacman.grid.cell(*goal)))
+    assert path[0] == start and path[-1] == goal
+    assert board.pellet_count() == 2
+    assert board.bfs(start, (3, 4)) == []
+
+def test_pathfinders():
+    """Test that every search backend finds an equally short path"""
+    print("\nTesting Search Backends")
+    print("-" * 30)
+    
+    # Open room with a wall splitting it, where A* and JPS skip most cells
+    maze = [[1] * 12] + [[1] + [0] * 10 + [1] for _ in range(10)] + [[1] * 12]
+    for y in range(1, 9):
+        maze[y][6] = 1
+    
+    start = (1, 1)
+    goal = (10, 1)
+    lengths = {}
+    for name in PATHFINDERS:
+        pacman = PacmanAI(start, maze, pathfinder=name)
+        path = pacman.set_targets([pacman.grid.cell(*goal)])[0]
+        lengths[name] = len(path)
+        print(f"{name}: {len(path)} steps, {pacman.nodes_expanded} nodes expanded")
+    
+    pacman = PacmanAI(start, maze, pathfinder="jps")
+    pacman.set_targets([pacman.grid.cell(*goal)])
+    assert len(set(lengths.values())) == 1, lengths
+    assert lengths["bfs"] == len(pacman.bfs(pacman.grid.cell(*start), pacman.grid.cell(*goal)))
+
+def test_incremental_replanning():
+    """Test that the incremental backend repairs its plan as a ghost moves"""
+    print("\nTesting Incremental Replanning")
+    print("-" * 30)
+    
+    maze = [[1] * 12] + [[1] + [0] * 10 + [1] for _ in range(10)] + [[1] * 12]
+    occupancy = Occupancy(stride=13)
+    pacman = PacmanAI((1, 1), maze, verbose=False, pathfinder="dstar", occupancy=occupancy)
+    goal = pacman.grid.cell(10, 10)
+    first = pacman.set_targets([goal])[0]
+    cold = pacman.nodes_expanded
+    
+    # A ghost steps onto the middle of the plan, then Pac-Man takes a step
+    occupancy.move("Ghost", first[len(first) // 2])
+    pacman.cells_changed(occupancy.take_changes())
+    pacman.cell = first[1]
+    repaired = pacman.set_targets([goal])[0]
+    warm = pacman.nodes_expanded - cold
+    
+    print(f"First plan: {cold} nodes expanded, repair: {warm} nodes expanded")
+    assert len(first) == len(pacman.bfs(pacman.start_cell, goal))
+    assert len(repaired) == len(pacman.bfs(first[1], goal))
+    assert all(pacman._passable(cell) for cell in repaired[1:])
+    assert warm < cold
+
 def run_all_tests():
     """Run all test cases"""
     print("=" * 40)
@@ -141,14 +302,23 @@ def run_all_tests():
     tests = [
         ("Simple Maze", test_simple_maze),
         ("Complex Maze", test_complex_maze),
-        ("No Path", test_no_path)
+        ("No Path", test_no_path),
+        ("Multi-Target", test_multi_target),
+        ("Distance Table", test_distance_table),
+        ("Bitboard", test_bitboard),
+        ("Search Backends", test_pathfinders),
+        ("Incremental Replanning", test_incremental_replanning)
     ]
     
     results = []
     for name, test_func in tests:
         try:
             passed = test_func()
-            results.append((name, passed))
+            # Newer tests assert instead of returning whether they passed
+            results.append((name, passed is None or passed))
+        except AssertionError as e:
+            print(f"FAILED in {name}: {e}")
+            results.append((name, False))
         except Exception as e:
             print(f"ERROR in {name}: {e}")
             results.append((name, False))
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless GameEngine
+Runs whole games without opening a window
+"""
+
+import random
+from game_engine import GameEngine, nearest_pellets
+from game_agent import GameState
+from pellet_store import PelletStore
+
+def test_nearest_pellets():
+    """Nearest pellets come back closest first"""
+    from cell_grid import CellGrid
+    grid = CellGrid([[0] * 32 for _ in range(10)])
+    cell = grid.cell
+    pellets = PelletStore(grid.stride, [cell(1, 1), cell(5, 5), cell(2, 1), cell(9, 9), cell(30, 0)])
+    nearest = nearest_pellets(cell(0, 1), pellets)
+    print(f"Nearest pellets: {[grid.xy(p) for p in nearest]}")
+    assert nearest == [cell(1, 1), cell(2, 1), cell(5, 5)]
+
+    pellets.remove(cell(1, 1))
+    assert cell(1, 1) not in pellets and len(pellets) == 4
+    assert nearest_pellets(cell(31, 0), pellets) == [cell(30, 0), cell(2, 1), cell(5, 5)]
+    assert nearest_pellets(0, PelletStore(grid.stride)) is None
+
+def test_step_headless():
+    """A single step advances the tick counter and keeps the game consistent"""
+    random.seed(0)
+    engine = GameEngine()
+    total = engine.score_tracker.get_total_pellets()
+    engine.step()
+
+    assert engine.ticks == 1
+    assert engine.pacman.cell not in engine.pellets and engine.grid.cell(*engine.pacman.pos) == engine.pacman.cell
+    assert len(engine.pellets) + engine.score_tracker.get_pellets_eaten() == total
+
+def test_cells():
+    """Agents keep their cell, path and visited cells as plain ints, and (x, y) only at the edges"""
+    from array import array
+    random.seed(2)
+    engine = GameEngine()
+    engine.run(max_ticks=50)
+    pacman, grid = engine.pacman, engine.grid
+
+    assert isinstance(pacman.path, array) and pacman.path.typecode == 'i'
+    assert isinstance(pacman.visited, bytearray) and pacman.visited[pacman.cell]
+    assert grid.cell(*pacman.pos) == pacman.cell and grid.xy(pacman.cell) == pacman.pos
+    assert all(isinstance(ghost.cell, int) and grid.is_open(ghost.cell) for ghost in engine.ghosts)
+    x, y = pacman.pos
+    assert sorted(grid.neighbors(pacman.cell)) == sorted(grid.cell(nx, ny) for nx, ny in
+                                                         ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+                                                         if engine.maze[ny][nx] != 1)
+
+def test_dstar_open_edges():
+    """D* Lite repairs around ghosts on a maze with no outer wall without stepping off the grid"""
+    maze = [[1 if x % 3 == 2 and y % 3 == 2 else 0 for x in range(15)] for y in range(12)]
+    maze[10][7] = maze[10][13] = 2  # Ghosts spawn on the open bottom row
+    for seed in range(40):
+        engine = GameEngine(maze=maze, seed=seed, pathfinder="dstar")
+        engine.run(max_ticks=400)
+        assert engine.score_tracker.get_score() > 0
+        assert all(0 <= x < 15 and 0 <= y < 12 for x, y in [engine.pacman.pos] + [g.pos for g in engine.ghosts])
+
+def test_run_many_ticks():
+    """Thousands of ticks run without a display or any sleeping"""
+    random.seed(1)
+    engine = GameEngine()
+    state = engine.run(max_ticks=2000)
+
+    print(f"Ticks: {engine.ticks}, Score: {engine.score_tracker.get_score()}, Deaths: {engine.deaths}")
+    assert engine.ticks <= 2000
+    assert engine.score_tracker.get_score() > 0
+    if state == GameState.GOAL:
+        assert not engine.pellets
+
+def test_headless_loads_no_images():
+    """Running the engine never loads a sprite, so no display is needed"""
+    from asset_manager import assets
+    assets.clear()
+    random.seed(3)
+    GameEngine().run(max_ticks=50)
+    assert not assets._images
+
+def test_occupancy_layer():
+    """Ghosts live in the level's occupancy layer and the wall grid never changes"""
+    random.seed(6)
+    engine = GameEngine()
+    walls = [tuple(row) for row in engine.maze]
+    assert all(2 not in row for row in walls)
+    engine.run(max_ticks=300)
+
+    occupancy = engine.level.occupancy
+    assert [tuple(row) for row in engine.maze] == walls
+    assert occupancy.positions == {ghost.name: ghost.cell for ghost in engine.ghosts}
+    ghost = engine.ghosts[0]
+    x, y = ghost.pos
+    assert occupancy.is_occupied(ghost.cell) and ghost.name in occupancy.agents_at(ghost.cell)
+    assert occupancy.has_adjacent(ghost.cell + 1)
+    assert occupancy.count_near(ghost.cell) == sum(1 for other in engine.ghosts if other is not ghost
+                                                   and abs(other.pos[0] - x) <= 2 and abs(other.pos[1] - y) <= 2)
+
+def test_perception():
+    """Summed-area table counts match a scan of the occupancy layer for any radius"""
+    from occupancy import Occupancy
+    from perception import Perception
+
+    rng = random.Random(7)
+    stride = 32  # Cells of a 20 x 15 area, numbered with room to spare
+
+    def random_cell():
+        return rng.randrange(15) * stride + rng.randrange(20)
+
+    occupancy = Occupancy(stride)
+    for i in range(30):
+        occupancy.move(f"Ghost {i}", random_cell())
+    perception = Perception(occupancy)
+    for radius in (0, 1, 2, 5, 30):
+        for cell in [random_cell() for _ in range(50)] + list(occupancy.positions.values()):
+            assert perception.count(cell, radius) == occupancy.count_near(cell, radius)
+
+    # The table is a snapshot until the next refresh
+    cell = occupancy.positions["Ghost 0"] + 1
+    before = perception.count(cell)
+    occupancy.remove("Ghost 0")
+    assert perception.count(cell) == before
+    perception.refresh()
+    assert perception.count(cell) == occupancy.count_near(cell, 2)
+
+    random.seed(8)
+    engine = GameEngine(perception_radius=4)
+    engine.run(max_ticks=200)
+    assert engine.pacman.perception.radius == 4
+
+def test_numpy_grid_matches_lists():
+    """The opt-in NumPy maze plays exactly the same game as the list maze"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("NumPy not installed, skipping")
+        return
+
+    results = []
+    for use_numpy in (False, True):
+        random.seed(2)
+        engine = GameEngine(use_numpy=use_numpy)
+        engine.run(max_ticks=500)
+        results.append((engine.ticks, engine.pacman.pos, [ghost.pos for ghost in engine.ghosts]))
+    assert results[0] == results[1]
+
+def test_numpy_agent_counts():
+    """The NumPy grid's bulk agent counts match the occupancy layer's one-cell counts"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("NumPy not installed, skipping")
+        return
+    from level import Level
+
+    level = Level(use_numpy=True)
+    grid, cells, occupancy = level.maze, level.grid, level.occupancy
+    rng = random.Random(9)
+    open_cells = [(x, y) for y in range(level.height) for x in range(level.width) if grid.is_open(x, y)]
+    for i, (x, y) in enumerate(rng.sample(open_cells, 12)):
+        occupancy.move(f"Ghost {i}", cells.cell(x, y))
+
+    counts = grid.agent_counts(occupancy)
+    assert counts.sum() > 0
+    assert all(counts[y, x] == occupancy.count_near(cells.cell(x, y)) for x, y in open_cells)
+    queries = rng.sample(open_cells, 20)
+    assert grid.count_agents_at(occupancy, queries, radius=3).tolist() == \
+        [occupancy.count_near(cells.cell(x, y), 3) for x, y in queries]
+
+def test_batch_ghosts_follow_engine_rules():
+    """BatchSimulator ghosts move, mark the maze and respawn exactly like the engine's"""
+    try:
+        from batch_simulator import BatchSimulator
+    except ImportError:
+        print("NumPy not installed, skipping")
+        return
+    import types
+
+    class FirstChoiceBatch(BatchSimulator):
+        """Always turn to the first open direction, like randint returning 0"""
+        def _random_choice(self, mask):
+            return mask.argmax(axis=1)
+
+        def _move_pacman(self, games):
+            pass  # Pac-Man stays at its start so the ghosts come and catch it
+
+    from pacman_ai import PacmanAI
+
+    class StillPacman(PacmanAI):
+        """Pac-Man stays at its start"""
+        __slots__ = ()
+
+        def step(self, *args):
+            pass
+
+    engine = GameEngine()
+    engine.pacman.__class__ = StillPacman  # Agents have __slots__, so the method can't be patched on the instance
+    for ghost in engine.ghosts:
+        ghost.rng = types.SimpleNamespace(randint=lambda a, b: 0)
+    batch = FirstChoiceBatch(2)
+    for _ in range(300):
+        engine.step()
+        batch.step()
+        for game in range(2):
+            assert [tuple(p) for p in batch.ghosts[game].tolist()] == [g.pos for g in engine.ghosts]
+            assert batch.deaths[game] == engine.deaths
+    assert engine.deaths > 0
+
+    # Other mazes spawn ghosts where the maze marks them, as the engine does, and keep every wall
+    from maze_generator import generate_maze
+    maze = generate_maze(41, seed=3)
+    batch = BatchSimulator(2, maze=maze, seed=1)
+    assert [tuple(p) for p in batch.ghost_start.tolist()] == [g.pos for g in GameEngine(maze=maze).ghosts]
+    walls = batch.grid[:, 2:-2, 2:-2] == 1
+    for _ in range(100):
+        batch.step()
+    assert (walls == (batch.grid[:, 2:-2, 2:-2] == 1)).all()
+    try:
+        BatchSimulator(1, maze=maze, ghost_spawns=[(12, 12)])
+        assert False, "ghost spawn on a wall accepted"
+    except ValueError:
+        pass
+
+def test_retained_plan():
+    """Pac-Man keeps its plan between ticks and only searches again when it's invalidated"""
+    random.seed(4)
+    engine = GameEngine(retain_plan=True)
+    engine.run(max_ticks=300)
+    print(f"Replans per tick: {engine.replans_per_tick:.2f}")
+    assert 0 < engine.pacman.replans < engine.ticks
+
+    # The plan is dropped once its pellet is gone, a ghost comes near it or it runs out
+    from array import array
+    from pacman_ai import PacmanAI
+    from occupancy import Occupancy
+    maze = [[1] * 7, [1, 0, 0, 0, 0, 0, 1], [1] * 7]
+    occupancy = Occupancy(stride=8)
+    pacman = PacmanAI((1, 1), maze, verbose=False, retain_plan=True, occupancy=occupancy)
+    cell = pacman.grid.cell
+    pacman.path = array('i', [cell(2, 1), cell(3, 1), cell(4, 1)])
+    assert pacman._plan_valid({cell(4, 1)})
+    assert not pacman._plan_valid({cell(3, 1)})
+    occupancy.move("Ghost", cell(5, 1))
+    assert not pacman._plan_valid({cell(4, 1)})
+    pacman.path = array('i')
+    assert not pacman._plan_valid(None)
+
+def test_replay():
+    """A recorded game seeks to any tick, survives being cut short and replays from its seed"""
+    import os
+    import tempfile
+    from replay import Replay, ReplayState, record_game
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "game.pmr")
+        engine = record_game(path, seed=11, max_ticks=2000, keyframe_interval=32)
+        replay = Replay(path)
+        print(f"{len(replay)} ticks in {len(replay.data)} bytes, {engine.deaths} deaths")
+        assert len(replay) == engine.ticks and engine.deaths > 0
+
+        states = [state.copy() for state in replay.states()]
+        assert states[-1] == ReplayState.from_engine(engine)
+        for tick in (0, 1, 31, 32, 33, len(replay) // 2, len(replay)):
+            assert replay.state_at(tick) == states[tick]
+        assert replay.verify() is None
+
+        # A game that crashed mid-write is readable up to its last whole tick
+        cut = os.path.join(folder, "cut.pmr")
+        with open(cut, "wb") as f:
+            f.write(replay.data[:len(replay.data) // 2])
+        partial = Replay(cut)
+        assert 0 < len(partial) < len(replay)
+        assert partial.state_at(len(partial)) == states[len(partial)]
+
+        # Any seed Python's random accepts records, negative ones included
+        record_game(path, seed=-5, max_ticks=100)
+        replay = Replay(path)
+        assert replay.seed == -5 and replay.verify() is None
+
+def test_tournament():
+    """Seeded games are reproducible and come back through the shared results block"""
+    from tournament import play_game, run_tournament, summarize
+
+    results = run_tournament([5, 6, 5], num_ghosts=2, max_ticks=200, workers=2, chunk_size=1)
+    print(summarize(results, 1.0))
+    assert [r["seed"] for r in results] == [5, 6, 5]
+    assert results[0]["steps"] == results[2]["steps"] and results[0]["score"] == results[2]["score"]
+    assert results[0]["score"] == play_game(5, num_ghosts=2, max_ticks=200)[1]
+
+    # Seeded games are the same whether or not they're recorded
+    import tempfile
+    from replay import Replay
+    with tempfile.TemporaryDirectory() as folder:
+        recorded = play_game(5, num_ghosts=2, max_ticks=200, replay_dir=folder)
+        assert recorded[1:7] == play_game(5, num_ghosts=2, max_ticks=200)[1:7]
+        assert Replay(f"{folder}/bfs-5.pmr").verify() is None
+
+        # A generated maze reaches the workers as its recipe and plays like the maze itself
+        import pickle
+        from tournament import GeneratedMaze
+        from maze_generator import generate_maze
+        generated = GeneratedMaze(41, seed=3)
+        assert len(pickle.dumps(generated)) < 200
+        assert (run_tournament([5], maze=generated, max_ticks=200, workers=1)[0]["score"]
+                == play_game(5, maze=generate_maze(41, seed=3), max_ticks=200)[1])
+
+        # Levels too large to record are turned down before any game starts
+        try:
+            run_tournament([5], maze=[[1] * 1001] * 1000, replay_dir=folder)
+            assert False, "huge level recorded"
+        except ValueError:
+            pass
+
+def test_generated_maze():
+    """Generated mazes are seeded, walled in, connected, free of dead ends and playable at any size"""
+    from maze_generator import generate_maze
+
+    for width, height, loops in ((25, 25, 0.1), (40, 31, 0.0), (61, 20, 0.5)):
+        maze = generate_maze(width, height, seed=4, loop_density=loops)
+        assert maze == generate_maze(width, height, seed=4, loop_density=loops)
+        assert len(maze) == height and all(len(row) == width for row in maze)
+        assert all(maze[0][x] == maze[-1][x] == 1 for x in range(width))
+        assert all(maze[y][0] == maze[y][-1] == 1 for y in range(height))
+        assert sum(row.count(2) for row in maze) == 4
+
+        open_cells = {(x, y) for y in range(height) for x in range(width) if maze[y][x] != 1}
+        reached, frontier = {(1, 1)}, [(1, 1)]
+        while frontier:
+            x, y = frontier.pop()
+            for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if cell in open_cells and cell not in reached:
+                    reached.add(cell)
+                    frontier.append(cell)
+        assert reached == open_cells
+        for x, y in open_cells:
+            assert sum(cell in open_cells for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))) >= 2
+
+        engine = GameEngine(maze=maze, seed=1)
+        assert (engine.level.width, engine.level.height) == (width, height) and len(engine.ghosts) == 4
+        engine.run(50)
+
+    assert generate_maze(25, seed=1) != generate_maze(25, seed=2)
+    assert sum(row.count(0) for row in generate_maze(41, loop_density=1.0)) > sum(row.count(0) for row in generate_maze(41))
+    assert sum(row.count(2) for row in generate_maze(7)) == 4
+    for bad in ((5, 10), (10, 6), (7, 7, 0, 0.1, 9)):
+        try:
+            generate_maze(*bad)
+            assert False, "tiny maze accepted"
+        except ValueError as error:
+            assert "7x7" in str(error) or "8 ghosts" in str(error)
+    try:
+        GameEngine(maze=[[1] * 5 for _ in range(5)])
+        assert False, "walled-in start accepted"
+    except ValueError:
+        pass
+
+def test_level_file():
+    """Level files read back the maze they were written from and play the same game, chunk by chunk"""
+    import os
+    import pickle
+    import tempfile
+    from level import DEFAULT_MAZE, Level
+    from level_file import LevelFile, write_level
+    from maze_generator import generate_maze
+
+    maze = generate_maze(45, 30, seed=3, loop_density=0.3)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "level.pml")
+        pellets = write_level(path, maze, chunk_size=8)
+        with LevelFile(path, max_chunks=4) as level:
+            assert (level.width, level.height, level.across, level.down) == (45, 30, 6, 4)
+            assert level.chunks_loaded == 0
+            assert all(level.maze[y][x] == (maze[y][x] == 1) for y in range(30) for x in range(45))
+            assert level.maze[0][-1] == level.maze[0][45] == 1 and not level.maze.is_open(-1, 5)
+            assert level.spawns == [(x, y) for y in range(30) for x in range(45) if maze[y][x] == 2]
+            assert level.total_pellets == pellets == sum(row.count(0) + row.count(2) for row in maze)
+
+            # Same game as the list maze, reading a few chunks at a time
+            engine, plain = GameEngine(seed=3, maze=level), GameEngine(seed=3, maze=maze)
+            for _ in range(300):
+                engine.step()
+                plain.step()
+                assert engine.pacman.pos == plain.pacman.pos
+                assert [g.pos for g in engine.ghosts] == [g.pos for g in plain.ghosts]
+            assert len(engine.pellets) == len(plain.pellets) and set(engine.pellets) == set(plain.pellets)
+            cell, xy = engine.grid.cell, engine.grid.xy
+            for pos in ((1, 1), (40, 25), (22, 3)):
+                assert engine.pellets.nearest(cell(*pos), 3) == plain.pellets.nearest(cell(*pos), 3)
+
+            # Nearest pellets far away, once whole chunks are empty
+            store = level.pellets()
+            for pellet in list(store):
+                if xy(pellet)[0] < 40:
+                    store.remove(pellet)
+            nearest = [xy(p) for p in store.nearest(cell(1, 1), 2)]
+            assert nearest == sorted(map(xy, store), key=lambda p: (abs(p[0] - 1) + abs(p[1] - 1), p))[:2]
+
+            copy = pickle.loads(pickle.dumps(level))
+            assert copy.spawns == level.spawns and copy.maze[1][1] == 0
+            copy.close()
+
+        # The standard level converts too
+        write_level(path, DEFAULT_MAZE)
+        with LevelFile(path) as level:
+            assert GameEngine(maze=level).level.spawn_points() == Level(DEFAULT_MAZE).spawn_points()
+
+        with open(path, "wb") as f:
+            f.write(b"not a level")
+        try:
+            LevelFile(path)
+            assert False, "bad file accepted"
+        except ValueError:
+            pass
+
+def test_tick_profiler():
+    """Profiled ticks record every phase, and profiling doesn't change the game"""
+    from tick_profiler import TickProfiler, NULL_PROFILER
+
+    assert GameEngine(seed=2).profiler is NULL_PROFILER
+    profiler = TickProfiler(window=50)
+    engine, plain = GameEngine(seed=2, profiler=profiler), GameEngine(seed=2)
+    engine.run(80)
+    plain.run(80)
+    assert engine.pacman.pos == plain.pacman.pos and engine.score_tracker.get_score() == plain.score_tracker.get_score()
+
+    report = profiler.summary()
+    for phase in ("repair", "plan", "pellets", "ghosts", "tick"):
+        assert report[phase]["samples"] == 80 and len(profiler.timings[phase]) == 50
+        assert 0 <= report[phase]["p50"] <= report[phase]["p95"] <= report[phase]["p99"] <= report[phase]["max"]
+    assert report["replans"]["samples"] == 80 and "nodes/search" in report
+    assert TickProfiler.percentiles(range(1, 101)) == [50, 95, 99]
+    print("\n".join(profiler.lines()))
+
+def test_benchmark_gate():
+    """Benchmarks time their hot path and the gate flags only slowdowns beyond the threshold"""
+    import benchmark
+
+    results = benchmark.run_benchmarks(["ghost_move", "draw"], repeat=1)
+    assert set(results) == {"ghost_move", "draw"} and all(seconds > 0 for seconds in results.values())
+    baseline = {"ghost_move": 1.0, "draw": 1.0, "bfs": 1.0}
+    assert benchmark.compare({"ghost_move": 1.2, "draw": 1.3}, baseline, threshold=0.25) == ["draw"]
+    assert benchmark.compare({"nearest_pellets": 9.0}, baseline) == []
+
+def test_camera_rendering():
+    """On a level bigger than the window the camera follows Pac-Man and only chunks near the view are rendered"""
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from renderer import Renderer
+    from maze_generator import generate_maze
+
+    pygame.init()
+    engine = GameEngine(maze=generate_maze(301, seed=4), seed=4)
+    cell, size = Renderer.fit(engine.level)
+    assert cell == 8 and size == (1000, 1000)
+    renderer = Renderer(pygame.display.set_mode(size), engine, cell)
+    pacimage = pygame.Surface((cell, cell))
+    for _ in range(60):
+        renderer.draw(pacimage)
+        assert renderer._in_view(engine.pacman.pos)
+        assert len(renderer._chunks) <= renderer.max_chunks < (301 // Renderer.CHUNK + 1) ** 2
+        engine.step()
+    assert renderer.view == (125, 125) and renderer.minimap is not None
+    assert renderer.minimap.surface.get_width() <= Renderer.MINIMAP_SIZE
+
+    # A level that fits the window is drawn whole, without a camera or minimap
+    small = Renderer(pygame.display.set_mode(Renderer.fit(GameEngine().level)[1]), GameEngine(), 20)
+    small.draw(pygame.Surface((20, 20)))
+    assert small.camera == (0, 0) and small.minimap is None
+
+def test_fixed_timestep():
+    """The timestep turns frame time into whole ticks, carrying the remainder and capping turbo bursts"""
+    from game_clock import FixedTimestep
+
+    timestep = FixedTimestep(tick_ms=200, max_ticks_per_frame=8)
+    assert [timestep.advance(70) for _ in range(6)] == [0, 0, 1, 0, 0, 1]  # 420ms is two ticks, 20ms left over
+    assert timestep.accumulator == 20
+    assert timestep.faster() == 4 and timestep.advance(100) == 2
+    while timestep.speed != 256:
+        timestep.faster()
+    assert timestep.advance(1000) == 8 and timestep.dropped > 0 and timestep.accumulator <= 200
+    assert timestep.faster() == 1
+    timestep.reset()
+    assert timestep.advance(199) == 0
+
+def test_background_planner():
+    """Plans searched on a worker thread are followed, and cancelled searches are never published"""
+    from maze_generator import generate_maze
+
+    def play(seed):
+        engine = GameEngine(seed=seed, background_planning=True)
+        try:
+            for _ in range(300):
+                engine.step()
+                engine.pacman.planner.wait()  # Lockstep with the worker, so the game doesn't depend on timing
+            return engine.pacman.pos, engine.score_tracker.get_score(), engine.pacman.replans
+        finally:
+            engine.close()
+    pos, score, replans = play(5)
+    assert score > 0 and replans > 0 and play(5) == (pos, score, replans)
+
+    # Ticks back to back, as in turbo or fast-forward: Pac-Man never waits for the worker
+    for pathfinder in ("bfs", "dstar"):
+        engine = GameEngine(seed=5, background_planning=True, pathfinder=pathfinder)
+        try:
+            still = 0
+            while engine.current_state == GameState.ACTING and engine.ticks < 400:
+                before, deaths = engine.pacman.pos, engine.deaths
+                engine.step()
+                if engine.current_state == GameState.ACTING and engine.pacman.pos == before and engine.deaths == deaths:
+                    still += 1
+            assert still < engine.ticks // 10 and engine.score_tracker.get_score() > 0
+        finally:
+            engine.close()
+
+    engine = GameEngine(maze=generate_maze(301, seed=2), seed=2, background_planning=True)
+    planner = engine.pacman.planner
+    start, goal = engine.grid.cell(1, 1), engine.grid.cell(297, 297)
+    try:
+        planner.request(start, [goal], engine.occupancy.cells)
+        request = planner.pending
+        assert not planner.request(start, [engine.grid.cell(3, 1)], engine.occupancy.cells)  # One search at a time
+        planner.cancel()
+        assert request.future.result() is None and planner.take() is None and planner.cancelled == 1
+
+        planner.request(start, [goal], engine.occupancy.cells)
+        planner.wait()
+        path, = planner.take()
+        assert engine.grid.xy(path[0]) == (1, 1) and engine.grid.xy(path[-1]) == (297, 297)
+    finally:
+        engine.close()
+
+if __name__ == "__main__":
+    for test in (test_nearest_pellets, test_step_headless, test_cells, test_dstar_open_edges,
+                 test_run_many_ticks, test_headless_loads_no_images,
+                 test_occupancy_layer, test_perception, test_numpy_grid_matches_lists, test_numpy_agent_counts,
+                 test_batch_ghosts_follow_engine_rules,
+                 test_retained_plan, test_replay, test_tournament, test_generated_maze, test_level_file,
+                 test_tick_profiler,
+                 test_benchmark_gate, test_camera_rendering, test_fixed_timestep,
+                 test_background_planner):
+        test()
+    print("All engine tests passed! ✓")
@@ -0,0 +1,102 @@
+import time
+from collections import deque
+
+class NullProfiler:
+    """Stand-in used while instrumentation is off: every call is a no-op, so timing a phase costs one call."""
+    enabled = False
+
+    @staticmethod
+    def clock():
+        return 0.0
+
+    def lap(self, phase, start):
+        return 0.0
+
+    def record(self, metric, value):
+        pass
+
+NULL_PROFILER = NullProfiler()
+
+class TickProfiler:
+    """
+    Times the phases of each game tick and keeps a rolling window of recent samples per phase,
+    from which it reports percentiles. Counters (search nodes, replans) are kept the same way.
+    Code being timed calls clock() before a phase and lap(phase, start) after it.
+    """
+    enabled = True
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=600):
+        """
+        Initializes the profiler.
+        :param window: Number of recent samples kept per phase or counter.
+        """
+        self.window = window
+        self.timings = {}  # phase -> deque of its recent durations in seconds
+        self.counts = {}  # counter -> deque of its recent values
+        self.totals = {}  # phase or counter -> [samples, sum] over the whole run
+        self.clock = time.perf_counter
+
+    def _add(self, samples, metric, value):
+        window = samples.get(metric)
+        if window is None:
+            window = samples[metric] = deque(maxlen=self.window)
+            self.totals[metric] = [0, 0.0]
+        window.append(value)
+        total = self.totals[metric]
+        total[0] += 1
+        total[1] += value
+
+    def lap(self, phase, start):
+        """
+        Record the time since start against a phase.
+        Returns the current time, so consecutive phases can be timed with one clock read each.
+        """
+        now = self.clock()
+        self._add(self.timings, phase, now - start)
+        return now
+
+    def record(self, metric, value):
+        """Record one value of a counter, e.g. the nodes a search expanded."""
+        self._add(self.counts, metric, value)
+
+    @classmethod
+    def percentiles(cls, samples):
+        """Return the PERCENTILES of a list of samples (nearest rank)."""
+        ordered = sorted(samples)
+        return [ordered[max(0, -(-len(ordered) * p // 100) - 1)] for p in cls.PERCENTILES]
+
+    def summary(self):
+        """
+        Return the report as a dict of phase or counter -> stats over the rolling window
+        (p50, p95, p99, max), plus the number of samples and mean over the whole run.
+        Phase times are in milliseconds.
+        """
+        report = {}
+        for samples, scale in ((self.timings, 1000.0), (self.counts, 1.0)):
+            for metric, window in samples.items():
+                if not window:
+                    continue
+                count, total = self.totals[metric]
+                stats = dict(zip((f"p{p}" for p in self.PERCENTILES), self.percentiles(window)))
+                stats["max"] = max(window)
+                stats = {key: value * scale for key, value in stats.items()}
+                stats["mean"] = total / count * scale
+                stats["samples"] = count
+                report[metric] = stats
+        return report
+
+    def lines(self):
+        """Return the report as lines of text, one per phase or counter."""
+        lines = []
+        for metric, stats in self.summary().items():
+            unit = "ms" if metric in self.timings else ""
+            lines.append(f"{metric:<14} p50 {stats['p50']:7.3f}{unit} p95 {stats['p95']:7.3f}{unit} "
+                         f"p99 {stats['p99']:7.3f}{unit} max {stats['max']:7.3f}{unit}")
+        return lines
+
+    def write(self, file):
+        """Write the report to an open text file."""
+        print(f"\nTick profile (percentiles over the last {self.window} samples):", file=file)
+        for line in self.lines():
+            print(line, file=file)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Tournament runner for evaluating Pac-Man agents over many seeded headless games.
+Games are spread over a process pool, one worker per core. Each worker writes its games' results
+straight into a shared memory block, so nothing bigger than a seed list is pickled between processes.
+
+Usage: python3 tournament.py --games 10000 --agent table --ghosts 4
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # One banner per worker adds up
+
+from game_engine import GameEngine
+from game_agent import GameState
+from replay import ReplayWriter, MAX_CELLS as REPLAY_MAX_CELLS
+from maze_generator import generate_maze, generate_grid
+from level_file import LevelFile, write_level
+
+# Agent name -> GameEngine options
+AGENTS = {
+    "bfs": {},
+    "table": {"precompute": True},
+    "astar": {"pathfinder": "astar"},
+    "bidirectional": {"pathfinder": "bidirectional"},
+    "jps": {"pathfinder": "jps"},
+    "dstar": {"pathfinder": "dstar"},
+    "retain": {"retain_plan": True},
+    "retain-dstar": {"pathfinder": "dstar", "retain_plan": True},
+}
+
+# Generated mazes up to this many cells are sent to workers as their recipe and generated by each worker;
+# bigger ones are written once to a temporary level file that workers map, since building a Level from a
+# list of that size takes seconds per game
+LEVEL_FILE_CELLS = 250_000
+
+class GeneratedMaze:
+    """
+    A generated maze handed to workers as its size and seeds instead of its cells, so it pickles in a few bytes.
+    Each process generates it the first time one of its games is played on it.
+    """
+    _cache = {}  # (size, seed, loop density) -> rows, the last maze generated in this process
+
+    def __init__(self, size, seed=0, loop_density=0.1):
+        self.width = self.height = size
+        self.seed = seed
+        self.loop_density = loop_density
+
+    def rows(self):
+        """Return the maze as a list of rows, generating it if this process hasn't yet."""
+        key = (self.width, self.seed, self.loop_density)
+        rows = self._cache.get(key)
+        if rows is None:
+            self._cache.clear()
+            rows = self._cache[key] = generate_maze(self.width, seed=self.seed, loop_density=self.loop_density)
+        return rows
+
+# One row of doubles per game in the shared results block
+FIELDS = ("seed", "score", "pellets_eaten", "total_pellets", "steps", "deaths", "won", "seconds", "replans_per_tick")
+
+def play_game(seed, agent="bfs", num_ghosts=None, maze=None, max_ticks=5000, replay_dir=None):
+    """
+    Play one seeded headless game.
+    :param replay_dir: If given, record the game to <replay_dir>/<agent>-<seed>.pmr.
+    Returns a tuple of values in FIELDS order.
+    """
+    start = time.perf_counter()
+    if isinstance(maze, GeneratedMaze):
+        maze = maze.rows()
+    engine = GameEngine(maze=maze, num_ghosts=num_ghosts, seed=seed, **AGENTS[agent])
+    if replay_dir is None:
+        state = engine.run(max_ticks)
+    else:
+        with ReplayWriter(os.path.join(replay_dir, f"{agent}-{seed}.pmr"), engine) as writer:
+            while engine.current_state == GameState.ACTING and engine.ticks < max_ticks:
+                engine.step()
+                writer.record()
+        state = engine.current_state
+    seconds = time.perf_counter() - start
+
+    tracker = engine.score_tracker
+    return (seed, tracker.get_score(), tracker.get_pellets_eaten(), tracker.get_total_pellets(),
+            engine.ticks, engine.deaths, state == GameState.GOAL, seconds, engine.replans_per_tick)
+
+def _play_chunk(shm_name, first_row, seeds, config):
+    """Worker: play a run of seeds and write each result into its row of the shared block."""
+    shm = SharedMemory(name=shm_name)
+    try:
+        rows = shm.buf.cast("d")
+        for offset, seed in enumerate(seeds):
+            start = (first_row + offset) * len(FIELDS)
+            rows[start:start + len(FIELDS)] = array("d", play_game(seed, **config))
+        rows.release()
+    finally:
+        shm.close()
+    return len(seeds)
+
+def run_tournament(seeds, agent="bfs", num_ghosts=None, maze=None, max_ticks=5000, workers=None, chunk_size=None,
+                   replay_dir=None):
+    """
+    Play every seed across a process pool.
+    :param seeds: List of integer seeds, one game each.
+    :param agent: Key of AGENTS to play with.
+    :param num_ghosts: Number of ghosts per game (default: all of the level's ghosts).
+    :param maze: Optional 2D maze, GeneratedMaze or LevelFile to play instead of the standard level.
+        Workers get a copy of a 2D maze with every chunk of games; the others pickle in a few bytes.
+    :param max_ticks: Give up on a game after this many ticks.
+    :param workers: Worker processes (default: one per core).
+    :param chunk_size: Games handed to a worker at a time.
+    :param replay_dir: If given, record every game to a replay file in this folder.
+        Levels over REPLAY_MAX_CELLS cells can't be recorded (ValueError).
+    Returns a list of per-game result dicts.
+    """
+    if replay_dir is not None and maze is not None:
+        if isinstance(maze, (LevelFile, GeneratedMaze)):
+            width, height = maze.width, maze.height
+        else:
+            width, height = len(maze[0]), len(maze)
+        if width * height > REPLAY_MAX_CELLS:
+            raise ValueError(f"A {width}x{height} level is too large to record replays of "
+                             f"(over {REPLAY_MAX_CELLS} cells)")
+    seeds = list(seeds)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, len(seeds) // (workers * 8))
+    config = {"agent": agent, "num_ghosts": num_ghosts, "maze": maze, "max_ticks": max_ticks, "replay_dir": replay_dir}
+    if replay_dir is not None:
+        os.makedirs(replay_dir, exist_ok=True)
+
+    shm = SharedMemory(create=True, size=max(1, len(seeds) * len(FIELDS) * 8))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_chunk, shm.name, start, seeds[start:start + chunk_size], config)
+                       for start in range(0, len(seeds), chunk_size)]
+            for future in futures:
+                future.result()
+
+        rows = shm.buf.cast("d")
+        values = rows.tolist()
+        rows.release()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = []
+    for i in range(len(seeds)):
+        row = dict(zip(FIELDS, values[i * len(FIELDS):(i + 1) * len(FIELDS)]))
+        for key in ("seed", "score", "pellets_eaten", "total_pellets", "steps", "deaths"):
+            row[key] = int(row[key])
+        row["won"] = bool(row["won"])
+        results.append(row)
+    return results
+
+def summarize(results, wall_seconds):
+    """Aggregate per-game results into a report dict."""
+    def stats(key):
+        values = [r[key] for r in results]
+        return {"mean": statistics.fmean(values), "median": statistics.median(values),
+                "min": min(values), "max": max(values)}
+
+    return {
+        "games": len(results),
+        "wins": sum(r["won"] for r in results),
+        "score": stats("score"),
+        "steps": stats("steps"),
+        "deaths": stats("deaths"),
+        "replans_per_tick": stats("replans_per_tick"),
+        "game_seconds": stats("seconds"),
+        "wall_seconds": wall_seconds,
+        "games_per_second": len(results) / wall_seconds if wall_seconds else 0.0,
+    }
+
+def print_report(report):
+    """Print a tournament report"""
+    print(f"\nTournament: {report['games']} games, {report['wins']} won "
+          f"({100 * report['wins'] / max(report['games'], 1):.1f}%)")
+    for key in ("score", "steps", "deaths", "replans_per_tick", "game_seconds"):
+        s = report[key]
+        print(f"{key:>16}: mean {s['mean']:.2f}  median {s['median']:.2f}  min {s['min']:.2f}  max {s['max']:.2f}")
+    print(f"Wall time: {report['wall_seconds']:.1f}s ({report['games_per_second']:.1f} games/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a Pac-Man agent over many seeded headless games.")
+    parser.add_argument("--games", type=int, default=100, help="number of games (seeds) to play")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="bfs", help="agent configuration")
+    parser.add_argument("--ghosts", type=int, default=None, help="ghosts per game (default: all)")
+    parser.add_argument("--max-ticks", type=int, default=5000, help="tick limit per game")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--output", help="write the report and per-game results to this JSON file")
+    parser.add_argument("--replays", help="record every game to a replay file in this folder")
+    parser.add_argument("--size", type=int, default=None, help="play a generated SIZE x SIZE maze instead of the standard level")
+    parser.add_argument("--loops", type=float, default=0.1, help="loop density of a generated maze (0 to 1)")
+    parser.add_argument("--maze-seed", type=int, default=0, help="seed of the generated maze")
+    parser.add_argument("--level", help="play a level file (see level_file.py) instead of the standard level")
+    args = parser.parse_args()
+
+    maze = None
+    folder = None
+    if args.level is not None:
+        maze = LevelFile(args.level)  # Workers reopen it by path
+    elif args.size is not None:
+        try:
+            if args.size ** 2 <= LEVEL_FILE_CELLS:
+                maze = GeneratedMaze(args.size, args.maze_seed, args.loops)
+                maze.rows()  # Check the size here (and let forked workers inherit the maze)
+            else:
+                grid = generate_grid(args.size, seed=args.maze_seed, loop_density=args.loops)
+                folder = tempfile.TemporaryDirectory()
+                path = os.path.join(folder.name, f"maze-{args.size}.pml")
+                write_level(path, (grid[y * args.size:(y + 1) * args.size] for y in range(args.size)),
+                            args.size, args.size)
+                del grid
+                maze = LevelFile(path)
+        except ValueError as error:
+            parser.error(str(error))
+
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    start = time.perf_counter()
+    try:
+        results = run_tournament(seeds, agent=args.agent, num_ghosts=args.ghosts, maze=maze,
+                                 max_ticks=args.max_ticks, workers=args.workers, replay_dir=args.replays)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        if isinstance(maze, LevelFile):
+            maze.close()
+        if folder is not None:
+            folder.cleanup()
+    report = summarize(results, time.perf_counter() - start)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"report": report, "games": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()